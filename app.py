@@ -1,27 +1,72 @@
+import difflib
+import functools
+import json
+from pathlib import Path
+
 import streamlit as st
 
 from utils.data_manager import (
+    catalog_version,
     clear_all_files,
     clear_question_files,
+    current_workspace,
     format_commit_message,
+    get_question,
+    get_questions,
     get_random_question,
-    load_questions,
-    read_notes,
+    list_attempts,
+    multi_user_enabled,
+    next_review_due,
+    next_review_question,
+    notes_version,
+    progress_paths,
+    read_notes_page,
     reset_all_questions,
     reset_question_data,
     save_notes,
     save_solution,
+    set_current_user,
     update_status,
 )
-from utils.ai_client import call_openai_compatible, get_ai_config
-from utils.git_helper import git_add_commit, git_push
+from utils.ai_cache import cache_from_config, cached_chat
+from utils.ai_context import DEFAULT_BUDGET, append_turn, build_messages
+from utils.analytics import get_analytics
+from utils.bulk_hints import get_hint
+from utils.ai_client import get_ai_config
+from utils.facets import get_facet_index
+from utils.git_helper import get_git_worker
+from utils.judge import has_testcases, judge_code, question_id_from_path
+from utils.profiler import (
+    RerunProfiler,
+    load_recent_timings,
+    profiling_enabled_by_env,
+)
+from utils.review import DEFAULT_QUALITY, QUALITY_LABELS
+from utils.search_index import get_search_index
+from utils.similarity import get_similarity_index
+from utils.static_check import check_code
 
+NOTES_PAGE_SIZE = 5
+RELATED_LIMIT = 8
+REVIEW_PAGE_SIZE = 50
+FILTER_PAGE_SIZE = 50
+STATUS_LABELS = {"unsolved": "未完成", "solved": "已完成"}
+AI_NOTES_LIMIT = 20
+
+GIT_STATE_ICONS = {
+    "idle": "⚪",
+    "pending": "⏳",
+    "running": "🔄",
+    "ok": "✅",
+    "failed": "❌",
+}
 
 st.set_page_config(page_title="LeetCode Hunter 🎯", page_icon="🎯", layout="centered")
 st.title("LeetCode Hunter 🎯")
 
-if "current_question" not in st.session_state:
-    st.session_state.current_question = None
+# 会话里只存题号；题目内容每次重跑从（共享的）题库缓存里取
+if "current_question_id" not in st.session_state:
+    st.session_state.current_question_id = None
 
 if "code_input" not in st.session_state:
     st.session_state.code_input = ""
@@ -29,38 +74,296 @@ if "code_input" not in st.session_state:
 if "notes_input" not in st.session_state:
     st.session_state.notes_input = ""
 
-questions = load_questions()
-total = len(questions)
-solved = sum(1 for q in questions if q.get("status") == "solved")
-progress = solved / total if total else 0
+if "profile_enabled" not in st.session_state:
+    st.session_state.profile_enabled = profiling_enabled_by_env()
 
-with st.sidebar:
+profiler = RerunProfiler(st.session_state.profile_enabled)
+# 整页重跑期间为 True；脚本跑完后只重跑某个片段时为 False，片段要自己记录耗时
+full_run = True
+if multi_user_enabled():
+    # 多用户模式：进度/解法/笔记落在 users/<用户名>/ 下，不再提交到共享的 git 仓库
+    default_user = st.query_params.get("user", "")
+    with st.sidebar:
+        user_id = st.text_input("👤 用户名", value=default_user, key="user_id").strip()
+    if not user_id:
+        st.info("请先在侧边栏输入用户名。")
+        st.stop()
+    try:
+        workspace = set_current_user(user_id)
+    except ValueError as exc:
+        st.error(str(exc))
+        st.stop()
+    git_worker = None
+else:
+    workspace = set_current_user(None)
+    git_worker = get_git_worker()
+
+st.session_state.workspace_user = workspace.user
+analytics = get_analytics()
+facets = get_facet_index()
+# 总题数、已完成数直接数状态位图，整页重跑不再加载题库或汇总统计
+with profiler.phase("facets"):
+    total = facets.count(facets.query())
+
+
+def fragment(func):
+    # 片段单独重跑时不一定还在上次的脚本线程里，先恢复本会话的工作区（线程局部）；
+    # 选择框回调要求打开另一道题时，转成整页重跑
+    @functools.wraps(func)
+    def run(*args, **kwargs):
+        global profiler
+        set_current_user(st.session_state.get("workspace_user"))
+        if st.session_state.pop("rerun_app", False):
+            rerun()
+        if full_run:
+            return func(*args, **kwargs)
+        # 整页末尾的 flush 不会在片段单独重跑时执行，每次片段重跑单独记一条
+        profiler = RerunProfiler(
+            st.session_state.profile_enabled, labels={"fragment": func.__name__}
+        )
+        try:
+            return func(*args, **kwargs)
+        finally:
+            flush_profile()
+
+    return st.fragment(run)
+
+
+def flush_profile():
+    question_id = st.session_state.get("current_question_id")
+    profiler.flush({"question_id": str(question_id) if question_id else None})
+
+
+def rerun(scope="app"):
+    # st.rerun() 以异常结束本次执行，走不到收尾的 flush，先把已记录的阶段落盘
+    flush_profile()
+    st.rerun(scope=scope)
+
+
+def lazy_panel(label, key):
+    # st.expander 折叠时里面的代码照样执行；用开关代替，关着的面板什么都不算
+    return st.toggle(label, key=key)
+
+
+def open_question(question_id):
+    st.session_state.current_question_id = question_id
+    st.session_state.code_input = ""
+    st.session_state.notes_input = ""
+
+
+def pick_question(key):
+    # 选择框回调：打开所选题目并把选择框复位，之后的重跑不会再把同一题打开一遍
+    question_id = st.session_state.get(key)
+    if question_id is not None:
+        st.session_state[key] = None
+        open_question(question_id)
+        st.session_state.rerun_app = True
+
+
+@st.cache_data(max_entries=512, show_spinner=False)
+def cached_related(root, question_id, prefer_unsolved, version):
+    # 键里带工作区和题库版本：提交、导入改动题库后自然失效
+    related = get_similarity_index().related(
+        get_question(question_id), limit=RELATED_LIMIT, prefer_unsolved=prefer_unsolved
+    )
+    return [(q.get("id"), q.get("title")) for q in related]
+
+
+@st.cache_data(max_entries=512, show_spinner=False)
+def cached_notes_page(root, question_id, title, page, version):
+    return read_notes_page(
+        question_id=question_id, title=title, page=page, page_size=NOTES_PAGE_SIZE
+    )
+
+
+@fragment
+def render_sidebar():
+    solved = facets.count(facets.query(status=["solved"]))
     st.subheader("进度")
-    st.progress(progress)
+    st.progress(solved / total if total else 0)
     st.caption(f"已完成 {solved}/{total}")
+    if lazy_panel("📊 统计", "panel_stats"):
+        with profiler.phase("analytics"):
+            stats_summary = analytics.summary()
+        st.caption(
+            f"连续打卡 {stats_summary['current_streak']} 天，"
+            f"最长 {stats_summary['longest_streak']} 天"
+        )
+        st.bar_chart(
+            {row["day"][5:]: row["solves"] for row in stats_summary["daily"]},
+            height=160,
+        )
+        st.dataframe(
+            [
+                {
+                    "难度": row["difficulty"],
+                    "完成": f"{row['solved']}/{row['total']}",
+                    "完成率": f"{row['rate']:.0%}",
+                }
+                for row in stats_summary["difficulty"]
+            ],
+            hide_index=True,
+            use_container_width=True,
+        )
+        if stats_summary["weakest_tags"]:
+            st.markdown(
+                "**薄弱标签：** "
+                + "、".join(
+                    f"{row['tag']}（{row['rate']:.0%}）"
+                    for row in stats_summary["weakest_tags"]
+                )
+            )
+        st.dataframe(
+            [
+                {
+                    "标签": row["tag"],
+                    "完成": f"{row['solved']}/{row['total']}",
+                    "完成率": f"{row['rate']:.0%}",
+                }
+                for row in stats_summary["tags"]
+            ],
+            hide_index=True,
+            use_container_width=True,
+        )
 
-    solved_questions = [q for q in questions if q.get("status") == "solved"]
-    solved_titles = [
-        f"{q.get('id')} - {q.get('title')}" for q in solved_questions
-    ]
-    selected_review = st.selectbox(
-        "复习已完成题目",
-        options=["(选择题目)"] + solved_titles,
+    # 题库很大时只把过滤后的当前一页交给 selectbox，避免渲染成千上万个选项
+    review_filter = st.text_input(
+        "复习已完成题目", key="review_filter", placeholder="输入题号或标题过滤"
+    ).strip().lower()
+    # 已完成列表直接取状态位图：不过滤时只解出当前页；输入了过滤词才逐题比对标题
+    solved_bits = facets.query(status=["solved"])
+    if review_filter:
+        solved_ids = [
+            q.get("id")
+            for q in get_questions(facets.ids(solved_bits))
+            if q is not None
+            and review_filter in f"{q.get('id')} {q.get('title', '')}".lower()
+        ]
+        solved_total = len(solved_ids)
+    else:
+        solved_ids = None
+        solved_total = facets.count(solved_bits)
+    page_count = max((solved_total - 1) // REVIEW_PAGE_SIZE + 1, 1)
+    review_page = 1
+    if page_count > 1:
+        review_page = st.number_input(
+            f"页码（共 {page_count} 页，{solved_total} 题）",
+            min_value=1,
+            max_value=page_count,
+            value=1,
+            step=1,
+            key="review_page",
+        )
+    page_start = (int(review_page) - 1) * REVIEW_PAGE_SIZE
+    if solved_ids is None:
+        page_ids = facets.ids(solved_bits, offset=page_start, limit=REVIEW_PAGE_SIZE)
+    else:
+        page_ids = solved_ids[page_start : page_start + REVIEW_PAGE_SIZE]
+    st.selectbox(
+        "选择题目",
+        options=[None] + page_ids,
+        format_func=lambda qid: "(选择题目)"
+        if qid is None
+        else f"{qid} - {get_question(qid).get('title')}",
         index=0,
+        key="review_pick",
+        on_change=pick_question,
+        args=("review_pick",),
+        label_visibility="collapsed",
     )
 
-    if selected_review != "(选择题目)":
-        selected_index = solved_titles.index(selected_review)
-        st.session_state.current_question = solved_questions[selected_index]
-        st.session_state.code_input = ""
-        st.session_state.notes_input = ""
+    if lazy_panel("🧭 条件筛选", "panel_facets"):
+        selected = {
+            "tags": st.session_state.get("facet_tags", []),
+            "difficulty": st.session_state.get("facet_difficulty", []),
+            "status": st.session_state.get("facet_status", []),
+        }
+        with profiler.phase("facets"):
+            facet_counts = facets.counts(**selected)
+            matched = facets.query(**selected)
+        # 标签按（在其他条件下的）题量排序，计数为 0 的标签只在已选中时保留
+        tag_options = sorted(
+            (
+                tag
+                for tag, count in facet_counts["tags"].items()
+                if count or tag in selected["tags"]
+            ),
+            key=lambda tag: -facet_counts["tags"][tag],
+        )
+        st.multiselect(
+            "标签（同时包含）",
+            tag_options,
+            key="facet_tags",
+            format_func=lambda tag: f"{tag} ({facet_counts['tags'][tag]})",
+        )
+        st.multiselect(
+            "难度",
+            sorted(facet_counts["difficulty"]),
+            key="facet_difficulty",
+            format_func=lambda name: f"{name} ({facet_counts['difficulty'][name]})",
+        )
+        st.multiselect(
+            "状态",
+            sorted(facet_counts["status"]),
+            key="facet_status",
+            format_func=lambda name: (
+                f"{STATUS_LABELS.get(name, name)} ({facet_counts['status'][name]})"
+            ),
+        )
+        matched_total = facets.count(matched)
+        filter_page = 1
+        filter_page_count = max((matched_total - 1) // FILTER_PAGE_SIZE + 1, 1)
+        if filter_page_count > 1:
+            filter_page = st.number_input(
+                f"页码（共 {filter_page_count} 页）",
+                min_value=1,
+                max_value=filter_page_count,
+                value=1,
+                step=1,
+                key="filter_page",
+            )
+        filter_ids = facets.ids(
+            matched,
+            offset=(int(filter_page) - 1) * FILTER_PAGE_SIZE,
+            limit=FILTER_PAGE_SIZE,
+        )
+        st.selectbox(
+            f"符合条件 {matched_total} 题",
+            options=[None] + filter_ids,
+            format_func=lambda qid: "(选择题目)"
+            if qid is None
+            else f"{qid} - {get_question(qid).get('title')}",
+            index=0,
+            key="facet_pick",
+            on_change=pick_question,
+            args=("facet_pick",),
+        )
 
-    if st.button("⬆️ Git Push", use_container_width=True):
-        push_result = git_push()
-        if push_result.returncode != 0:
-            st.error(push_result.stderr.strip() or "Git push 失败。")
-        else:
-            st.success("已推送到远端。")
+    search_query = st.text_input("🔍 搜索笔记/解法", key="search_query")
+    if search_query.strip():
+        search_index = get_search_index()
+        hits = search_index.search(search_query)
+        if not hits:
+            st.caption("没有匹配的笔记或解法。")
+        for rel_path, _ in hits:
+            hit_id = question_id_from_path(Path(rel_path))
+            hit_question = get_question(hit_id) if hit_id else None
+            if st.button(rel_path, key=f"search_{rel_path}", use_container_width=True):
+                if hit_question is not None:
+                    open_question(hit_question.get("id"))
+                    rerun()
+            st.caption(search_index.snippet(rel_path, search_query))
+
+    if git_worker is not None:
+        if st.button("⬆️ Git Push", use_container_width=True):
+            with profiler.phase("git_push"):
+                git_worker.request_push()
+
+        git_status = git_worker.status()
+        for key, label in (("commit", "Commit"), ("push", "Push")):
+            item = git_status[key]
+            icon = GIT_STATE_ICONS[item["state"]]
+            st.caption(f"{icon} {label} {item['time']} {item['message']}".strip())
 
     st.divider()
     st.subheader("清零")
@@ -77,35 +380,32 @@ with st.sidebar:
         st.warning("确认清空当前题目的所有解法与笔记？此操作不可恢复。")
         col_yes, col_no = st.columns(2)
         if col_yes.button("确认清空当前题目", use_container_width=True):
-            if st.session_state.current_question is None:
+            current_id = st.session_state.current_question_id
+            current = get_question(current_id) if current_id else None
+            if current is None:
                 st.error("当前没有选中的题目。")
             else:
-                current = st.session_state.current_question
                 clear_question_files(
                     question_id=current.get("id"),
                     title=current.get("title", ""),
                 )
-                updated = reset_question_data(current.get("id"))
-                from pathlib import Path
-
-                Path("solutions").mkdir(exist_ok=True)
-                Path("notes").mkdir(exist_ok=True)
-                commit_result = git_add_commit(
-                    paths=["data/problems.json", "solutions", "notes"],
-                    message=f"Reset {current.get('id')} solutions",
-                )
-                if commit_result.returncode != 0:
-                    st.warning(commit_result.stderr.strip() or "Git commit 失败。")
-                push_result = git_push()
-                if push_result.returncode != 0:
-                    st.warning(push_result.stderr.strip() or "Git push 失败。")
-                if updated is not None:
-                    st.session_state.current_question = updated
+                reset_question_data(current.get("id"))
+                workspace.solutions_dir.mkdir(parents=True, exist_ok=True)
+                workspace.notes_dir.mkdir(parents=True, exist_ok=True)
+                if git_worker is not None:
+                    with profiler.phase("git_add_commit"):
+                        git_worker.submit(
+                            paths=[str(p) for p in progress_paths()]
+                            + [str(workspace.solutions_dir), str(workspace.notes_dir)],
+                            message=f"Reset {current.get('id')} solutions",
+                        )
+                    with profiler.phase("git_push"):
+                        git_worker.request_push()
                 st.session_state.code_input = ""
                 st.session_state.notes_input = ""
                 st.session_state.confirm_clear_current = False
                 st.success("已清空当前题目。")
-                st.rerun()
+                rerun()
         if col_no.button("取消", use_container_width=True):
             st.session_state.confirm_clear_current = False
 
@@ -119,127 +419,278 @@ with st.sidebar:
         if col_yes.button("确认清空全部", use_container_width=True):
             clear_all_files()
             reset_all_questions()
-            from pathlib import Path
-
-            Path("solutions").mkdir(exist_ok=True)
-            Path("notes").mkdir(exist_ok=True)
-            commit_result = git_add_commit(
-                paths=["data/problems.json", "solutions", "notes"],
-                message="Reset all solutions",
-            )
-            if commit_result.returncode != 0:
-                st.warning(commit_result.stderr.strip() or "Git commit 失败。")
-            push_result = git_push()
-            if push_result.returncode != 0:
-                st.warning(push_result.stderr.strip() or "Git push 失败。")
-            st.session_state.current_question = None
+            workspace.solutions_dir.mkdir(parents=True, exist_ok=True)
+            workspace.notes_dir.mkdir(parents=True, exist_ok=True)
+            if git_worker is not None:
+                with profiler.phase("git_add_commit"):
+                    git_worker.submit(
+                        paths=[str(p) for p in progress_paths()]
+                        + [str(workspace.solutions_dir), str(workspace.notes_dir)],
+                        message="Reset all solutions",
+                    )
+                with profiler.phase("git_push"):
+                    git_worker.request_push()
+            st.session_state.current_question_id = None
             st.session_state.code_input = ""
             st.session_state.notes_input = ""
             st.session_state.confirm_clear_all = False
             st.success("已清空全部题目。")
-            st.rerun()
+            rerun()
         if col_no.button("取消", use_container_width=True):
             st.session_state.confirm_clear_all = False
 
-if st.button("🎲 随机抽取一道题", use_container_width=True):
-    question = get_random_question()
-    st.session_state.current_question = question
-    st.session_state.code_input = ""
-    st.session_state.notes_input = ""
-    if question is None:
-        st.info("全部题目已完成，恭喜！")
 
-question = st.session_state.current_question
+@fragment
+def render_related(question_id):
+    if not lazy_panel("🔗 相关题目", "panel_related"):
+        return
+    prefer_unsolved = st.checkbox("优先未完成", key="related_unsolved")
+    with profiler.phase("related"):
+        related = cached_related(
+            str(current_workspace().root),
+            question_id,
+            prefer_unsolved,
+            catalog_version(),
+        )
+    if not related:
+        st.caption("暂无相关题目。")
+    for related_id, related_title in related:
+        if st.button(f"{related_id} - {related_title}", key=f"rel_{related_id}"):
+            open_question(related_id)
+            rerun()
 
-if question:
-    main_col, side_col = st.columns([2, 1])
 
-    with side_col:
-        with st.expander("🔗 相关题目"):
-            current_tags = set(question.get("tags", []))
-            related = []
-            for q in questions:
-                if q.get("id") == question.get("id"):
-                    continue
-                if current_tags.intersection(set(q.get("tags", []))):
-                    related.append(q)
-            if not related:
-                st.caption("暂无相关题目。")
-            else:
-                for q in related[:8]:
-                    label = f"{q.get('id')} - {q.get('title')}"
-                    if st.button(label, key=f"rel_{q.get('id')}"):
-                        st.session_state.current_question = q
-                        st.session_state.code_input = ""
-                        st.session_state.notes_input = ""
-                        st.rerun()
-
-        with st.expander("📒 查看以往笔记（只读）"):
-            history = read_notes(
-                question_id=question.get("id"),
-                title=question.get("title", ""),
+@fragment
+def render_notes(question_id):
+    if not lazy_panel("📒 查看以往笔记（只读）", "panel_notes"):
+        return
+    question = get_question(question_id)
+    if question is None:
+        return
+    title = question.get("title", "")
+    page_key = f"notes_page_{question_id}"
+    notes_page = st.session_state.get(page_key, 0)
+    with profiler.phase("read_notes"):
+        entries, entry_total = cached_notes_page(
+            str(current_workspace().root),
+            question_id,
+            title,
+            notes_page,
+            notes_version(question_id, title),
+        )
+    if not entries:
+        st.caption("暂无历史笔记。")
+    for stamp, text in entries:
+        st.caption(stamp or "（无时间戳）")
+        st.text(text)
+    page_count = max((entry_total - 1) // NOTES_PAGE_SIZE + 1, 1)
+    if page_count > 1:
+        col_newer, col_older = st.columns(2)
+        if col_newer.button("较新", disabled=notes_page == 0, key="notes_newer"):
+            st.session_state[page_key] = notes_page - 1
+            rerun(scope="fragment")
+        if col_older.button(
+            "更早", disabled=notes_page >= page_count - 1, key="notes_older"
+        ):
+            st.session_state[page_key] = notes_page + 1
+            rerun(scope="fragment")
+        st.caption(f"第 {notes_page + 1}/{page_count} 页，共 {entry_total} 条")
+
+
+@fragment
+def render_ai(question_id):
+    if not lazy_panel("🤖 AI 思路助手（实验）", "panel_ai"):
+        return
+    question = get_question(question_id)
+    if question is None:
+        return
+    ai_cfg = get_ai_config()
+    if not ai_cfg["api_key"]:
+        st.info("请先设置环境变量 AI_API_KEY 才能调用。")
+    # 每道题一段对话，存在会话里；发送时按 token 预算裁剪
+    history = st.session_state.setdefault("ai_history", {}).setdefault(
+        question.get("id"), []
+    )
+    for message in history:
+        with st.chat_message(message["role"]):
+            st.write(message["content"])
+    prompt = st.text_area("提问", height=120, key="ai_prompt")
+    include_context = st.checkbox("附带题目信息", value=True)
+    include_code = st.checkbox("附带当前代码", value=True)
+    include_notes = st.checkbox("附带以往笔记", value=False)
+    use_stream = st.checkbox("流式输出", value=True)
+    try:
+        budget = int(ai_cfg["context_tokens"])
+    except ValueError:
+        budget = DEFAULT_BUDGET
+    bypass_cache = st.checkbox("跳过缓存（强制重新请求）", value=False)
+    ai_cache = cache_from_config(ai_cfg)
+    if st.button("发送到 AI"):
+        if not ai_cfg["api_key"]:
+            st.error("未配置 AI_API_KEY。")
+        elif not prompt.strip():
+            st.warning("请输入问题。")
+        else:
+            notes = []
+            if include_notes:
+                # 只取最近一页，更早的笔记本来也放不进预算
+                notes, _ = read_notes_page(
+                    question_id=question.get("id"),
+                    title=question.get("title", ""),
+                    page_size=AI_NOTES_LIMIT,
+                )
+            messages, token_report = build_messages(
+                prompt.strip(),
+                question=question if include_context else None,
+                history=history,
+                code=st.session_state.code_input if include_code else "",
+                notes=notes,
+                budget=budget,
             )
-            if history:
-                st.text_area("历史笔记", value=history, height=220, disabled=True)
-            else:
-                st.caption("暂无历史笔记。")
-
-        with st.expander("🤖 AI 思路助手（实验）"):
-            ai_cfg = get_ai_config()
-            if not ai_cfg["api_key"]:
-                st.info("请先设置环境变量 AI_API_KEY 才能调用。")
-            prompt = st.text_area("提问", height=120, key="ai_prompt")
-            include_context = st.checkbox("附带题目信息", value=True)
-            if st.button("发送到 AI"):
-                if not ai_cfg["api_key"]:
-                    st.error("未配置 AI_API_KEY。")
-                elif not prompt.strip():
-                    st.warning("请输入问题。")
+            answer = None
+            with profiler.phase("ai_call"):
+                ok, content, from_cache = cached_chat(
+                    ai_cache,
+                    messages=messages,
+                    model=ai_cfg["model"],
+                    base_url=ai_cfg["base_url"],
+                    api_key=ai_cfg["api_key"],
+                    stream=use_stream,
+                    use_cache=not bypass_cache,
+                )
+                if not ok:
+                    st.error(content)
+                elif from_cache:
+                    st.caption("⚡ 来自本地缓存")
+                    st.write(content)
+                    answer = content
+                elif use_stream:
+                    try:
+                        answer = st.write_stream(content)
+                    except Exception as exc:
+                        st.error(f"流式读取中断: {exc}")
                 else:
-                    messages = [{"role": "user", "content": prompt.strip()}]
-                    if include_context:
-                        context = (
-                            f"题目：{question.get('title')}\n"
-                            f"难度：{question.get('difficulty')}\n"
-                            f"标签：{', '.join(question.get('tags', []))}\n"
-                            f"提示：{question.get('pattern_hint')}\n"
-                        )
-                        messages.insert(
-                            0,
-                            {
-                                "role": "system",
-                                "content": "你是算法学习助手，给出思路提示而非完整答案。\n"
-                                + context,
-                            },
-                        )
-                    ok, content = call_openai_compatible(
-                        messages=messages,
-                        model=ai_cfg["model"],
-                        base_url=ai_cfg["base_url"],
-                        api_key=ai_cfg["api_key"],
-                    )
-                    if ok:
-                        st.write(content)
-                    else:
-                        st.error(content)
+                    st.write(content)
+                    answer = content
+            sections = token_report["sections"]
+            st.caption(
+                f"本次发送约 {token_report['total']}/{budget} tokens"
+                f"（代码 {sections['code']}，笔记 {sections['notes']}，"
+                f"历史 {sections['history']}；省略 "
+                f"{token_report['turns_dropped']} 轮对话、"
+                f"{token_report['notes_dropped']} 条笔记）"
+            )
+            if isinstance(answer, str) and answer:
+                append_turn(history, prompt.strip(), answer)
+    if history and st.button("清空本题对话"):
+        history.clear()
+        rerun(scope="fragment")
+    cache_stats = ai_cache.stats()
+    st.caption(f"缓存命中 {cache_stats['hits']} / 未命中 {cache_stats['misses']}")
 
-    with main_col:
-        st.markdown(f"### [{question.get('title')}]({question.get('url')})")
-        st.write(f"**难度：** {question.get('difficulty')}")
-        st.write(f"**Tags：** {' / '.join(question.get('tags', []))}")
 
-        with st.expander("💡 查看算法锦囊"):
-            st.write(question.get("pattern_hint", ""))
+@fragment
+def render_problem(question_id):
+    question = get_question(question_id)
+    if question is None:
+        return
+    st.markdown(f"### [{question.get('title')}]({question.get('url')})")
+    st.write(f"**难度：** {question.get('difficulty')}")
+    st.write(f"**Tags：** {' / '.join(question.get('tags', []))}")
+
+    with st.expander("💡 查看算法锦囊"):
+        st.write(question.get("pattern_hint", ""))
+        # python -m utils.bulk_hints 预生成的讲解，有就一起展示
+        ai_hint = get_hint(question.get("id"))
+        if ai_hint:
+            st.caption("🤖 预生成的 AI 讲解")
+            st.write(ai_hint)
+
+    # 历史解法要逐个读文件并做 diff，只在打开时计算
+    if lazy_panel("🕘 提交历史", "panel_history"):
+        attempts = list_attempts(question.get("id"))
+        if not attempts:
+            st.caption("暂无提交记录。")
+        previous_code = ""
+        for number, attempt in enumerate(attempts, start=1):
+            best_mark = " ⭐" if attempt["best"] else ""
+            st.caption(
+                f"#{number} {attempt['timestamp']} · {attempt['size']}B · "
+                f"{attempt['sha256'][:8]}{best_mark}"
+            )
+            code = (
+                attempt["path"].read_text(encoding="utf-8")
+                if attempt["path"].exists()
+                else ""
+            )
+            if number == 1:
+                st.code(code, language="python")
+            else:
+                diff = difflib.unified_diff(
+                    previous_code.splitlines(),
+                    code.splitlines(),
+                    fromfile=f"#{number - 1}",
+                    tofile=f"#{number}",
+                    lineterm="",
+                )
+                st.code("\n".join(diff) or "（无差异）", language="diff")
+            previous_code = code
 
-        st.text_area("代码", height=240, key="code_input")
-        st.text_area("笔记", height=140, key="notes_input")
-        mark_best = st.checkbox("标记为 best 解法（覆盖同题最佳）", value=False)
+    st.text_area("代码", height=240, key="code_input")
+    st.text_area("笔记", height=140, key="notes_input")
+    mark_best = st.checkbox("标记为 best 解法（覆盖同题最佳）", value=False)
+    quality = st.select_slider(
+        "掌握程度（决定下次复习时间）",
+        options=sorted(QUALITY_LABELS),
+        value=DEFAULT_QUALITY,
+        format_func=QUALITY_LABELS.get,
+    )
+    review = question.get("review")
+    if review:
+        st.caption(
+            f"上次完成 {review['last']}，计划复习 {review['due']}"
+            f"（间隔 {review['interval']} 天，难度系数 {review['ease']}）"
+        )
 
-        if st.button("提交 ✅"):
+    question_has_tests = has_testcases(question.get("id"))
+    skip_judge = question_has_tests and st.checkbox("跳过本地评测", value=False)
+    static_state = st.session_state.get("static_report")
+    if static_state and static_state["question_id"] != str(question.get("id")):
+        static_state = None
+    # 只有上次静态检查报了错才给出“忽略”选项，正常提交时不多占一行
+    ignore_static = bool(static_state and static_state["report"]["errors"]) and (
+        st.checkbox("忽略静态检查错误（仍然提交）", value=False)
+    )
+
+    if st.button("提交 ✅"):
+        static_report = check_code(st.session_state.code_input, question)
+        st.session_state.static_report = {
+            "question_id": str(question.get("id")),
+            "report": static_report,
+        }
+        static_state = st.session_state.static_report
+        judge_passed = not static_report["errors"] or ignore_static
+        if not judge_passed:
+            st.error("静态检查发现错误，本次提交未保存。")
+        elif question_has_tests and not skip_judge:
+            with st.spinner("本地评测中…"):
+                report = judge_code(
+                    question_id=question.get("id"),
+                    code=st.session_state.code_input,
+                )
+            st.session_state.judge_report = {
+                "question_id": str(question.get("id")),
+                "report": report,
+            }
+            judge_passed = report["status"] == "accepted"
+            if not judge_passed:
+                st.error(f"本地评测未通过（{report['status']}），本次提交未保存。")
+        if judge_passed:
             updated = update_status(
                 question_id=question.get("id"),
                 code=st.session_state.code_input,
                 notes=st.session_state.notes_input,
+                quality=quality,
             )
             if updated is None:
                 st.error("更新失败，请检查题目 ID。")
@@ -255,23 +706,107 @@ if question:
                     title=question.get("title", ""),
                     notes=st.session_state.notes_input,
                 )
-                commit_paths = ["data/problems.json", str(solution_path)]
+                commit_paths = [str(p) for p in progress_paths()]
+                commit_paths.append(str(solution_path))
+                commit_paths.append(str(workspace.manifest_path))
                 if notes_path is not None:
                     commit_paths.append(str(notes_path))
-                commit_result = git_add_commit(
-                    paths=commit_paths,
-                    message=format_commit_message(
-                        question_id=question.get("id"),
-                        title=question.get("title", ""),
-                    ),
-                )
-                if commit_result.returncode != 0:
-                    st.warning(commit_result.stderr.strip() or "Git commit 失败。")
+                if git_worker is not None:
+                    with profiler.phase("git_add_commit"):
+                        git_worker.submit(
+                            paths=commit_paths,
+                            message=format_commit_message(
+                                question_id=question.get("id"),
+                                title=question.get("title", ""),
+                            ),
+                        )
                 st.balloons()
                 st.success("已保存，继续加油！")
-                st.session_state.current_question = updated
-                st.rerun()
+                rerun()
+
+    if static_state:
+        report = static_state["report"]
+        if report["estimate"]:
+            expected = f"，锦囊给出 {report['expected']}" if report["expected"] else ""
+            st.caption(f"静态估计复杂度 {report['estimate']}{expected}")
+        for message in report["errors"]:
+            st.error(message)
+        for message in report["warnings"]:
+            st.warning(message)
+
+    judge_state = st.session_state.get("judge_report")
+    if judge_state and judge_state["question_id"] == str(question.get("id")):
+        report = judge_state["report"]
+        passed_count = sum(1 for r in report["results"] if r["passed"])
+        with st.expander(
+            f"🧪 本地评测：{report['status']} "
+            f"（{passed_count}/{len(report['results'])}）",
+            expanded=report["status"] != "accepted",
+        ):
+            st.dataframe(
+                [
+                    {
+                        "用例": r["case"],
+                        "结果": "✅" if r["passed"] else "❌",
+                        "耗时(ms)": r["wall_ms"],
+                        "输出": json.dumps(r["output"], ensure_ascii=False),
+                        "期望": json.dumps(r["expected"], ensure_ascii=False),
+                        "错误": r["error"],
+                    }
+                    for r in report["results"]
+                ],
+                hide_index=True,
+                use_container_width=True,
+            )
+
+
+with st.sidebar:
+    render_sidebar()
+    st.toggle("⏱️ 性能面板", key="profile_enabled")
+
+col_random, col_review = st.columns(2)
+if col_random.button("🎲 随机抽取一道题", use_container_width=True):
+    with profiler.phase("get_random_question"):
+        question = get_random_question()
+    open_question(question.get("id") if question else None)
+    if question is None:
+        st.info("全部题目已完成，恭喜！")
+if col_review.button("📅 复习到期的题", use_container_width=True):
+    with profiler.phase("next_review_question"):
+        question = next_review_question()
+    if question is None:
+        next_due = next_review_due()
+        st.info(
+            f"今天没有到期的复习题，下一道在 {next_due} 到期。"
+            if next_due
+            else "还没有需要复习的题。"
+        )
+    else:
+        open_question(question.get("id"))
+
+current_question_id = st.session_state.current_question_id
+question = get_question(current_question_id) if current_question_id else None
+
+if question:
+    main_col, side_col = st.columns([2, 1])
+    with side_col:
+        render_related(current_question_id)
+        render_notes(current_question_id)
+        render_ai(current_question_id)
+    with main_col:
+        render_problem(current_question_id)
 elif total == 0:
     st.warning("暂未找到题目数据，请检查 data/problems.json。")
 else:
     st.info("点击上方按钮开始抽题。")
+
+if profiler.enabled:
+    flush_profile()
+    with st.expander(f"⏱️ 本次重跑 {profiler.total_ms():.1f} ms"):
+        st.dataframe(profiler.summary(), hide_index=True, use_container_width=True)
+        recent = load_recent_timings()
+        if len(recent) > 1:
+            st.caption(f"最近 {len(recent)} 次重跑总耗时（ms）")
+            st.line_chart([record["total_ms"] for record in recent])
+
+full_run = False
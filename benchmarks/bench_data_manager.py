@@ -0,0 +1,279 @@
+import argparse
+import json
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from utils import data_manager  # noqa: E402
+from utils.similarity import get_similarity_index  # noqa: E402
+
+BASELINE_PATH = Path(__file__).resolve().parent / "baseline.json"
+DEFAULT_SIZES = [100, 1000, 10000, 100000]
+DEFAULT_TOLERANCE = 0.5
+DEFAULT_MEMORY_TOLERANCE = 0.25
+# 误差下限：计时器抖动、几十 KB 的分配波动不算回退。耗时的下限随题库规模增长
+# （每 1000 题放宽 0.01ms），小规模下亚毫秒级的操作变慢几倍也能被发现
+NOISE_FLOOR_MS = 0.05
+NOISE_FLOOR_MS_PER_1K = 0.01
+NOISE_FLOOR_KB = 64.0
+# 纯 Python 的相似度构建在 10 万题上要跑上小时，超过这个规模不测
+SIMILARITY_MAX_SIZE = 10000
+
+TAGS = [
+    "数组", "哈希表", "字符串", "动态规划", "双指针", "滑动窗口", "二分查找",
+    "栈", "堆", "链表", "树", "DFS", "BFS", "回溯", "贪心", "排序", "图",
+    "并查集", "位运算", "数学", "前缀和", "单调栈", "拓扑排序", "字典树",
+    "设计", "分治", "矩阵", "模拟", "递归", "队列",
+]
+DIFFICULTIES = ["Easy", "Medium", "Hard"]
+
+
+def generate_catalog(
+    root: Path,
+    size: int,
+    solved_ratio: float = 0.3,
+    max_files: int = 2000,
+    notes_per_question: int = 5,
+    seed: int = 0,
+) -> None:
+    # 合成题库 + 对应的解法/笔记目录；文件数量封顶，避免 10 万题时生成几十万个文件
+    rng = random.Random(seed)
+    questions = []
+    for index in range(1, size + 1):
+        solved = rng.random() < solved_ratio
+        questions.append(
+            {
+                "id": str(index),
+                "title": f"{index}. Synthetic Problem {index}",
+                "difficulty": rng.choice(DIFFICULTIES),
+                "url": f"https://leetcode.cn/problems/synthetic-{index}/",
+                "tags": rng.sample(TAGS, rng.randint(1, 3)),
+                "pattern_hint": f"【{rng.choice(TAGS)}】合成提示 {index}，复杂度 O(n)。",
+                "status": "solved" if solved else "unsolved",
+                "my_code": "class Solution:\n    pass\n" if solved else "",
+                "notes": "",
+            }
+        )
+    data_path = root / "data" / "problems.json"
+    data_path.parent.mkdir(parents=True, exist_ok=True)
+    data_path.write_text(
+        json.dumps(questions, ensure_ascii=False, indent=2), encoding="utf-8"
+    )
+
+    data_manager.configure_root(root)
+    solved_questions = [q for q in questions if q["status"] == "solved"]
+    for question in solved_questions[: max_files // 2]:
+        for attempt in range(2):
+            data_manager.save_solution(
+                question["id"],
+                question["title"],
+                f"class Solution:\n    attempt = {attempt}\n",
+                is_best=False,
+            )
+        for entry in range(notes_per_question):
+            data_manager.save_notes(
+                question["id"], question["title"], f"第 {entry} 次复盘：双指针。"
+            )
+
+
+def _measure(
+    func: Callable[[], Any], repeats: int, setup: Optional[Callable[[], None]] = None
+) -> Dict[str, float]:
+    timings = []
+    for _ in range(repeats):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    if setup is not None:
+        setup()
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "ms": round(statistics.median(timings), 4),
+        "peak_kb": round(peak / 1024, 1),
+    }
+
+
+def run_size(size: int, repeats: int, max_files: int) -> Dict[str, Dict[str, float]]:
+    with tempfile.TemporaryDirectory(prefix=f"lc_bench_{size}_") as tmp:
+        root = Path(tmp)
+        generate_catalog(root, size, max_files=max_files)
+        data_manager.configure_root(root)
+        questions = data_manager.load_questions()
+        rng = random.Random(size)
+        sample = [rng.choice(questions) for _ in range(max(repeats, 1))]
+        solved = [q for q in questions if q["status"] == "solved"] or questions
+        cursor = {"i": 0}
+
+        def next_question() -> Dict[str, Any]:
+            cursor["i"] += 1
+            return sample[cursor["i"] % len(sample)]
+
+        def cold_store() -> None:
+            data_manager.configure_root(root)
+
+        results = {
+            "load_questions_cold": _measure(
+                data_manager.load_questions, repeats, setup=cold_store
+            ),
+            "load_questions_warm": _measure(data_manager.load_questions, repeats),
+            "get_random_question": _measure(
+                data_manager.get_random_question, repeats
+            ),
+            "next_review_question": _measure(
+                data_manager.next_review_question, repeats
+            ),
+            "update_status": _measure(
+                lambda: data_manager.update_status(
+                    next_question()["id"], "class Solution:\n    pass\n", "note"
+                ),
+                repeats,
+            ),
+            "save_notes": _measure(
+                lambda: data_manager.save_notes(
+                    solved[0]["id"], solved[0]["title"], "追加一条复盘笔记。"
+                ),
+                repeats,
+            ),
+            "read_notes_page": _measure(
+                lambda: data_manager.read_notes_page(
+                    solved[0]["id"], solved[0]["title"]
+                ),
+                repeats,
+            ),
+        }
+        if size <= SIMILARITY_MAX_SIZE:
+            similarity = get_similarity_index()
+            # 相似度矩阵每个题库版本只构建一次，构建只测一轮；查询是热路径
+            results["similarity_build"] = _measure(similarity.rebuild, 1)
+            results["find_related"] = _measure(
+                lambda: similarity.related(next_question(), limit=8), repeats
+            )
+
+        def clear_one() -> None:
+            question = solved[cursor["i"] % len(solved)]
+            cursor["i"] += 1
+            data_manager.clear_question_files(question["id"], question["title"])
+
+        results["clear_question_files"] = _measure(clear_one, repeats)
+        return results
+
+
+def compare(
+    current: Dict[str, Any],
+    baseline: Dict[str, Any],
+    tolerance: float,
+    memory_tolerance: float = DEFAULT_MEMORY_TOLERANCE,
+) -> List[str]:
+    # 耗时与峰值内存分别对比；tracemalloc 的峰值是确定的，容差可以比耗时收紧
+    regressions = []
+    for size, operations in current.items():
+        for name, result in operations.items():
+            base = baseline.get(size, {}).get(name)
+            if base is None:
+                continue
+            limit = base["ms"] * (1 + tolerance)
+            floor = NOISE_FLOOR_MS + NOISE_FLOOR_MS_PER_1K * int(size) / 1000
+            if result["ms"] > limit and result["ms"] - base["ms"] > floor:
+                regressions.append(
+                    f"{size:>7} {name:<22} {base['ms']:.3f}ms -> {result['ms']:.3f}ms"
+                )
+            base_kb = base.get("peak_kb")
+            if base_kb is None:
+                continue
+            kb_limit = base_kb * (1 + memory_tolerance)
+            if result["peak_kb"] > kb_limit and (
+                result["peak_kb"] - base_kb > NOISE_FLOOR_KB
+            ):
+                regressions.append(
+                    f"{size:>7} {name:<22} "
+                    f"{base_kb:.1f}KB -> {result['peak_kb']:.1f}KB（峰值内存）"
+                )
+    return regressions
+
+
+def missing_entries(current: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+    # 基线里没有的项目不会参与对比，列出来提醒重新 --save-baseline
+    return [
+        f"{size:>7} {name}"
+        for size, operations in current.items()
+        for name in operations
+        if name not in baseline.get(size, {})
+    ]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="data_manager 规模化基准测试")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--max-files", type=int, default=2000)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--check", action="store_true", help="与基线对比，回退则返回 1")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument(
+        "--memory-tolerance", type=float, default=DEFAULT_MEMORY_TOLERANCE
+    )
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    args = parser.parse_args(argv)
+
+    current: Dict[str, Any] = {}
+    for size in args.sizes:
+        started = time.perf_counter()
+        current[str(size)] = run_size(size, args.repeats, args.max_files)
+        print(f"== {size} 题（{time.perf_counter() - started:.1f}s）")
+        for name, result in current[str(size)].items():
+            print(
+                f"   {name:<22} {result['ms']:>10.3f} ms "
+                f"{result['peak_kb']:>10.1f} KB"
+            )
+
+    status = 0
+    if args.check:
+        if not args.baseline.exists():
+            print(f"基线不存在：{args.baseline}")
+            return 1
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        regressions = compare(
+            current, baseline, args.tolerance, args.memory_tolerance
+        )
+        missing = missing_entries(current, baseline)
+        if missing:
+            print("以下项目没有基线，未参与对比：")
+            for line in missing:
+                print("  " + line)
+        if regressions:
+            print("性能回退：")
+            for line in regressions:
+                print("  " + line)
+            status = 1
+        else:
+            print("未发现性能回退。")
+    if args.save_baseline:
+        baseline = (
+            json.loads(args.baseline.read_text(encoding="utf-8"))
+            if args.baseline.exists()
+            else {}
+        )
+        baseline.update(current)
+        args.baseline.write_text(
+            json.dumps(baseline, ensure_ascii=False, indent=2) + "\n", encoding="utf-8"
+        )
+        print(f"已保存基线：{args.baseline}")
+    return status
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,56 @@
+import itertools
+import json
+import sys
+import threading
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT_DIR))
+
+from utils import data_manager  # noqa: E402
+from utils.fake_ai_server import FakeAIHandler  # noqa: E402
+
+
+def make_catalog(size: int):
+    return [
+        {
+            "id": str(index),
+            "title": f"{index}. Problem {index}",
+            "difficulty": "Easy",
+            "url": f"https://leetcode.cn/problems/problem-{index}/",
+            "tags": ["数组"],
+            "pattern_hint": "【数组】一次遍历，O(n)。",
+            **data_manager.PROGRESS_DEFAULTS,
+        }
+        for index in range(1, size + 1)
+    ]
+
+
+@pytest.fixture
+def workspace(tmp_path):
+    # 每个用例一份临时数据目录，结束后切回仓库自己的数据
+    data_path = tmp_path / "data" / "problems.json"
+    data_path.parent.mkdir(parents=True)
+    data_path.write_text(json.dumps(make_catalog(20), ensure_ascii=False), "utf-8")
+    data_manager.configure_root(tmp_path)
+    yield data_manager.current_workspace()
+    data_manager.configure_root(ROOT_DIR)
+
+
+@pytest.fixture
+def fake_ai():
+    # 本地桩服务跑在随机端口；用例通过返回的 handler 类调整延迟和故障注入
+    attributes = {"token_delay": 0.0, "_counter": itertools.count(1)}
+    handler = type("Handler", (FakeAIHandler,), attributes)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(
+        target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+    )
+    thread.start()
+    handler.base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    yield handler
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,60 @@
+import os
+
+from utils import ai_cache
+from utils.ai_cache import ResponseCache, cached_chat
+
+
+def _size(cache, key):
+    return cache._path(key).stat().st_size
+
+
+def test_lru_evicts_least_recently_read(tmp_path):
+    cache = ResponseCache(tmp_path, max_bytes=10**6)
+    cache.put("aa1", "x" * 100)
+    cache.put("bb2", "y" * 100)
+    os.utime(cache._path("aa1"), (1000, 1000))
+    os.utime(cache._path("bb2"), (2000, 2000))
+    assert cache.get("aa1") == "x" * 100  # 读取会刷新 mtime，aa1 变成最近使用
+    cache.max_bytes = _size(cache, "aa1") * 2 + 10
+    cache._total_bytes = None
+    cache.put("cc3", "z" * 100)
+    assert cache.get("bb2") is None
+    assert cache.get("aa1") == "x" * 100
+    assert cache.get("cc3") == "z" * 100
+
+
+def test_ttl_expires_entries(tmp_path, monkeypatch):
+    cache = ResponseCache(tmp_path, ttl_seconds=60)
+    cache.put("key", "answer")
+    assert cache.get("key") == "answer"
+    now = ai_cache.time.time()
+    monkeypatch.setattr(ai_cache.time, "time", lambda: now + 120)
+    assert cache.get("key") is None
+    assert not cache._path("key").exists()
+
+
+def test_cached_chat_counts_hits_and_misses(tmp_path, fake_ai):
+    cache = ResponseCache(tmp_path)
+    messages = [{"role": "user", "content": "提示  一下"}]
+    args = dict(model="fake", base_url=fake_ai.base_url, api_key="key")
+    ok, first, from_cache = cached_chat(cache, messages, **args)
+    assert ok and not from_cache
+    # 空白差异归一化后命中同一个 key
+    same = [{"role": "user", "content": "提示 一下"}]
+    ok, second, from_cache = cached_chat(cache, same, **args)
+    assert ok and from_cache and second == first
+    ok, streamed, from_cache = cached_chat(cache, same, stream=True, **args)
+    assert from_cache and streamed == first
+    assert cache.stats() == {"hits": 2, "misses": 1}
+
+
+def test_streamed_answer_is_cached_after_completion(tmp_path, fake_ai):
+    cache = ResponseCache(tmp_path)
+    messages = [{"role": "user", "content": "流式"}]
+    args = dict(model="fake", base_url=fake_ai.base_url, api_key="key")
+    ok, tokens, from_cache = cached_chat(cache, messages, stream=True, **args)
+    assert ok and not from_cache
+    key = cache.make_key("fake", fake_ai.base_url, messages)
+    assert cache.get(key) is None  # 流还没读完，不写缓存
+    answer = "".join(tokens)
+    assert cache.get(key) == answer
@@ -0,0 +1,103 @@
+import http.client
+import io
+from types import SimpleNamespace
+
+import pytest
+
+from utils import ai_client
+from utils.fake_ai_server import _reply_for
+
+
+class BrokenConnection:
+    def __init__(self, sent):
+        self.sent = sent
+
+    def request(self, *args, **kwargs):
+        self.sent.append(args)
+        raise http.client.RemoteDisconnected("closed")
+
+    def close(self):
+        pass
+
+
+class StalePool:
+    # 每次都交出一条“复用”的连接，而且都已失效
+    def __init__(self):
+        self.sent = []
+
+    def acquire(self, key, timeout):
+        return BrokenConnection(self.sent), True
+
+
+def test_failed_reused_connections_count_as_attempts(monkeypatch):
+    pool = StalePool()
+    monkeypatch.setattr(ai_client, "_POOL", pool)
+    monkeypatch.setattr(ai_client, "time", SimpleNamespace(sleep=lambda _: None))
+    with pytest.raises(http.client.RemoteDisconnected):
+        ai_client._post_chat(
+            [{"role": "user", "content": "hi"}],
+            "model",
+            "https://example.invalid/v1",
+            "key",
+            stream=True,
+            timeout=1.0,
+        )
+    assert len(pool.sent) == ai_client.MAX_RETRIES + 1
+
+
+class FakeResponse(io.BytesIO):
+    def isclosed(self):
+        return self.closed
+
+
+def test_sse_tokens_stop_at_done():
+    body = (
+        b": keep-alive comment\n\n"
+        b'data: {"choices": [{"delta": {"role": "assistant"}}]}\n\n'
+        b'data: {"choices": [{"delta": {"content": "\xe4\xbd\xa0\xe5\xa5\xbd"}}]}\n\n'
+        b"data: not json\n\n"
+        b'data: {"choices": [{"delta": {"content": "!"}}]}\n\n'
+        b"data: [DONE]\n\n"
+        b'data: {"choices": [{"delta": {"content": "after done"}}]}\n\n'
+    )
+    done = []
+    tokens = ai_client._iter_sse_tokens(FakeResponse(body), lambda: done.append(1))
+    assert list(tokens) == ["你好", "!"]
+    assert done == [1]
+
+
+def test_stream_against_stub_server(fake_ai):
+    messages = [{"role": "user", "content": "怎么做"}]
+    ok, tokens = ai_client.stream_openai_compatible(
+        messages, "fake", fake_ai.base_url, "key"
+    )
+    assert ok
+    assert "".join(tokens) == _reply_for(messages)
+
+
+@pytest.mark.parametrize("status", [429, 503])
+def test_retries_honour_retry_after(fake_ai, monkeypatch, status):
+    delays = []
+    monkeypatch.setattr(ai_client, "time", SimpleNamespace(sleep=delays.append))
+    fake_ai.fail_every = 1
+    fake_ai.fail_status = status
+    fake_ai.retry_after = "3"
+    ok, content = ai_client.call_openai_compatible(
+        [{"role": "user", "content": "hi"}], "fake", fake_ai.base_url, "key"
+    )
+    assert not ok and str(status) in content
+    assert delays == [3.0] * ai_client.MAX_RETRIES
+
+
+def test_transient_failure_is_retried(fake_ai, monkeypatch):
+    delays = []
+    monkeypatch.setattr(ai_client, "time", SimpleNamespace(sleep=delays.append))
+    fake_ai.fail_every = 2  # 第 2 个请求失败，重试的第 3 个成功
+    fake_ai.fail_status = 502
+    fake_ai.retry_after = None
+    messages = [{"role": "user", "content": "hi"}]
+    args = (messages, "fake", fake_ai.base_url, "key")
+    assert ai_client.call_openai_compatible(*args)[0]
+    ok, content = ai_client.call_openai_compatible(*args)
+    assert ok and content == _reply_for(messages)
+    assert len(delays) == 1 and 0 < delays[0] <= ai_client.BACKOFF_BASE
@@ -0,0 +1,33 @@
+import pytest
+
+from utils.ai_context import MIN_PROMPT_TOKENS, build_messages, estimate_tokens
+
+QUESTION = {
+    "title": "两数之和",
+    "difficulty": "简单",
+    "tags": ["数组", "哈希表"],
+    "pattern_hint": "用哈希表记录每个数的下标，一次遍历时查找目标差值是否已经出现过",
+}
+HISTORY = [
+    {"role": "user", "content": f"第 {i} 个问题：为什么要用哈希表？" * 3}
+    if i % 2 == 0
+    else {"role": "assistant", "content": "因为查找是 O(1) 的。" * 5}
+    for i in range(12)
+]
+NOTES = [(f"2026-10-0{i}", "先想暴力解法，再用空间换时间。" * 4) for i in range(1, 6)]
+CODE = "class Solution:\n    def twoSum(self, nums, target):\n        seen = {}\n" * 8
+PROMPT = "请给我一点提示，我不知道怎么把复杂度从平方降下来。" * 10
+
+
+@pytest.mark.parametrize("budget", [50, 80, 120, 200, 400, 2000])
+def test_total_never_exceeds_budget(budget):
+    messages, report = build_messages(
+        PROMPT, QUESTION, HISTORY, code=CODE, notes=NOTES, budget=budget
+    )
+    assert report["total"] <= budget
+    assert messages[-1]["role"] == "user"
+
+
+def test_tight_budget_keeps_part_of_the_prompt():
+    messages, _ = build_messages(PROMPT, QUESTION, budget=50)
+    assert estimate_tokens(messages[-1]["content"]) >= MIN_PROMPT_TOKENS
@@ -0,0 +1,79 @@
+import json
+import multiprocessing
+from datetime import date
+
+from utils import data_manager
+from utils.analytics import ProgressAnalytics
+
+
+def _solve_elsewhere(root, question_ids):
+    data_manager.configure_root(root)
+    for question_id in question_ids:
+        data_manager.update_status(question_id, "code", "")
+
+
+def test_writes_from_another_process_are_picked_up(workspace):
+    analytics = ProgressAnalytics(workspace.cache_dir / "a.json", backfill_git=False)
+    assert analytics.summary()["solved"] == 0
+
+    process = multiprocessing.Process(
+        target=_solve_elsewhere, args=(workspace.root, ["1", "2", "3", "4", "5"])
+    )
+    process.start()
+    process.join(timeout=60)
+    assert process.exitcode == 0
+
+    stats = analytics.stats()
+    assert sorted(stats["solved"], key=int) == ["1", "2", "3", "4", "5"]
+    assert stats["daily"][date.today().isoformat()] == 5
+    # 新实例从落盘的统计起步，同样一致
+    fresh = ProgressAnalytics(workspace.cache_dir / "a.json", backfill_git=False)
+    assert fresh.summary()["solved"] == 5
+
+
+def test_compaction_and_resets_keep_counts_consistent(workspace, monkeypatch):
+    # 阈值压到 1 字节，每次追加都会压缩回快照，只能靠整体重算 + 事件补记打卡
+    analytics = ProgressAnalytics(workspace.cache_dir / "a.json", backfill_git=False)
+    analytics.stats()
+    monkeypatch.setattr(data_manager, "COMPACT_THRESHOLD_BYTES", 1)
+    data_manager.update_status("1", "code", "")
+    analytics.handle("solved", "1")
+    data_manager.update_status("2", "code", "")
+    analytics.handle("solved", "2")
+    data_manager.reset_question_data("1")
+    stats = analytics.stats()
+    assert stats["solved"] == ["2"]
+    assert stats["daily"][date.today().isoformat()] == 2
+    data_manager.reset_all_questions()
+    assert analytics.summary()["solved"] == 0
+
+
+def test_only_submits_count_toward_daily(workspace):
+    analytics = ProgressAnalytics(workspace.cache_dir / "a.json", backfill_git=False)
+    analytics.stats()
+    review = {"ease": 2.5, "interval": 1, "repetitions": 1, "due": "2026-01-02"}
+    data_manager.import_progress(
+        [{"id": str(i), "status": "solved", "review": review} for i in (1, 2, 3)]
+    )
+    with workspace.progress_path.open("a", encoding="utf-8") as handle:
+        record = {"id": "4", "op": "submit", "status": "solved"}
+        record["ts"] = "2026-01-01T09:00:00"
+        handle.write(json.dumps(record) + "\n")
+    stats = analytics.stats()
+    assert len(stats["solved"]) == 4
+    assert stats["daily"] == {"2026-01-01": 1}
+
+
+def test_events_do_not_rewrite_the_file_every_time(workspace):
+    path = workspace.cache_dir / "a.json"
+    analytics = ProgressAnalytics(path, backfill_git=False)
+    analytics.stats()
+    analytics.flush()
+    saved = path.stat().st_mtime_ns
+    for question_id in ("1", "2", "3"):
+        data_manager.update_status(question_id, "code", "")
+        analytics.handle("solved", question_id)
+    assert path.stat().st_mtime_ns == saved
+    analytics.flush()
+    fresh = ProgressAnalytics(path, backfill_git=False)
+    assert fresh.summary()["solved"] == 3
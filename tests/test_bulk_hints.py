@@ -0,0 +1,52 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from utils import ai_cache, ai_client, bulk_hints
+
+
+@pytest.fixture
+def hint_config(fake_ai, tmp_path, monkeypatch):
+    monkeypatch.setattr(ai_cache, "CACHE_DIR", tmp_path / "ai_cache")
+    monkeypatch.setattr(ai_cache, "_CACHE", None)
+    return {"model": "fake", "base_url": fake_ai.base_url, "api_key": "key"}
+
+
+def _ids(path):
+    return [json.loads(line)["id"] for line in path.read_text("utf-8").splitlines()]
+
+
+def test_resume_skips_done_questions(workspace, tmp_path, hint_config):
+    output = tmp_path / "hints.jsonl"
+    output.write_text(json.dumps({"id": "1", "content": "已有"}) + "\n", "utf-8")
+    counts = bulk_hints.generate_hints(
+        concurrency=2, rate=0, output=output, limit=3, ai_cfg=hint_config
+    )
+    assert counts == {"done": 3, "failed": 0, "skipped": 1}
+    assert sorted(_ids(output), key=int) == ["1", "2", "3", "4"]
+
+    counts = bulk_hints.generate_hints(
+        concurrency=4, rate=0, output=output, ai_cfg=hint_config
+    )
+    assert counts == {"done": 16, "failed": 0, "skipped": 4}
+    assert sorted(_ids(output), key=int) == [str(i) for i in range(1, 21)]
+    assert bulk_hints.get_hint("1", output) == "已有"
+    assert bulk_hints.get_hint("2", output)
+
+
+def test_failed_questions_are_retried_on_next_run(
+    workspace, tmp_path, hint_config, fake_ai, monkeypatch
+):
+    monkeypatch.setattr(ai_client, "time", SimpleNamespace(sleep=lambda _: None))
+    fake_ai.fail_every = 1
+    output = tmp_path / "hints.jsonl"
+    counts = bulk_hints.generate_hints(
+        concurrency=2, rate=0, output=output, limit=2, ai_cfg=hint_config
+    )
+    assert counts == {"done": 0, "failed": 2, "skipped": 0}
+    fake_ai.fail_every = 0
+    counts = bulk_hints.generate_hints(
+        concurrency=2, rate=0, output=output, limit=2, ai_cfg=hint_config
+    )
+    assert counts == {"done": 2, "failed": 0, "skipped": 0}
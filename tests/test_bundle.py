@@ -0,0 +1,61 @@
+import json
+import os
+import re
+import tarfile
+
+from utils import bundle, data_manager
+
+
+def _solve(question_id, code):
+    data_manager.update_status(question_id, code, "", quality=4)
+
+
+def test_local_progress_after_export_is_kept(workspace, tmp_path):
+    _solve("1", "v1")
+    bundle.export_bundle(tmp_path / "backup.tar.gz")
+    _solve("1", "v2")
+    bundle.import_bundle(tmp_path / "backup.tar.gz")
+    assert data_manager.get_question("1")["my_code"] == "v2"
+
+
+def test_newer_bundle_wins_even_if_local_files_were_touched(workspace, tmp_path):
+    _solve("1", "v1")
+    _solve("1", "v2")
+    bundle.export_bundle(tmp_path / "backup.tar.gz")
+    _solve("1", "v1")
+    # 本地记录早于导出时间，但文件 mtime 被复制/同步工具改到了未来
+    journal = workspace.progress_path
+    text = journal.read_text("utf-8")
+    text = re.sub(r'"ts": "[^"]+"', '"ts": "2000-01-01T00:00:00"', text)
+    journal.write_text(text, encoding="utf-8")
+    future = journal.stat().st_mtime + 3600
+    for path in data_manager.progress_paths():
+        os.utime(path, (future, future))
+    assert data_manager.get_question("1")["my_code"] == "v1"
+    bundle.import_bundle(tmp_path / "backup.tar.gz")
+    assert data_manager.get_question("1")["my_code"] == "v2"
+
+
+def test_manifest_records_export_time(workspace, tmp_path):
+    bundle.export_bundle(tmp_path / "backup.tar.gz")
+    with tarfile.open(tmp_path / "backup.tar.gz", "r:gz") as archive:
+        manifest = json.load(archive.extractfile(bundle.MANIFEST_NAME))
+    assert manifest["exported"] > 0
+
+
+def test_freshness_is_decided_per_question(workspace, tmp_path):
+    _solve("1", "v2")
+    bundle.export_bundle(tmp_path / "backup.tar.gz")
+    _solve("1", "v1")
+    journal = workspace.progress_path
+    text = journal.read_text("utf-8")
+    text = re.sub(r'"ts": "[^"]+"', '"ts": "2000-01-01T00:00:00"', text)
+    journal.write_text(text, encoding="utf-8")
+    local_review = data_manager.get_question("1")["review"]
+    # 导出之后另一道题的提交不影响题 1 的判断
+    _solve("2", "other")
+    bundle.import_bundle(tmp_path / "backup.tar.gz")
+    question = data_manager.get_question("1")
+    assert question["my_code"] == "v2"
+    assert question["review"] == local_review
+    assert data_manager.get_question("2")["my_code"] == "other"
@@ -0,0 +1,84 @@
+import json
+
+import pytest
+
+from utils import complexity, judge
+
+LINEAR = """
+class Solution:
+    def total(self, nums):
+        return sum(nums)
+"""
+FOREVER = """
+class Solution:
+    def total(self, nums):
+        while True:
+            pass
+"""
+SLOW_AT_SCALE = """
+import time
+
+
+class Solution:
+    def total(self, nums):
+        if len(nums) > 100:
+            time.sleep(60)
+        return 0
+"""
+
+
+@pytest.fixture
+def bench_spec(tmp_path, monkeypatch):
+    path = tmp_path / "testcases.json"
+    spec = {"method": "total", "cases": [], "bench": {"args": ["int_list"]}}
+    path.write_text(json.dumps({"1": spec}), "utf-8")
+    monkeypatch.setattr(judge, "TESTCASES_PATH", path)
+    monkeypatch.setattr(judge, "_TESTCASES_MTIME", None)
+    monkeypatch.setattr(complexity, "SIZE_TIME_LIMIT_SECONDS", 0.5)
+    yield path
+    judge._reset_pool()
+
+
+@pytest.mark.parametrize(
+    "times",
+    [
+        [1.00, 1.02, 1.05, 1.04, 1.08, 1.10, 1.12],
+        [0.50, 1.00, 1.00, 1.00, 1.00, 1.00, 1.00],
+        [0.60, 0.90, 1.00, 1.00, 1.00, 1.10, 1.20],
+    ],
+)
+def test_flat_timings_fit_constant(times):
+    sizes = [64, 128, 256, 512, 1024, 2048, 4096]
+    assert complexity.fit_complexity(sizes, times) == "O(1)"
+
+
+@pytest.mark.parametrize(
+    "func, expected",
+    [
+        (lambda n: 3.0 * n, "O(n)"),
+        (lambda n: 0.5 * n * n, "O(n^2)"),
+        (lambda n: 2.0 * n.bit_length(), "O(log n)"),
+    ],
+)
+def test_growing_timings_fit_their_class(func, expected):
+    sizes = [64, 128, 256, 512, 1024, 2048, 4096]
+    assert complexity.fit_complexity(sizes, [func(n) for n in sizes]) == expected
+
+
+def test_benchmark_runs_in_judge_worker(bench_spec):
+    result = complexity.benchmark_code(LINEAR, "1", sizes=[64, 128], repeats=1)
+    assert result["sizes"] == [64, 128]
+    assert "stopped" not in result
+
+
+def test_infinite_loop_is_stopped(bench_spec):
+    result = complexity.benchmark_code(FOREVER, "1", sizes=[64], repeats=1)
+    assert result["error"] == "n=64 运行失败: Time Limit Exceeded"
+
+
+def test_timeout_at_scale_keeps_measured_sizes(bench_spec):
+    result = complexity.benchmark_code(
+        SLOW_AT_SCALE, "1", sizes=[64, 128, 256], repeats=1
+    )
+    assert result["sizes"] == [64]
+    assert result["stopped"].startswith("n=128 Time Limit Exceeded")
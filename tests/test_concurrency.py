@@ -0,0 +1,74 @@
+import json
+import multiprocessing
+
+from tests.conftest import make_catalog
+from utils import data_manager
+from utils.data_manager import QuestionStore
+
+WRITERS = 8
+PER_WRITER = 25
+
+
+def _writer(root, question_ids):
+    data_manager.configure_root(root)
+    # 把压缩阈值压低，让快照重写和其他进程的追加交错发生
+    data_manager.COMPACT_THRESHOLD_BYTES = 4096
+    for question_id in question_ids:
+        data_manager.update_status(question_id, f"code-{question_id}", "")
+
+
+def test_concurrent_writers_lose_no_updates(tmp_path):
+    data_path = tmp_path / "data" / "problems.json"
+    data_path.parent.mkdir(parents=True)
+    data_path.write_text(
+        json.dumps(make_catalog(WRITERS * PER_WRITER), ensure_ascii=False), "utf-8"
+    )
+    ids = [str(index) for index in range(1, WRITERS * PER_WRITER + 1)]
+    processes = [
+        multiprocessing.Process(target=_writer, args=(tmp_path, ids[i::WRITERS]))
+        for i in range(WRITERS)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(timeout=120)
+        assert process.exitcode == 0
+
+    progress_path = data_path.parent / "progress.jsonl"
+    if progress_path.exists():
+        raw = progress_path.read_bytes()
+        assert not raw or raw.endswith(b"\n")
+        for line in raw.splitlines():
+            json.loads(line)
+    json.loads(data_path.read_text(encoding="utf-8"))
+
+    store = QuestionStore(data_path, progress_path)
+    by_id = {q["id"]: q for q in store.questions()}
+    assert all(by_id[i]["status"] == "solved" for i in ids)
+    assert all(by_id[i]["my_code"] == f"code-{i}" for i in ids)
+
+
+def _submitter(root, count):
+    data_manager.configure_root(root)
+    for _ in range(count):
+        data_manager.update_status("1", "code", "", quality=5)
+
+
+def test_concurrent_submits_build_on_each_other(tmp_path):
+    data_path = tmp_path / "data" / "problems.json"
+    data_path.parent.mkdir(parents=True)
+    data_path.write_text(json.dumps(make_catalog(5), ensure_ascii=False), "utf-8")
+    processes = [
+        multiprocessing.Process(target=_submitter, args=(tmp_path, PER_WRITER))
+        for _ in range(4)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(timeout=120)
+        assert process.exitcode == 0
+
+    store = QuestionStore(data_path, data_path.parent / "progress.jsonl")
+    review = {q["id"]: q for q in store.questions()}["1"]["review"]
+    # 每次提交都读到了上一次的结果，重复次数不会因并发而丢失
+    assert review["repetitions"] == 4 * PER_WRITER
@@ -0,0 +1,33 @@
+import json
+
+from utils import data_manager
+from utils.facets import get_facet_index
+
+
+def _external_solve(workspace, question_ids):
+    # 模拟另一个进程直接追加进度日志
+    with workspace.progress_path.open("a", encoding="utf-8") as handle:
+        for question_id in question_ids:
+            record = {"id": question_id, "status": "solved", "my_code": "x"}
+            handle.write(json.dumps(record) + "\n")
+
+
+def test_external_writes_are_not_lost_on_local_event(workspace):
+    index = get_facet_index()
+    assert index.counts()["status"].get("solved", 0) == 0
+    _external_solve(workspace, ["1", "2", "3"])
+    data_manager.update_status("4", "code", "")
+    assert index.counts()["status"]["solved"] == 4
+    solved = index.query(status=["solved"])
+    assert index.ids(solved) == ["1", "2", "3", "4"]
+    data_manager.reset_question_data("2")
+    assert index.ids(index.query(status=["solved"])) == ["1", "3", "4"]
+
+
+def test_changes_since_reports_external_ids(workspace):
+    store = data_manager.get_store()
+    store.questions()
+    version = store.version
+    _external_solve(workspace, ["5"])
+    data_manager.update_status("6", "code", "")
+    assert store.changes_since(version) == {"5", "6"}
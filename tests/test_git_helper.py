@@ -0,0 +1,58 @@
+import subprocess
+
+import pytest
+
+from utils import git_helper
+from utils.git_helper import GitWorker
+
+
+def _git(*args):
+    return subprocess.run(
+        ["git", *args], capture_output=True, text=True, check=True
+    ).stdout
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    _git("init", "-q")
+    _git("config", "user.email", "test@example.com")
+    _git("config", "user.name", "test")
+    (tmp_path / "seed.txt").write_text("seed", encoding="utf-8")
+    _git("add", "seed.txt")
+    _git("commit", "-q", "-m", "seed")
+    return tmp_path
+
+
+def test_missing_path_does_not_block_batch(repo):
+    (repo / "a.md").write_text("a", encoding="utf-8")
+    (repo / "b.md").write_text("b", encoding="utf-8")
+    worker = GitWorker()
+    worker._commit([(["a.md"], "a"), (["gone.md"], "gone"), (["b.md"], "b")])
+    assert worker.status()["commit"]["state"] == "ok"
+    assert _git("ls-files").split() == ["a.md", "b.md", "seed.txt"]
+
+
+def test_deleted_tracked_file_is_committed(repo):
+    (repo / "seed.txt").unlink()
+    worker = GitWorker()
+    worker._commit([(["seed.txt"], "remove seed")])
+    assert worker.status()["commit"]["state"] == "ok"
+    assert _git("ls-files").split() == []
+
+
+def test_failed_batch_falls_back_to_single_commits(repo, monkeypatch):
+    (repo / "a.md").write_text("a", encoding="utf-8")
+    (repo / "b.md").write_text("b", encoding="utf-8")
+    original = git_helper.git_add_commit
+
+    def flaky(paths, message):
+        if len(paths) > 1:
+            return subprocess.CompletedProcess([], 1, "", "batch failed")
+        return original(paths, message)
+
+    monkeypatch.setattr(git_helper, "git_add_commit", flaky)
+    worker = GitWorker()
+    worker._commit([(["a.md"], "a"), (["b.md"], "b")])
+    assert worker.status()["commit"]["state"] == "ok"
+    assert _git("log", "--format=%s").split() == ["b", "a", "seed"]
@@ -0,0 +1,30 @@
+from utils import data_manager
+from utils.data_manager import QuestionStore
+
+
+def test_truncated_tail_is_repaired_before_append(workspace):
+    data_manager.update_status("1", "code-1", "")
+    # 模拟写到一半崩溃：末尾留下没有换行的残行
+    with workspace.progress_path.open("ab") as handle:
+        handle.write(b'{"id": "2", "status": "sol')
+    data_manager.update_status("3", "code-3", "")
+
+    fresh = QuestionStore(workspace.data_path, workspace.progress_path)
+    by_id = {q["id"]: q for q in fresh.questions()}
+    assert by_id["1"]["status"] == "solved"
+    assert by_id["2"]["status"] == "unsolved"
+    assert by_id["3"]["my_code"] == "code-3"
+    assert workspace.progress_path.read_bytes().endswith(b"\n")
+
+
+def test_replay_skips_undecodable_lines(workspace):
+    data_manager.update_status("1", "code-1", "")
+    with workspace.progress_path.open("ab") as handle:
+        handle.write(b'{"id": "2", "status": "sol{"id": "4"}\n')
+    data_manager.update_status("5", "code-5", "")
+
+    fresh = QuestionStore(workspace.data_path, workspace.progress_path)
+    by_id = {q["id"]: q for q in fresh.questions()}
+    assert by_id["1"]["status"] == "solved"
+    assert by_id["5"]["status"] == "solved"
+    assert by_id["2"]["status"] == "unsolved"
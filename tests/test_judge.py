@@ -0,0 +1,46 @@
+import json
+
+import pytest
+
+from utils import judge
+
+OK = """
+class Solution:
+    def add(self, a, b):
+        return a + b
+"""
+KILLER = """
+import os
+import signal
+
+
+class Solution:
+    def add(self, a, b):
+        os.kill(os.getpid(), signal.SIGKILL)
+"""
+
+
+@pytest.fixture
+def testcases(tmp_path, monkeypatch):
+    path = tmp_path / "testcases.json"
+    cases = [{"args": [i, i], "expected": 2 * i} for i in range(4)]
+    path.write_text(json.dumps({"1": {"method": "add", "cases": cases}}), "utf-8")
+    monkeypatch.setattr(judge, "TESTCASES_PATH", path)
+    monkeypatch.setattr(judge, "_TESTCASES_MTIME", None)
+    yield path
+    judge._reset_pool()
+
+
+def test_killed_worker_does_not_fail_other_submissions(testcases):
+    reports = judge.judge_many([("1", OK), ("1", KILLER), ("1", OK)])
+    assert [report["status"] for report in reports] == [
+        "accepted",
+        "runtime_error",
+        "accepted",
+    ]
+    assert all("Killed" in result["error"] for result in reports[1]["results"])
+
+
+def test_pool_recovers_after_a_kill(testcases):
+    judge.judge_many([("1", KILLER)])
+    assert judge.judge_code("1", OK)["status"] == "accepted"
@@ -0,0 +1,18 @@
+import json
+
+from utils.profiler import RerunProfiler, load_recent_timings
+
+
+def test_flush_writes_one_record_with_labels(tmp_path):
+    path = tmp_path / "timings.jsonl"
+    profiler = RerunProfiler(True, path, labels={"fragment": "render_ai"})
+    with profiler.phase("ai_call"):
+        pass
+    profiler.flush({"question_id": "1"})
+    # st.rerun() 前已经 flush 过，收尾再 flush 不应重复写
+    profiler.flush({"question_id": "1"})
+    records = [json.loads(line) for line in path.read_text("utf-8").splitlines()]
+    assert len(records) == 1
+    assert records[0]["fragment"] == "render_ai"
+    assert "ai_call" in records[0]["phases"]
+    assert load_recent_timings(path=path)[0]["question_id"] == "1"
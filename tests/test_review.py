@@ -0,0 +1,47 @@
+import json
+from datetime import date
+
+from utils import data_manager
+from utils.review import DEFAULT_EASE, MAX_INTERVAL, sm2_update
+
+TODAY = date(2026, 10, 1)
+
+
+def test_failed_recall_resets_schedule_but_keeps_ease():
+    review = {"ease": 2.3, "interval": 15, "repetitions": 4}
+    updated = sm2_update(review, 2, TODAY)
+    assert updated["ease"] == 2.3
+    assert updated["repetitions"] == 0
+    assert updated["interval"] == 1
+    assert updated["due"] == "2026-10-02"
+
+
+def test_successful_recall_adjusts_ease_and_grows_interval():
+    first = sm2_update(None, 5, TODAY)
+    assert first["interval"] == 1
+    assert first["ease"] == round(DEFAULT_EASE + 0.1, 2)
+    second = sm2_update(first, 3, TODAY)
+    assert second["interval"] == 6
+    assert second["ease"] < first["ease"]
+    third = sm2_update(second, 4, TODAY)
+    assert third["interval"] == round(6 * second["ease"])
+
+
+def test_review_queue_picks_up_external_solves(workspace):
+    assert data_manager.next_review_due() is None
+    with workspace.progress_path.open("a", encoding="utf-8") as handle:
+        for question_id in ("1", "2", "3"):
+            record = {"id": question_id, "status": "solved", "review": None}
+            handle.write(json.dumps(record) + "\n")
+    data_manager.update_status("4", "code", "")
+    due = [data_manager.next_review_question() for _ in range(3)]
+    assert sorted(q["id"] for q in due) == ["1", "2", "3"]
+    assert data_manager.next_review_question() is None
+    assert len(workspace.review_queue) == 1
+
+
+def test_interval_is_capped():
+    review = None
+    for _ in range(60):
+        review = sm2_update(review, 5, TODAY)
+    assert review["interval"] == MAX_INTERVAL
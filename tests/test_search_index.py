@@ -0,0 +1,28 @@
+from utils.search_index import SearchIndex, tokenize
+
+
+def _index(tmp_path, files):
+    for rel_path, text in files.items():
+        path = tmp_path / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding="utf-8")
+    return SearchIndex(tmp_path, tmp_path / ".cache" / "index.json", min_interval=0)
+
+
+def test_single_character_cjk_query(tmp_path):
+    index = _index(
+        tmp_path,
+        {
+            "notes/001_a.md": "用单调栈维护下一个更大元素",
+            "notes/002_b.md": "二叉树的层序遍历，模拟队列",
+        },
+    )
+    assert [path for path, _ in index.search("栈")] == ["notes/001_a.md"]
+    assert [path for path, _ in index.search("树")] == ["notes/002_b.md"]
+    assert index.search("模拟 栈") == []
+    assert [path for path, _ in index.search("模拟 树")] == ["notes/002_b.md"]
+
+
+def test_multi_character_query_uses_bigrams_only():
+    assert tokenize("单调栈", query=True) == ["单调", "调栈"]
+    assert set(tokenize("单调栈")) == {"单调", "调栈", "单", "调", "栈"}
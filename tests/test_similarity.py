@@ -0,0 +1,38 @@
+import pytest
+
+from tests.conftest import make_catalog
+from utils import similarity
+
+
+def test_large_catalog_skips_dense_matrix(monkeypatch):
+    def dense(*args):
+        raise AssertionError("不应构建稠密矩阵")
+
+    monkeypatch.setattr(similarity, "np", object())
+    monkeypatch.setattr(similarity, "NUMPY_MAX_ROWS", 10)
+    monkeypatch.setattr(similarity, "_neighbors_numpy", dense)
+    questions = make_catalog(50)
+    neighbors = similarity.build_neighbors(questions, k=5)
+    assert len(neighbors) == 50
+    assert all(len(items) <= 5 for items in neighbors.values())
+
+
+def test_small_catalog_uses_dense_matrix(monkeypatch):
+    calls = []
+    monkeypatch.setattr(similarity, "np", object())
+    monkeypatch.setattr(
+        similarity, "_neighbors_numpy", lambda ids, vectors, k: calls.append(k) or {}
+    )
+    similarity.build_neighbors(make_catalog(20), k=5)
+    assert calls == [5]
+
+
+@pytest.mark.skipif(similarity.np is None, reason="需要 NumPy")
+def test_numpy_and_python_agree():
+    questions = make_catalog(200)
+    ids = [str(q["id"]) for q in questions]
+    vectors = similarity.tfidf_vectors(questions)
+    dense = similarity._neighbors_numpy(ids, vectors, 5)
+    sparse = similarity._neighbors_python(ids, vectors, 5)
+    for key in ids:
+        assert [s for _, s in dense[key]] == pytest.approx([s for _, s in sparse[key]])
@@ -0,0 +1,50 @@
+import subprocess
+
+from utils import data_manager, solution_import
+
+CODE = """
+class Solution:
+    def twoSum(self, nums, target):
+        return []
+"""
+
+
+def _fake_git(calls, returncode=0):
+    def git_add_commit(paths, message):
+        calls.append((paths, message))
+        return subprocess.CompletedProcess([], returncode, "", "index.lock exists")
+
+    return git_add_commit
+
+
+def test_unmatched_and_git_error_are_returned(workspace, tmp_path, monkeypatch, capsys):
+    source = tmp_path / "archive"
+    source.mkdir()
+    (source / "1_two_sum.py").write_text(CODE, encoding="utf-8")
+    (source / "scratch.py").write_text("pass\n", encoding="utf-8")
+    calls = []
+    monkeypatch.setattr(solution_import, "git_add_commit", _fake_git(calls, 1))
+    result = solution_import.import_solutions(source)
+    assert capsys.readouterr().out == ""
+    assert result["unmatched_paths"] == [source / "scratch.py"]
+    assert result["git_error"] == "index.lock exists"
+    assert result["written"] == 1 and len(calls) == 1
+
+
+def test_progress_is_committed_when_all_files_are_duplicates(
+    workspace, tmp_path, monkeypatch
+):
+    source = tmp_path / "archive"
+    source.mkdir()
+    (source / "1_two_sum.py").write_text(CODE, encoding="utf-8")
+    calls = []
+    monkeypatch.setattr(solution_import, "git_add_commit", _fake_git(calls))
+    solution_import.import_solutions(source)
+    data_manager.import_progress([{"id": "1", **data_manager.PROGRESS_DEFAULTS}])
+
+    result = solution_import.import_solutions(source)
+    assert result["written"] == 0 and result["duplicates"] == 1
+    assert data_manager.get_question("1")["status"] == "solved"
+    assert len(calls) == 2
+    paths, _ = calls[1]
+    assert paths == [str(path) for path in data_manager.progress_paths()]
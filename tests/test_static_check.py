@@ -0,0 +1,83 @@
+import pytest
+
+from utils import static_check
+from utils.static_check import analyze_code, check_code, format_cost
+
+LEETCODE_CODE = """
+class Solution:
+    def maxDepth(self, root: Optional[TreeNode]) -> int:
+        if not root:
+            return 0
+        return 1 + max(self.maxDepth(root.left), self.maxDepth(root.right))
+"""
+
+
+def test_leetcode_node_classes_are_not_errors(workspace):
+    review = check_code("from typing import Optional\n" + LEETCODE_CODE)
+    assert review["errors"] == []
+    assert any("TreeNode" in warning for warning in review["warnings"])
+
+
+def test_missing_typing_import_is_still_an_error(workspace):
+    review = check_code(LEETCODE_CODE)
+    assert any("Optional" in error for error in review["errors"])
+    assert not any("TreeNode" in error for error in review["errors"])
+
+
+def _cost(code):
+    return format_cost(tuple(analyze_code(code)["cost"]))
+
+
+@pytest.mark.parametrize(
+    "code, expected",
+    [
+        ("for i in range(n):\n    for j in range(n):\n        pass\n", "O(n^2)"),
+        ("for i in range(n):\n    a.sort()\n", "O(n^2 log n)"),
+        ("nums.sort()\n", "O(n log n)"),
+        ("x = sorted(nums)\n", "O(n log n)"),
+        ("while lo < hi:\n    mid = (lo + hi) // 2\n    lo = mid + 1\n", "O(log n)"),
+        ("i = 1\nwhile i < n:\n    i *= 2\n", "O(log n)"),
+        ("i = 1\nwhile i < n:\n    i <<= 1\n", "O(log n)"),
+        ("i = 1\nwhile i < n:\n    i = i * 2\n", "O(log n)"),
+        ("while i * i <= n:\n    i += 1\n", "O(n)"),
+        ("for x in nums:\n    i = 1\n    while i < n:\n        i *= 2\n", "O(n log n)"),
+    ],
+)
+def test_complexity_estimate(code, expected):
+    assert _cost(code) == expected
+
+
+def test_estimate_is_compared_with_the_hint(workspace):
+    code = "for i in range(n):\n    for j in range(n):\n        pass\n"
+    review = check_code(code, {"pattern_hint": "【哈希表】一次遍历，O(n)，空间 O(n)。"})
+    assert review["expected"] == "O(n)"
+    assert review["estimate"] == "O(n^2)"
+    assert any("高于锦囊" in warning for warning in review["warnings"])
+    review = check_code(code, {"pattern_hint": "【模拟】两层循环，O(n^2)。"})
+    assert review["warnings"] == []
+
+
+def test_analysis_is_cached_by_content_hash(workspace, monkeypatch):
+    calls = []
+
+    def counting(code):
+        calls.append(code)
+        return analyze_code(code)
+
+    monkeypatch.setattr(static_check, "analyze_code", counting)
+    codes = ["x = 1\n", "y = 2\n", "x = 1\n"]
+    first = static_check.analyze_many(codes)
+    assert calls == ["x = 1\n", "y = 2\n"]
+    assert static_check.analyze_many(codes) == first
+    assert len(calls) == 2
+    cache_path = workspace.cache_dir / "static_analysis.json"
+    assert cache_path.exists()
+
+
+def test_process_pool_matches_inline_analysis(workspace, monkeypatch):
+    monkeypatch.setattr(static_check, "POOL_THRESHOLD", 2)
+    codes = [f"for i in range({k}):\n    nums.sort()\n" for k in range(6)]
+    codes.append("def f(:\n")
+    results = static_check.analyze_many(codes, workers=2)
+    assert results == [analyze_code(code) for code in codes]
+    assert results[-1]["syntax_error"]
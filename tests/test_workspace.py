@@ -0,0 +1,14 @@
+import pytest
+
+from utils import data_manager
+
+
+@pytest.mark.parametrize("user", ["alice\n", "", "../alice", "a" * 33, "bob smith"])
+def test_invalid_user_ids_are_rejected(user):
+    with pytest.raises(ValueError):
+        data_manager.get_workspace(user)
+
+
+def test_valid_user_id():
+    workspace = data_manager.get_workspace("alice_01")
+    assert workspace.root == data_manager.USERS_DIR / "alice_01"
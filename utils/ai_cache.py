@@ -0,0 +1,187 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from utils.ai_client import call_openai_compatible, stream_openai_compatible
+from utils.file_utils import atomic_write_text
+
+CACHE_DIR = Path(__file__).resolve().parents[1] / ".cache" / "ai_responses"
+
+
+class ResponseCache:
+    # 内容寻址的磁盘缓存：key = hash(model, base_url, 归一化 messages)，按 mtime 做 LRU 淘汰
+    def __init__(
+        self,
+        root: Path,
+        max_bytes: int = 20 * 1024 * 1024,
+        ttl_seconds: Optional[float] = None,
+    ) -> None:
+        self.root = root
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._total_bytes: Optional[int] = None
+
+    @staticmethod
+    def make_key(model: str, base_url: str, messages: List[Dict[str, str]]) -> str:
+        normalized = [
+            {
+                "role": message.get("role", ""),
+                "content": " ".join(str(message.get("content", "")).split()),
+            }
+            for message in messages
+        ]
+        raw = json.dumps(
+            [model, base_url.rstrip("/"), normalized],
+            ensure_ascii=False,
+            sort_keys=True,
+        )
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        path = self._path(key)
+        try:
+            entry: Dict[str, Any] = json.loads(path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            self._count(hit=False)
+            return None
+        age = time.time() - entry.get("created", 0)
+        if self.ttl_seconds and age > self.ttl_seconds:
+            self._remove(path)
+            self._count(hit=False)
+            return None
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        self._count(hit=True)
+        return entry.get("content")
+
+    def put(self, key: str, content: str) -> None:
+        path = self._path(key)
+        data = json.dumps(
+            {"created": time.time(), "content": content}, ensure_ascii=False
+        )
+        previous = path.stat().st_size if path.exists() else 0
+        atomic_write_text(path, data)
+        with self._lock:
+            if self._total_bytes is not None:
+                self._total_bytes += len(data.encode("utf-8")) - previous
+        self._evict()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+    def _evict(self) -> None:
+        with self._lock:
+            if self._total_bytes is not None and self._total_bytes <= self.max_bytes:
+                return
+            entries = []
+            for path in self.root.glob("*/*.json"):
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries, key=lambda item: item[0]):
+                if total <= self.max_bytes:
+                    break
+                self._remove(path)
+                total -= size
+            self._total_bytes = total
+
+    def _remove(self, path: Path) -> None:
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+
+    def _count(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.json"
+
+
+_CACHE: Optional[ResponseCache] = None
+_CACHE_LOCK = threading.Lock()
+
+
+def get_response_cache(
+    max_bytes: Optional[int] = None, ttl_seconds: Optional[float] = None
+) -> ResponseCache:
+    global _CACHE
+    with _CACHE_LOCK:
+        if _CACHE is None:
+            _CACHE = ResponseCache(CACHE_DIR)
+        if max_bytes is not None:
+            _CACHE.max_bytes = max_bytes
+        _CACHE.ttl_seconds = ttl_seconds
+        return _CACHE
+
+
+def cache_from_config(ai_cfg: Dict[str, str]) -> ResponseCache:
+    try:
+        max_bytes = int(float(ai_cfg.get("cache_max_mb") or 20) * 1024 * 1024)
+    except ValueError:
+        max_bytes = 20 * 1024 * 1024
+    try:
+        ttl_hours = float(ai_cfg.get("cache_ttl_hours") or 0)
+    except ValueError:
+        ttl_hours = 0
+    return get_response_cache(
+        max_bytes=max_bytes, ttl_seconds=ttl_hours * 3600 if ttl_hours else None
+    )
+
+
+def cached_chat(
+    cache: ResponseCache,
+    messages: List[Dict[str, str]],
+    model: str,
+    base_url: str,
+    api_key: str,
+    stream: bool = False,
+    use_cache: bool = True,
+) -> Tuple[bool, Union[Iterator[str], str], bool]:
+    key = cache.make_key(model, base_url, messages)
+    if use_cache:
+        cached = cache.get(key)
+        if cached is not None:
+            return True, cached, True
+    if not stream:
+        ok, content = call_openai_compatible(
+            messages=messages, model=model, base_url=base_url, api_key=api_key
+        )
+        if ok:
+            cache.put(key, content)
+        return ok, content, False
+    ok, tokens = stream_openai_compatible(
+        messages=messages, model=model, base_url=base_url, api_key=api_key
+    )
+    if not ok:
+        return ok, tokens, False
+    return True, _tee_into_cache(cache, key, tokens), False
+
+
+def _tee_into_cache(
+    cache: ResponseCache, key: str, tokens: Iterator[str]
+) -> Iterator[str]:
+    parts: List[str] = []
+    for token in tokens:
+        parts.append(token)
+        yield token
+    # 只有完整读完的回答才写入缓存，中途断开的流不缓存
+    if parts:
+        cache.put(key, "".join(parts))
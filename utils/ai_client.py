@@ -1,9 +1,84 @@
+import http.client
 import json
 import os
+import random
+import ssl
+import threading
+import time
 from pathlib import Path
-import urllib.error
-import urllib.request
-from typing import Any, Dict, List, Tuple
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+from urllib.parse import urlsplit
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+MAX_RETRIES = 3
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 8.0
+
+PoolKey = Tuple[str, str, int]
+
+
+class ConnectionPool:
+    # 按 (scheme, host, port) 复用 keep-alive 连接，省去每次调用的 TCP+TLS 握手
+    def __init__(self, max_idle_per_host: int = 8) -> None:
+        self.max_idle_per_host = max_idle_per_host
+        self._lock = threading.Lock()
+        self._idle: Dict[PoolKey, List[http.client.HTTPConnection]] = {}
+        self._ssl_context = ssl.create_default_context()
+
+    def acquire(
+        self, key: PoolKey, timeout: float
+    ) -> Tuple[http.client.HTTPConnection, bool]:
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                conn = idle.pop()
+                conn.timeout = timeout
+                if conn.sock is not None:
+                    conn.sock.settimeout(timeout)
+                return conn, True
+        scheme, host, port = key
+        if scheme == "https":
+            conn = http.client.HTTPSConnection(
+                host, port, timeout=timeout, context=self._ssl_context
+            )
+        else:
+            conn = http.client.HTTPConnection(host, port, timeout=timeout)
+        return conn, False
+
+    def release(
+        self,
+        key: PoolKey,
+        conn: http.client.HTTPConnection,
+        resp: Optional[http.client.HTTPResponse] = None,
+    ) -> None:
+        reusable = resp is None or (resp.isclosed() and not resp.will_close)
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if reusable and len(idle) < self.max_idle_per_host:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def close(self) -> None:
+        with self._lock:
+            conns = [conn for idle in self._idle.values() for conn in idle]
+            self._idle.clear()
+        for conn in conns:
+            conn.close()
+
+
+_POOL = ConnectionPool()
+
+
+def get_connection_pool() -> ConnectionPool:
+    return _POOL
+
+
+class APIError(Exception):
+    def __init__(self, status: int, reason: str) -> None:
+        super().__init__(f"{status} {reason}")
+        self.status = status
+        self.reason = reason
 
 
 def call_openai_compatible(
@@ -13,22 +88,15 @@ def call_openai_compatible(
     api_key: str,
     timeout: int = 60,
 ) -> Tuple[bool, str]:
-    url = base_url.rstrip("/") + "/chat/completions"
-    payload = {
-        "model": model,
-        "messages": messages,
-    }
-    data = json.dumps(payload).encode("utf-8")
-    req = urllib.request.Request(url, data=data, method="POST")
-    req.add_header("Content-Type", "application/json")
-    req.add_header("Authorization", f"Bearer {api_key}")
-
     try:
-        with urllib.request.urlopen(req, timeout=timeout) as resp:
-            raw = resp.read().decode("utf-8")
-            body: Dict[str, Any] = json.loads(raw)
-    except urllib.error.HTTPError as exc:
-        return False, f"API 错误: {exc.code} {exc.reason}"
+        key, conn, resp = _post_chat(
+            messages, model, base_url, api_key, stream=False, timeout=timeout
+        )
+        raw = resp.read().decode("utf-8")
+        _POOL.release(key, conn, resp)
+        body: Dict[str, Any] = json.loads(raw)
+    except APIError as exc:
+        return False, f"API 错误: {exc.status} {exc.reason}"
     except Exception as exc:
         return False, f"请求失败: {exc}"
 
@@ -38,6 +106,119 @@ def call_openai_compatible(
         return False, "返回格式无法解析。"
 
 
+def stream_openai_compatible(
+    messages: List[Dict[str, str]],
+    model: str,
+    base_url: str,
+    api_key: str,
+    timeout: int = 60,
+) -> Tuple[bool, Union[Iterator[str], str]]:
+    try:
+        key, conn, resp = _post_chat(
+            messages, model, base_url, api_key, stream=True, timeout=timeout
+        )
+    except APIError as exc:
+        return False, f"API 错误: {exc.status} {exc.reason}"
+    except Exception as exc:
+        return False, f"请求失败: {exc}"
+    return True, _iter_sse_tokens(resp, lambda: _POOL.release(key, conn, resp))
+
+
+def _iter_sse_tokens(
+    resp: http.client.HTTPResponse, on_done: Callable[[], None]
+) -> Iterator[str]:
+    # 逐行读取 SSE：每个 "data: {...}" 携带一个增量 delta，"data: [DONE]" 结束
+    try:
+        while True:
+            raw_line = resp.readline()
+            if not raw_line:
+                break
+            line = raw_line.decode("utf-8").strip()
+            if not line.startswith("data:"):
+                continue
+            data = line[len("data:") :].strip()
+            if data == "[DONE]":
+                # 读完剩余字节，连接才能放回池中复用
+                resp.read()
+                break
+            try:
+                chunk: Dict[str, Any] = json.loads(data)
+                delta = chunk["choices"][0].get("delta") or {}
+            except (ValueError, KeyError, IndexError):
+                continue
+            content = delta.get("content")
+            if content:
+                yield content
+    finally:
+        if not resp.isclosed():
+            resp.close()
+        on_done()
+
+
+def _post_chat(
+    messages: List[Dict[str, str]],
+    model: str,
+    base_url: str,
+    api_key: str,
+    stream: bool,
+    timeout: float,
+) -> Tuple[PoolKey, http.client.HTTPConnection, http.client.HTTPResponse]:
+    parts = urlsplit(base_url.rstrip("/") + "/chat/completions")
+    scheme = parts.scheme or "https"
+    port = parts.port or (443 if scheme == "https" else 80)
+    key: PoolKey = (scheme, parts.hostname or "", port)
+    path = parts.path + (f"?{parts.query}" if parts.query else "")
+    payload: Dict[str, Any] = {
+        "model": model,
+        "messages": messages,
+    }
+    if stream:
+        payload["stream"] = True
+    body = json.dumps(payload).encode("utf-8")
+    headers = {
+        "Content-Type": "application/json",
+        "Authorization": f"Bearer {api_key}",
+    }
+    if stream:
+        headers["Accept"] = "text/event-stream"
+
+    attempt = 0
+    while True:
+        conn, reused = _POOL.acquire(key, timeout)
+        try:
+            conn.request("POST", path, body=body, headers=headers)
+            resp = conn.getresponse()
+        except (OSError, http.client.HTTPException):
+            conn.close()
+            if attempt >= MAX_RETRIES:
+                raise
+            # 复用的空闲连接可能已被服务端关闭，换新连接立即重发、不退避；
+            # 但同样计入重试次数，POST 不是幂等的，不能无限重发
+            if not reused:
+                time.sleep(_backoff_delay(attempt, None))
+            attempt += 1
+            continue
+        if resp.status < 400:
+            return key, conn, resp
+        retry_after = resp.getheader("Retry-After")
+        resp.read()
+        _POOL.release(key, conn, resp)
+        if resp.status not in RETRY_STATUS or attempt >= MAX_RETRIES:
+            raise APIError(resp.status, resp.reason)
+        time.sleep(_backoff_delay(attempt, retry_after))
+        attempt += 1
+
+
+def _backoff_delay(attempt: int, retry_after: Optional[str]) -> float:
+    if retry_after:
+        try:
+            return min(float(retry_after), BACKOFF_MAX)
+        except ValueError:
+            pass
+    delay = min(BACKOFF_BASE * (2**attempt), BACKOFF_MAX)
+    return delay * (0.5 + random.random() / 2)
+
+
 def get_ai_config() -> Dict[str, str]:
     file_cfg = _load_local_config()
     return {
@@ -47,6 +228,15 @@ def get_ai_config() -> Dict[str, str]:
         ),
         "model": os.getenv("AI_MODEL", file_cfg.get("AI_MODEL", "deepseek-chat")),
         "api_key": os.getenv("AI_API_KEY", file_cfg.get("AI_API_KEY", "")),
+        "cache_max_mb": os.getenv(
+            "AI_CACHE_MAX_MB", file_cfg.get("AI_CACHE_MAX_MB", "20")
+        ),
+        "cache_ttl_hours": os.getenv(
+            "AI_CACHE_TTL_HOURS", file_cfg.get("AI_CACHE_TTL_HOURS", "")
+        ),
+        "context_tokens": os.getenv(
+            "AI_CONTEXT_TOKENS", file_cfg.get("AI_CONTEXT_TOKENS", "2000")
+        ),
     }
 
 
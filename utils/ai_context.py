@@ -0,0 +1,200 @@
+import math
+import re
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+DEFAULT_BUDGET = 2000
+MESSAGE_OVERHEAD = 4
+CODE_SHARE = 0.5
+RECENT_TURNS = 2
+NOTE_MAX_TOKENS = 200
+SUMMARY_CHARS = 40
+# 预算再紧也要给提问留下这么多 token，不够时先截断优先级更低的题目信息
+MIN_PROMPT_TOKENS = 32
+MAX_STORED_TURNS = 20
+SYSTEM_PROMPT = "你是算法学习助手，给出思路提示而非完整答案。"
+CODE_HEADER = "\n\n我当前的代码：\n```python\n"
+CODE_FOOTER = "\n```"
+NOTES_HEADER = "\n\n我以往的笔记（新到旧）：\n"
+TRUNCATED_MARKER = "…（已截断）"
+
+# 中日韩字符（含全角标点）大致一字一个 token；其余按“单词约 4 字符一个 token、符号各算一个”估算
+_CJK_RE = re.compile(
+    r"[\u3000-\u303f\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uff00-\uffef]"
+)
+_WORD_RE = re.compile(r"[A-Za-z0-9_]+|[^\sA-Za-z0-9_]")
+
+Message = Dict[str, str]
+
+
+def estimate_tokens(text: str) -> int:
+    if not text:
+        return 0
+    cjk = len(_CJK_RE.findall(text))
+    rest = _CJK_RE.sub(" ", text)
+    return cjk + sum(
+        math.ceil(len(word) / 4) if word[0].isalnum() or word[0] == "_" else 1
+        for word in _WORD_RE.findall(rest)
+    )
+
+
+def message_tokens(messages: Sequence[Message]) -> int:
+    return sum(
+        estimate_tokens(message.get("content", "")) + MESSAGE_OVERHEAD
+        for message in messages
+    )
+
+
+def truncate_to_tokens(text: str, limit: int, keep_tail: bool = False) -> str:
+    # 二分找到能放下的最长前缀（或后缀），估算函数单调，切点不会越界
+    if limit <= 0:
+        return ""
+    if estimate_tokens(text) <= limit:
+        return text
+    # 额度连截断标记都放不下时不加标记，保证结果不超过 limit
+    marker = TRUNCATED_MARKER
+    if estimate_tokens(marker) < limit:
+        limit -= estimate_tokens(marker)
+    else:
+        marker = ""
+    low, high = 0, len(text)
+    while low < high:
+        mid = (low + high + 1) // 2
+        part = text[len(text) - mid :] if keep_tail else text[:mid]
+        if estimate_tokens(part) <= limit:
+            low = mid
+        else:
+            high = mid - 1
+    if keep_tail:
+        return marker + text[len(text) - low :]
+    return text[:low] + marker
+
+
+def _turns(history: Sequence[Message]) -> List[List[Message]]:
+    # 一问一答为一轮；裁剪时整轮保留或整轮丢弃，不会留下没有回答的提问
+    turns: List[List[Message]] = []
+    for message in history:
+        if message.get("role") == "user" or not turns:
+            turns.append([message])
+        else:
+            turns[-1].append(message)
+    return turns
+
+
+def _summarize(turns: Sequence[List[Message]]) -> str:
+    asked = [
+        " ".join(turn[0].get("content", "").split())[:SUMMARY_CHARS]
+        for turn in turns
+        if turn and turn[0].get("role") == "user"
+    ]
+    if not asked:
+        return ""
+    return "更早的对话（已省略回答）：" + "；".join(asked)
+
+
+def build_messages(
+    prompt: str,
+    question: Optional[Dict[str, Any]] = None,
+    history: Sequence[Message] = (),
+    code: str = "",
+    notes: Sequence[Tuple[str, str]] = (),
+    budget: int = DEFAULT_BUDGET,
+) -> Tuple[List[Message], Dict[str, Any]]:
+    # 优先级：提问与题目信息 > 当前代码 > 最近几轮对话 > 历史笔记（新到旧）> 更早的对话；
+    # 放不下的部分依次截断或丢弃，更早的对话退化为一行摘要；各段标题也计入预算
+    system = SYSTEM_PROMPT
+    if question is not None:
+        system += (
+            f"\n题目：{question.get('title')}\n"
+            f"难度：{question.get('difficulty')}\n"
+            f"标签：{', '.join(question.get('tags', []))}\n"
+            f"提示：{question.get('pattern_hint')}"
+        )
+    used = MESSAGE_OVERHEAD * 2
+    prompt_floor = min(
+        estimate_tokens(prompt), MIN_PROMPT_TOKENS, max(budget - used, 0)
+    )
+    system = truncate_to_tokens(system, budget - used - prompt_floor)
+    used += estimate_tokens(system)
+    prompt = truncate_to_tokens(prompt, max(budget - used, 0))
+    sections = {"system": estimate_tokens(system), "prompt": estimate_tokens(prompt)}
+    used += sections["prompt"]
+
+    code_block = ""
+    if code.strip():
+        code_limit = int((budget - used) * CODE_SHARE)
+        header_cost = estimate_tokens(CODE_HEADER + CODE_FOOTER)
+        code_text = truncate_to_tokens(code.strip(), code_limit - header_cost)
+        if code_text:
+            code_block = CODE_HEADER + code_text + CODE_FOOTER
+    sections["code"] = estimate_tokens(code_block)
+    used += sections["code"]
+
+    turns = _turns(history)
+    kept_turns: List[List[Message]] = []
+    recent, older = turns[-RECENT_TURNS:], turns[:-RECENT_TURNS]
+
+    def take_turns(candidates: List[List[Message]]) -> None:
+        nonlocal used
+        for turn in reversed(candidates):
+            cost = message_tokens(turn)
+            if used + cost > budget:
+                break
+            kept_turns.append(turn)
+            used += cost
+
+    take_turns(recent)
+
+    note_lines: List[str] = []
+    for stamp, text in notes:
+        entry = f"[{stamp}] " if stamp else ""
+        entry += truncate_to_tokens(text.strip(), NOTE_MAX_TOKENS)
+        # 标题只在第一条笔记放得下时才出现，算进第一条的开销
+        cost = estimate_tokens(entry) + 1
+        if not note_lines:
+            cost += estimate_tokens(NOTES_HEADER)
+        if used + cost > budget:
+            break
+        note_lines.append(entry)
+        used += cost
+    notes_block = ""
+    if note_lines:
+        notes_block = NOTES_HEADER + "\n".join(note_lines)
+    sections["notes"] = estimate_tokens(notes_block)
+
+    if len(kept_turns) == len(recent):
+        take_turns(older)
+    kept_ids = {id(turn) for turn in kept_turns}
+    dropped = [turn for turn in turns if id(turn) not in kept_ids]
+    summary = truncate_to_tokens(_summarize(dropped), budget - used)
+    used += estimate_tokens(summary)
+    summary_block = f"\n\n{summary}" if summary else ""
+
+    messages: List[Message] = [
+        {"role": "system", "content": system + code_block + notes_block + summary_block}
+    ]
+    for turn in turns:
+        if id(turn) in kept_ids:
+            messages.extend(turn)
+    messages.append({"role": "user", "content": prompt})
+
+    sections["history"] = sum(message_tokens(turn) for turn in kept_turns)
+    sections["summary"] = estimate_tokens(summary_block)
+    report = {
+        "budget": budget,
+        "total": message_tokens(messages),
+        "sections": sections,
+        "turns_kept": len(kept_turns),
+        "turns_dropped": len(dropped),
+        "notes_kept": len(note_lines),
+        "notes_dropped": len(notes) - len(note_lines),
+    }
+    return messages, report
+
+
+def append_turn(history: List[Message], prompt: str, answer: str) -> List[Message]:
+    # 会话里只保留最近若干轮原文，更早的本来也只会以摘要形式发送
+    history.extend(
+        [{"role": "user", "content": prompt}, {"role": "assistant", "content": answer}]
+    )
+    del history[: max(len(history) - MAX_STORED_TURNS * 2, 0)]
+    return history
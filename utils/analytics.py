@@ -0,0 +1,365 @@
+import atexit
+import json
+import re
+import threading
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from utils.data_manager import (
+    current_workspace,
+    get_question,
+    load_questions,
+    subscribe,
+)
+from utils.file_utils import atomic_write_text, file_lock
+from utils.git_helper import git_log
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+ANALYTICS_PATH = ROOT_DIR / ".cache" / "analytics.json"
+ANALYTICS_VERSION = 2
+WEAK_TAG_MIN_TOTAL = 3
+# 统计都能从进度文件重放出来，落盘只是给下次启动省时间：有变化时最多每隔这么久写一次
+SAVE_INTERVAL_SECONDS = 5.0
+# 合并提交的标题带 "(+N more)"，不会被这个整行匹配命中；正文里逐行列出的消息会
+SOLVE_LINE_RE = re.compile(r"^Solve (\S+) (\S+)$", re.MULTILINE)
+
+
+def _empty_stats() -> Dict[str, Any]:
+    return {
+        "version": ANALYTICS_VERSION,
+        "total": 0,
+        "solved": [],
+        "tags": {},
+        "difficulty": {},
+        "daily": {},
+        "streak": {"last_day": None, "current": 0, "longest": 0},
+        # 统计对应的进度文件位置：快照的 (mtime_ns, size) 与已回放到的日志偏移
+        "source": {"snapshot": None, "journal": 0},
+    }
+
+
+def _bump(bucket: Dict[str, Dict[str, int]], key: str, field: str, delta: int) -> None:
+    item = bucket.setdefault(key, {"total": 0, "solved": 0})
+    item[field] = max(item[field] + delta, 0)
+
+
+def _question_keys(question: Dict[str, Any]) -> List[Tuple[str, str]]:
+    keys = [("difficulty", question.get("difficulty") or "Unknown")]
+    keys.extend(("tags", tag) for tag in question.get("tags", []))
+    return keys
+
+
+def read_solve_history() -> Dict[str, int]:
+    # 从 git log 中找出 format_commit_message() 写下的 "Solve {id} {slug}" 行，按作者日期计数
+    result = git_log(["--date=short", "--format=%ad%x1f%B%x1e"])
+    if result.returncode != 0:
+        return {}
+    daily: Dict[str, int] = {}
+    for entry in result.stdout.split("\x1e"):
+        day, _, body = entry.strip().partition("\x1f")
+        count = len(SOLVE_LINE_RE.findall(body))
+        if day and count:
+            daily[day] = daily.get(day, 0) + count
+    return daily
+
+
+def _streaks(days: List[str]) -> Dict[str, Any]:
+    streak = {"last_day": None, "current": 0, "longest": 0}
+    for day in sorted(days):
+        _advance_streak(streak, date.fromisoformat(day))
+    return streak
+
+
+def _advance_streak(streak: Dict[str, Any], day: date) -> None:
+    last_day = date.fromisoformat(streak["last_day"]) if streak["last_day"] else None
+    if last_day is not None and day <= last_day:
+        return
+    if last_day is not None and day - last_day == timedelta(days=1):
+        streak["current"] += 1
+    else:
+        streak["current"] = 1
+    streak["last_day"] = day.isoformat()
+    streak["longest"] = max(streak["longest"], streak["current"])
+
+
+class ProgressAnalytics:
+    # 增量维护的做题统计：状态变更时只调整受影响的计数，面板读取与历史长度无关
+    def __init__(self, path: Path = ANALYTICS_PATH, backfill_git: bool = True) -> None:
+        self.path = path
+        self.backfill_git = backfill_git
+        self.lock_path = path.with_suffix(".lock")
+        self._lock = threading.Lock()
+        self._stats: Optional[Dict[str, Any]] = None
+        self._solved: set = set()
+        self._mtime: Optional[int] = None
+        self._dirty = False
+        self._saved_at = 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock, file_lock(self.lock_path):
+            self._load()
+            if self._sync() is not None:
+                self._changed()
+            self._flush()
+            return self._stats
+
+    def handle(self, event: str, question_id: Optional[str] = None) -> None:
+        # 本进程的写入和别的进程一样通过回放进度日志计入；事件只是提醒现在同步
+        with self._lock, file_lock(self.lock_path):
+            self._load()
+            replayed = self._sync(force=event == "catalog")
+            if replayed is False and event == "solved":
+                # 这次追加顺手触发了日志压缩，记录没能回放到，单独记一次打卡
+                self._count_solve(date.today())
+            if replayed is not None:
+                self._changed()
+            self._flush()
+
+    def flush(self) -> None:
+        with self._lock, file_lock(self.lock_path):
+            self._flush(force=True)
+
+    def summary(self, days: int = 30) -> Dict[str, Any]:
+        stats = self.stats()
+        today = date.today()
+        streak = stats["streak"]
+        current = streak["current"]
+        if streak["last_day"] is None or date.fromisoformat(
+            streak["last_day"]
+        ) < today - timedelta(days=1):
+            current = 0
+        daily = [
+            {"day": day, "solves": stats["daily"].get(day, 0)}
+            for day in (
+                (today - timedelta(days=offset)).isoformat()
+                for offset in range(days - 1, -1, -1)
+            )
+        ]
+        tags = [
+            {"tag": tag, **item, "rate": item["solved"] / item["total"]}
+            for tag, item in stats["tags"].items()
+            if item["total"]
+        ]
+        weakest = sorted(
+            (row for row in tags if row["total"] >= WEAK_TAG_MIN_TOTAL),
+            key=lambda row: (row["rate"], -row["total"]),
+        )[:5]
+        return {
+            "total": stats["total"],
+            "solved": len(stats["solved"]),
+            "tags": sorted(tags, key=lambda row: -row["total"]),
+            "difficulty": [
+                {"difficulty": name, **item, "rate": item["solved"] / item["total"]}
+                for name, item in stats["difficulty"].items()
+                if item["total"]
+            ],
+            "daily": daily,
+            "current_streak": current,
+            "longest_streak": streak["longest"],
+            "weakest_tags": weakest,
+        }
+
+    def _load(self) -> None:
+        try:
+            mtime = self.path.stat().st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        if self._stats is not None and mtime == self._mtime:
+            return
+        # 别的进程写过统计文件：以文件为准，本进程还没落盘的部分同样能从日志回放出来
+        stats = None
+        if mtime is not None:
+            try:
+                stats = json.loads(self.path.read_text(encoding="utf-8"))
+            except ValueError:
+                stats = None
+        if stats is None or stats.get("version") != ANALYTICS_VERSION:
+            self._backfill()
+            return
+        self._stats = stats
+        self._solved = set(stats["solved"])
+        self._mtime = mtime
+
+    def _backfill(self) -> None:
+        # 首次使用：题库给出当前完成情况，git 历史给出每日提交与连续天数
+        self._stats = _empty_stats()
+        self._solved = set()
+        self._sync(force=True)
+        daily = read_solve_history() if self.backfill_git else {}
+        self._stats["daily"] = daily
+        self._stats["streak"] = _streaks(list(daily))
+        self._save()
+
+    def _sync(self, force: bool = False) -> Optional[bool]:
+        # 进度文件变了（本进程或其他进程、其他会话写入）才做事：日志只是变长就从上次的
+        # 偏移回放新记录；快照被重写（压缩、导入）或日志变短时按题库整体重算。
+        # 返回 None 表示没有变化，True 表示变更都经回放计入，False 表示整体重算过
+        workspace = current_workspace()
+        snapshot = _file_signature(workspace.data_path)
+        snapshot = list(snapshot) if snapshot else None
+        source = self._stats["source"]
+        journal_size = _file_size(workspace.progress_path)
+        if (
+            force
+            or snapshot != source["snapshot"]
+            or journal_size < source["journal"]
+            or self._stats["total"] != len(load_questions())
+        ):
+            self._rebuild_catalog()
+            source["snapshot"] = snapshot
+            source["journal"] = _complete_length(workspace.progress_path)
+            return False
+        if journal_size == source["journal"]:
+            return None
+        if journal_size > source["journal"]:
+            with workspace.progress_path.open("rb") as handle:
+                handle.seek(source["journal"])
+                chunk = handle.read()
+            end = chunk.rfind(b"\n") + 1
+            for line in chunk[:end].splitlines():
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                self._apply(record)
+            source["journal"] += end
+        return True
+
+    def _apply(self, record: Dict[str, Any]) -> None:
+        if record.get("op") == "reset_all":
+            for solved_id in list(self._solved):
+                self._mark_unsolved(solved_id)
+            return
+        question_id = str(record.get("id"))
+        if record.get("status") == "solved":
+            # 只有 update_status 写下的提交记录算打卡，日期取记录自己的 ts；
+            # 备份包、题库、解法导入转发的进度不计入每日统计
+            if record.get("op") == "submit":
+                self._count_solve(_record_day(record))
+            self._mark_solved(question_id)
+        elif record.get("status") == "unsolved":
+            self._mark_unsolved(question_id)
+
+    def _rebuild_catalog(self) -> None:
+        stats = self._stats
+        questions = load_questions()
+        stats["total"] = len(questions)
+        stats["tags"] = {}
+        stats["difficulty"] = {}
+        self._solved = set()
+        for question in questions:
+            solved = question.get("status") == "solved"
+            if solved:
+                self._solved.add(str(question.get("id")))
+            for bucket, key in _question_keys(question):
+                _bump(stats[bucket], key, "total", 1)
+                if solved:
+                    _bump(stats[bucket], key, "solved", 1)
+
+    def _count_solve(self, day: date) -> None:
+        daily = self._stats["daily"]
+        daily[day.isoformat()] = daily.get(day.isoformat(), 0) + 1
+        _advance_streak(self._stats["streak"], day)
+
+    def _mark_solved(self, question_id: str) -> None:
+        question = get_question(question_id)
+        if question is None or question_id in self._solved:
+            return
+        self._solved.add(question_id)
+        for bucket, key in _question_keys(question):
+            _bump(self._stats[bucket], key, "solved", 1)
+
+    def _mark_unsolved(self, question_id: str) -> None:
+        question = get_question(question_id)
+        if question_id not in self._solved:
+            return
+        self._solved.discard(question_id)
+        if question is None:
+            return
+        for bucket, key in _question_keys(question):
+            _bump(self._stats[bucket], key, "solved", -1)
+
+    def _changed(self) -> None:
+        self._stats["solved"] = sorted(self._solved)
+        self._dirty = True
+
+    def _flush(self, force: bool = False) -> None:
+        # 调用方持有锁。连续提交时合并成一次写盘；进程退出前由 atexit 补写
+        if not self._dirty or self._stats is None:
+            return
+        if not force and time.monotonic() - self._saved_at < SAVE_INTERVAL_SECONDS:
+            _PENDING.add(self)
+            return
+        self._save()
+
+    def _save(self) -> None:
+        self._stats["solved"] = sorted(self._solved)
+        atomic_write_text(
+            self.path,
+            json.dumps(self._stats, ensure_ascii=False, separators=(",", ":")),
+        )
+        self._mtime = self.path.stat().st_mtime_ns
+        self._dirty = False
+        self._saved_at = time.monotonic()
+        _PENDING.discard(self)
+
+
+def _record_day(record: Dict[str, Any]) -> date:
+    try:
+        return date.fromisoformat(str(record["ts"])[:10])
+    except (KeyError, ValueError):
+        return date.today()
+
+
+def _file_signature(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _file_size(path: Path) -> int:
+    signature = _file_signature(path)
+    return signature[1] if signature else 0
+
+
+def _complete_length(path: Path) -> int:
+    # 日志里完整行的总长度；写到一半的尾行留给下次回放
+    try:
+        raw = path.read_bytes()
+    except FileNotFoundError:
+        return 0
+    return raw.rfind(b"\n") + 1
+
+
+_ANALYTICS: Dict[Path, ProgressAnalytics] = {}
+_ANALYTICS_LOCK = threading.Lock()
+_PENDING: set = set()
+
+
+@atexit.register
+def _flush_pending() -> None:
+    for analytics in list(_PENDING):
+        analytics.flush()
+
+
+def get_analytics() -> ProgressAnalytics:
+    # 每个工作区一份统计；git 历史只属于默认工作区，用户工作区不回填
+    workspace = current_workspace()
+    with _ANALYTICS_LOCK:
+        if not _ANALYTICS:
+            subscribe(_dispatch)
+        analytics = _ANALYTICS.get(workspace.root)
+        if analytics is None:
+            analytics = _ANALYTICS[workspace.root] = ProgressAnalytics(
+                workspace.cache_dir / "analytics.json",
+                backfill_git=workspace.user is None,
+            )
+        return analytics
+
+
+def _dispatch(event: str, question_id: Optional[str]) -> None:
+    get_analytics().handle(event, question_id)
@@ -0,0 +1,185 @@
+import argparse
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from utils.ai_cache import cache_from_config, cached_chat
+from utils.ai_client import get_ai_config, get_connection_pool
+from utils.data_manager import load_questions
+
+HINTS_PATH = Path(__file__).resolve().parents[1] / "data" / "ai_hints.jsonl"
+
+SYSTEM_PROMPT = "你是算法学习助手，给出思路提示而非完整答案。"
+USER_PROMPT = "请用三到五句话讲解这道题的核心思路、关键状态或不变量，以及时间/空间复杂度。"
+
+_HINTS: Dict[str, str] = {}
+_HINTS_KEY: Optional[Tuple[str, int, int]] = None
+_HINTS_LOCK = threading.Lock()
+
+
+class TokenBucket:
+    # 令牌桶限速：rate 个/秒，最多积攒 capacity 个，acquire 阻塞直到拿到令牌
+    def __init__(self, rate: float, capacity: Optional[float] = None) -> None:
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+def build_messages(question: Dict[str, Any]) -> List[Dict[str, str]]:
+    context = (
+        f"题目：{question.get('title')}\n"
+        f"难度：{question.get('difficulty')}\n"
+        f"标签：{', '.join(question.get('tags', []))}\n"
+        f"提示：{question.get('pattern_hint')}\n"
+    )
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT + "\n" + context},
+        {"role": "user", "content": USER_PROMPT},
+    ]
+
+
+def load_hints(path: Path = HINTS_PATH) -> Dict[str, str]:
+    # 页面按题号读取预生成的讲解；文件没变时直接用缓存，同一题以最后一行为准
+    global _HINTS, _HINTS_KEY
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return {}
+    key = (str(path), stat.st_mtime_ns, stat.st_size)
+    with _HINTS_LOCK:
+        if key != _HINTS_KEY:
+            hints: Dict[str, str] = {}
+            for line in path.read_text(encoding="utf-8").splitlines():
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if record.get("id") is not None and record.get("content"):
+                    hints[str(record["id"])] = record["content"]
+            _HINTS, _HINTS_KEY = hints, key
+        return _HINTS
+
+
+def get_hint(question_id: str, path: Path = HINTS_PATH) -> Optional[str]:
+    return load_hints(path).get(str(question_id))
+
+
+def load_done_ids(path: Path) -> Set[str]:
+    done: Set[str] = set()
+    if not path.exists():
+        return done
+    for line in path.read_text(encoding="utf-8").splitlines():
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        if record.get("id") is not None:
+            done.add(str(record["id"]))
+    return done
+
+
+def generate_hints(
+    concurrency: int = 4,
+    rate: float = 2.0,
+    output: Path = HINTS_PATH,
+    limit: Optional[int] = None,
+    ai_cfg: Optional[Dict[str, str]] = None,
+) -> Dict[str, int]:
+    ai_cfg = ai_cfg or get_ai_config()
+    cache = cache_from_config(ai_cfg)
+    done = load_done_ids(output)
+    pending = [q for q in load_questions() if str(q.get("id")) not in done]
+    if limit is not None:
+        pending = pending[:limit]
+
+    bucket = TokenBucket(rate)
+    write_lock = threading.Lock()
+    get_connection_pool().max_idle_per_host = max(
+        get_connection_pool().max_idle_per_host, concurrency
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    counts = {"done": 0, "failed": 0, "skipped": len(done)}
+
+    def work(question: Dict[str, Any]) -> None:
+        bucket.acquire()
+        ok, content, _ = cached_chat(
+            cache,
+            messages=build_messages(question),
+            model=ai_cfg["model"],
+            base_url=ai_cfg["base_url"],
+            api_key=ai_cfg["api_key"],
+        )
+        with write_lock:
+            if not ok:
+                counts["failed"] += 1
+                print(f"✗ {question.get('id')}: {content}")
+                return
+            # 每完成一题立即追加一行，中断后重跑会跳过已完成的题
+            with output.open("a", encoding="utf-8") as handle:
+                record = {
+                    "id": str(question.get("id")),
+                    "model": ai_cfg["model"],
+                    "content": content,
+                }
+                handle.write(json.dumps(record, ensure_ascii=False) + "\n")
+            counts["done"] += 1
+            print(f"✓ {question.get('id')} ({counts['done']}/{len(pending)})")
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        futures = [pool.submit(work, question) for question in pending]
+        for future in as_completed(futures):
+            future.result()
+    return counts
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="批量预生成题目 AI 讲解（可断点续跑）")
+    parser.add_argument("--concurrency", type=int, default=4, help="并发请求数")
+    parser.add_argument("--rate", type=float, default=2.0, help="每秒最多请求数")
+    parser.add_argument("--limit", type=int, default=None, help="最多处理多少题")
+    parser.add_argument("--output", type=Path, default=HINTS_PATH)
+    args = parser.parse_args(argv)
+
+    ai_cfg = get_ai_config()
+    if not ai_cfg["api_key"]:
+        print("未配置 AI_API_KEY。")
+        return 1
+    started = time.perf_counter()
+    counts = generate_hints(
+        concurrency=args.concurrency,
+        rate=args.rate,
+        output=args.output,
+        limit=args.limit,
+        ai_cfg=ai_cfg,
+    )
+    elapsed = time.perf_counter() - started
+    print(
+        f"完成 {counts['done']}，失败 {counts['failed']}，"
+        f"已跳过 {counts['skipped']}，耗时 {elapsed:.1f}s"
+    )
+    return 1 if counts["failed"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
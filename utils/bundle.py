@@ -0,0 +1,276 @@
+import argparse
+import hashlib
+import io
+import json
+import os
+import tarfile
+import time
+from datetime import datetime
+from pathlib import Path, PurePosixPath
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from utils import data_manager
+from utils.file_utils import atomic_write_stream, atomic_write_text, file_lock
+
+BUNDLE_VERSION = 1
+MANIFEST_NAME = "bundle.json"
+CATALOG_NAME = "data/problems.json"
+CHUNK_SIZE = 1024 * 1024
+
+
+def _hash_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for chunk in iter(lambda: handle.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _iter_bundle_files() -> Iterator[Tuple[str, Path]]:
+    # 解法（含 best/）和笔记；清单与 .idx 旁路索引都能从文件重建，不打包
+    workspace = data_manager.current_workspace()
+    roots = (("solutions", workspace.solutions_dir), ("notes", workspace.notes_dir))
+    for name, directory in roots:
+        if not directory.exists():
+            continue
+        for path in sorted(directory.rglob("*")):
+            if not path.is_file() or path.suffix == ".idx":
+                continue
+            if path == workspace.manifest_path:
+                continue
+            yield f"{name}/{path.relative_to(directory).as_posix()}", path
+
+
+def _load_state(path: Path) -> Dict[str, Any]:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def export_bundle(
+    output: Path, incremental: bool = False, state_path: Optional[Path] = None
+) -> Dict[str, int]:
+    workspace = data_manager.current_workspace()
+    state_path = state_path or workspace.cache_dir / "export_state.json"
+    state = _load_state(state_path)
+    previous = state.get("files", {}) if incremental else {}
+    catalog = json.dumps(
+        data_manager.load_questions(), ensure_ascii=False, indent=2
+    ).encode("utf-8")
+    now = time.time()
+    files: Dict[str, Dict[str, Any]] = {
+        CATALOG_NAME: {
+            "sha256": hashlib.sha256(catalog).hexdigest(),
+            "size": len(catalog),
+            "mtime": now,
+        }
+    }
+    current: Dict[str, Dict[str, Any]] = {}
+    paths: Dict[str, Path] = {}
+    with file_lock(workspace.lock_path):
+        # 第一遍只算哈希（mtime/size 没变就沿用上次的值），决定哪些文件要进包
+        for name, path in _iter_bundle_files():
+            stat = path.stat()
+            cached = state.get("files", {}).get(name) or {}
+            signature = (stat.st_mtime_ns, stat.st_size)
+            if (cached.get("mtime_ns"), cached.get("size")) == signature:
+                digest = cached["sha256"]
+            else:
+                digest = _hash_file(path)
+            current[name] = {
+                "sha256": digest,
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+            }
+            if previous.get(name, {}).get("sha256") == digest:
+                continue
+            files[name] = {
+                "sha256": digest,
+                "size": stat.st_size,
+                "mtime": stat.st_mtime,
+            }
+            paths[name] = path
+
+        manifest = json.dumps(
+            {
+                "version": BUNDLE_VERSION,
+                "created": datetime.now().isoformat(timespec="seconds"),
+                "exported": now,
+                "incremental": incremental,
+                "files": files,
+            },
+            ensure_ascii=False,
+            indent=2,
+        ).encode("utf-8")
+        output.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = output.with_name(output.name + ".tmp")
+        # 流式 gzip：每个文件边读边压缩写出，整个包不会在内存中成形
+        with tarfile.open(str(temp_path), "w|gz") as archive:
+            _add_bytes(archive, MANIFEST_NAME, manifest, now)
+            _add_bytes(archive, CATALOG_NAME, catalog, now)
+            for name, path in paths.items():
+                info = tarfile.TarInfo(name)
+                info.size = files[name]["size"]
+                info.mtime = int(files[name]["mtime"])
+                with path.open("rb") as handle:
+                    archive.addfile(info, handle)
+        os.replace(temp_path, output)
+
+    atomic_write_text(
+        state_path,
+        json.dumps(
+            {
+                "exported": datetime.now().isoformat(timespec="seconds"),
+                "files": current,
+            },
+            ensure_ascii=False,
+        ),
+    )
+    return {"files": len(paths), "skipped": len(current) - len(paths)}
+
+
+def _add_bytes(archive: tarfile.TarFile, name: str, data: bytes, mtime: float) -> None:
+    info = tarfile.TarInfo(name)
+    info.size = len(data)
+    info.mtime = int(mtime)
+    archive.addfile(info, io.BytesIO(data))
+
+
+def _target_path(name: str) -> Optional[Path]:
+    # 只接受 solutions/ 与 notes/ 下的相对路径，拒绝绝对路径和 ..
+    parts = PurePosixPath(name).parts
+    if len(parts) < 2 or ".." in parts or PurePosixPath(name).is_absolute():
+        return None
+    workspace = data_manager.current_workspace()
+    roots = {"solutions": workspace.solutions_dir, "notes": workspace.notes_dir}
+    root = roots.get(parts[0])
+    if root is None:
+        return None
+    return root.joinpath(*parts[1:])
+
+
+def _merge_catalog_member(data: bytes, exported: float) -> Dict[str, int]:
+    # 题目元数据按 id 合并；进度只前进：包里已完成、本地未完成的题直接采用；
+    # 两边都完成的题逐题比较清单里的导出时间与本地该题最后一条进度的时间，
+    # 以较新的一方为准（同一秒内算本地较新），且保留本地的复习计划。
+    # 永远不会把本地已完成的题改回未完成。本地时间要在合并题库之前取，合并会重写快照
+    times, default = data_manager.progress_times()
+    questions = json.loads(data.decode("utf-8"))
+    counts = data_manager.merge_catalog(questions)
+    records = []
+    for question in questions:
+        if question.get("status") != "solved":
+            continue
+        question_id = str(question["id"])
+        local = data_manager.get_question(question_id)
+        if local is None:
+            continue
+        record = dict(question)
+        if local.get("status") == "solved":
+            if int(exported) <= times.get(question_id, default):
+                continue
+            record.pop("review", None)
+        if all(
+            local.get(f) == record[f]
+            for f in data_manager.PROGRESS_FIELDS
+            if f in record
+        ):
+            continue
+        records.append(record)
+    return {**counts, "progress": data_manager.import_progress(records)}
+
+
+def import_bundle(bundle: Path) -> Dict[str, int]:
+    counts = dict.fromkeys(
+        ("written", "unchanged", "kept_newer", "corrupt", "rejected"), 0
+    )
+    seen = set()
+    with tarfile.open(str(bundle), "r|gz") as archive:
+        members = iter(archive)
+        first = next(members, None)
+        if first is None or first.name != MANIFEST_NAME:
+            raise ValueError("备份包缺少 bundle.json 清单")
+        manifest = json.loads(archive.extractfile(first).read().decode("utf-8"))
+        if manifest.get("version") != BUNDLE_VERSION:
+            raise ValueError(f"不支持的备份包版本: {manifest.get('version')}")
+        files = manifest["files"]
+        for member in members:
+            entry = files.get(member.name)
+            if not member.isfile() or entry is None:
+                counts["rejected"] += 1
+                continue
+            seen.add(member.name)
+            source = archive.extractfile(member)
+            if member.name == CATALOG_NAME:
+                data = source.read()
+                if hashlib.sha256(data).hexdigest() != entry["sha256"]:
+                    counts["corrupt"] += 1
+                    continue
+                # 旧包的清单没有 exported，题库条目的 mtime 就是当时的导出时间
+                exported = manifest.get("exported", entry["mtime"])
+                catalog_counts = _merge_catalog_member(data, exported)
+                counts.update({f"catalog_{k}": v for k, v in catalog_counts.items()})
+                continue
+            target = _target_path(member.name)
+            if target is None:
+                counts["rejected"] += 1
+                continue
+            if target.exists():
+                if _hash_file(target) == entry["sha256"]:
+                    counts["unchanged"] += 1
+                    continue
+                if target.stat().st_mtime >= entry["mtime"]:
+                    counts["kept_newer"] += 1
+                    continue
+            with file_lock(data_manager.current_workspace().lock_path):
+                if not atomic_write_stream(target, source, entry["sha256"]):
+                    counts["corrupt"] += 1
+                    continue
+                os.utime(target, (entry["mtime"], entry["mtime"]))
+                if target.suffix == ".md":
+                    index_path = target.with_name(target.name + ".idx")
+                    if index_path.exists():
+                        index_path.unlink()
+            counts["written"] += 1
+    counts["missing"] = len(set(files) - seen)
+    if counts["written"]:
+        data_manager.rebuild_solution_manifest(save=True)
+    return counts
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="导出/导入进度、解法与笔记备份包")
+    commands = parser.add_subparsers(dest="command", required=True)
+    export_parser = commands.add_parser("export", help="导出为 .tar.gz")
+    export_parser.add_argument("output", type=Path)
+    export_parser.add_argument(
+        "--incremental", action="store_true", help="只包含上次导出后有变化的文件"
+    )
+    import_parser = commands.add_parser("import", help="校验并合并备份包")
+    import_parser.add_argument("bundle", type=Path)
+    args = parser.parse_args(argv)
+
+    if args.command == "export":
+        counts = export_bundle(args.output, args.incremental)
+        print(
+            f"已导出 {args.output}：{counts['files']} 个文件，"
+            f"{counts['skipped']} 个未变化已跳过"
+        )
+        return 0
+    counts = import_bundle(args.bundle)
+    print(
+        f"写入 {counts['written']}，相同 {counts['unchanged']}，"
+        f"本地较新保留 {counts['kept_newer']}，校验失败 {counts['corrupt']}，"
+        f"非法条目 {counts['rejected']}，清单中缺失 {counts['missing']}"
+    )
+    if "catalog_added" in counts:
+        print(
+            f"题库：新增 {counts['catalog_added']}，更新 {counts['catalog_updated']}，"
+            f"导入进度 {counts['catalog_progress']} 题"
+        )
+    return 1 if counts["corrupt"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,188 @@
+import argparse
+import csv
+import json
+import re
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, TextIO
+
+from utils.data_manager import merge_catalog
+
+CHUNK_SIZE = 64 * 1024
+FORMATS = ("json", "jsonl", "csv")
+SUFFIX_FORMATS = {".json": "json", ".jsonl": "jsonl", ".ndjson": "jsonl", ".csv": "csv"}
+
+ID_KEYS = ("id", "frontend_id", "questionFrontendId", "frontendQuestionId")
+TITLE_KEYS = ("title", "translatedTitle", "titleCn", "question__title")
+SLUG_KEYS = ("slug", "titleSlug", "title_slug", "question__title_slug")
+TAG_KEYS = ("tags", "topicTags", "topics", "companies")
+HINT_KEYS = ("pattern_hint", "hint")
+DIFFICULTY_NAMES = {
+    "easy": "Easy",
+    "medium": "Medium",
+    "hard": "Hard",
+    "1": "Easy",
+    "2": "Medium",
+    "3": "Hard",
+    "简单": "Easy",
+    "中等": "Medium",
+    "困难": "Hard",
+}
+_TAG_SPLIT_RE = re.compile(r"[;|,/，、]")
+
+
+def iter_json_array(handle: TextIO, chunk_size: int = CHUNK_SIZE) -> Iterator[Any]:
+    # 分块读取顶层数组，逐个 raw_decode 元素；内存只占当前缓冲区，与文件大小无关
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    opened = False
+    eof = False
+    while True:
+        while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+            pos += 1
+        if pos >= len(buffer):
+            if eof:
+                if opened:
+                    raise ValueError("JSON 数组没有闭合")
+                return
+            chunk = handle.read(chunk_size)
+            eof = not chunk
+            buffer, pos = buffer[pos:] + chunk, 0
+            continue
+        if not opened:
+            if buffer[pos] != "[":
+                raise ValueError("JSON 题库的顶层必须是数组")
+            opened = True
+            pos += 1
+            continue
+        if buffer[pos] == "]":
+            return
+        try:
+            item, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            # 元素被块边界截断：补读下一块再试
+            chunk = handle.read(chunk_size)
+            eof = not chunk
+            buffer, pos = buffer[pos:] + chunk, 0
+            continue
+        yield item
+        pos = end
+        if pos > chunk_size:
+            buffer, pos = buffer[pos:], 0
+
+
+def iter_jsonl(handle: TextIO) -> Iterator[Any]:
+    for line in handle:
+        if line.strip():
+            yield json.loads(line)
+
+
+def iter_raw_records(path: Path, fmt: Optional[str] = None) -> Iterator[Any]:
+    fmt = fmt or SUFFIX_FORMATS.get(path.suffix.lower())
+    if fmt not in FORMATS:
+        raise ValueError(f"无法识别的题库格式: {path.name}（可用 --format 指定）")
+    with path.open("r", encoding="utf-8-sig", newline="") as handle:
+        if fmt == "csv":
+            yield from csv.DictReader(handle)
+        elif fmt == "jsonl":
+            yield from iter_jsonl(handle)
+        else:
+            yield from iter_json_array(handle)
+
+
+def _first(raw: Dict[str, Any], keys: tuple) -> Any:
+    for key in keys:
+        value = raw.get(key)
+        if value not in (None, ""):
+            return value
+    return None
+
+
+def _parse_tags(value: Any) -> List[str]:
+    if isinstance(value, str):
+        parts = _TAG_SPLIT_RE.split(value)
+    else:
+        parts = [
+            item.get("translatedName") or item.get("name", "")
+            if isinstance(item, dict)
+            else str(item)
+            for item in value
+        ]
+    return list(dict.fromkeys(part.strip() for part in parts if part.strip()))
+
+
+def normalize_record(raw: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    # 兼容常见的 LeetCode 导出字段名；缺失的字段不写入，合并时保留题库原值
+    question_id = _first(raw, ID_KEYS)
+    if question_id is None:
+        return None
+    question_id = str(question_id).strip()
+    record: Dict[str, Any] = {"id": question_id}
+    title = _first(raw, TITLE_KEYS)
+    if title is not None:
+        title = str(title).strip()
+        if not title.startswith(f"{question_id}."):
+            title = f"{question_id}. {title}"
+        record["title"] = title
+    difficulty = _first(raw, ("difficulty", "level"))
+    if difficulty is not None:
+        key = str(difficulty).strip()
+        record["difficulty"] = DIFFICULTY_NAMES.get(key.lower(), key)
+    url = _first(raw, ("url", "link"))
+    slug = _first(raw, SLUG_KEYS)
+    if url is None and slug is not None:
+        url = f"https://leetcode.cn/problems/{slug}/"
+    if url is not None:
+        record["url"] = str(url)
+    tags = _first(raw, TAG_KEYS)
+    if tags is not None:
+        record["tags"] = _parse_tags(tags)
+    hint = _first(raw, HINT_KEYS)
+    if hint is not None:
+        record["pattern_hint"] = str(hint)
+    return record
+
+
+def iter_records(
+    path: Path, fmt: Optional[str] = None, stats: Optional[Dict[str, int]] = None
+) -> Iterator[Dict[str, Any]]:
+    for raw in iter_raw_records(path, fmt):
+        record = normalize_record(raw) if isinstance(raw, dict) else None
+        if record is None:
+            if stats is not None:
+                stats["skipped"] = stats.get("skipped", 0) + 1
+            continue
+        yield record
+
+
+def import_catalog(
+    path: Path, fmt: Optional[str] = None, prune: bool = False
+) -> Dict[str, int]:
+    stats: Dict[str, int] = {"skipped": 0}
+    counts = merge_catalog(iter_records(path, fmt, stats), prune=prune)
+    return {**counts, **stats}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="导入外部题库（JSON/JSONL/CSV），按 id 合并并保留做题进度"
+    )
+    parser.add_argument("path", type=Path)
+    parser.add_argument("--format", choices=FORMATS, help="默认按扩展名判断")
+    parser.add_argument(
+        "--prune", action="store_true", help="删除导入文件中没有的题目（连同其进度）"
+    )
+    args = parser.parse_args(argv)
+    counts = import_catalog(args.path, args.format, args.prune)
+    print(
+        f"新增 {counts['added']}，更新 {counts['updated']}，"
+        f"未变 {counts['unchanged']}，删除 {counts['removed']}，"
+        f"保留(导入中缺失) {counts['kept']}，跳过无 id 记录 {counts['skipped']}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
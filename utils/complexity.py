@@ -0,0 +1,271 @@
+import argparse
+import copy
+import math
+import random
+import statistics
+import string
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from utils.data_manager import (
+    get_best_attempt,
+    get_question,
+    list_attempts,
+    set_best_attempt,
+)
+from utils.judge import (
+    MEMORY_LIMIT_MB,
+    load_testcases,
+    question_id_from_path,
+    run_limited,
+)
+
+DEFAULT_SIZES = [64, 128, 256, 512, 1024, 2048, 4096]
+DEFAULT_REPEATS = 5
+SIZE_BUDGET_SECONDS = 1.0
+# 每个规模（含全部重复）在评测 worker 里的时限，死循环或过慢的解法到点即被终止
+SIZE_TIME_LIMIT_SECONDS = 10.0
+# 超限说明规模已经大到跑不动，停止放大并用已测到的点拟合
+LIMIT_ERRORS = ("Time Limit Exceeded", "Memory Limit Exceeded", "Killed")
+
+COMPLEXITY_CLASSES: Dict[str, Callable[[float], float]] = {
+    "O(1)": lambda n: 1.0,
+    "O(log n)": lambda n: math.log2(n),
+    "O(n)": lambda n: n,
+    "O(n log n)": lambda n: n * math.log2(n),
+    "O(n^2)": lambda n: n * n,
+    "O(n^3)": lambda n: n * n * n,
+}
+
+
+def _generate_arg(kind: Any, n: int, rng: random.Random) -> Any:
+    if isinstance(kind, dict):
+        return copy.deepcopy(kind["const"])
+    if kind == "n":
+        return n
+    if kind == "int":
+        return rng.randint(-1000, 1000)
+    if kind == "int_list":
+        return [rng.randint(-1000, 1000) for _ in range(n)]
+    if kind == "nonneg_int_list":
+        return [rng.randint(0, 1000) for _ in range(n)]
+    if kind == "small_int_list":
+        return [rng.randint(-3, 3) for _ in range(n)]
+    if kind == "lower_str":
+        return "".join(rng.choice(string.ascii_lowercase) for _ in range(n))
+    if kind == "paren_str":
+        return "".join(rng.choice("()") for _ in range(n))
+    raise ValueError(f"未知的输入类型: {kind}")
+
+
+def generate_inputs(bench: Dict[str, Any], n: int, seed: int = 0) -> List[Any]:
+    rng = random.Random(seed * 1_000_003 + n)
+    return [_generate_arg(kind, n, rng) for kind in bench["args"]]
+
+
+def fit_complexity(sizes: Sequence[int], times: Sequence[float]) -> str:
+    # 前后两半各取中位数比较增幅：不到 log n 同区间增幅的一半（几何平均）
+    # 就视为常数，否则个别抖动点带来的上扬会让 O(log n) 的残差略小于 O(1)
+    span = max(1, len(sizes) // 2)
+    if len(sizes) > 1 and min(times) > 0 and min(sizes) > 1:
+        growth = statistics.median(times[-span:]) / statistics.median(times[:span])
+        log_growth = statistics.median(
+            math.log2(n) for n in sizes[-span:]
+        ) / statistics.median(math.log2(n) for n in sizes[:span])
+        if growth <= math.sqrt(log_growth):
+            return "O(1)"
+    # 对每个候选 f(n) 求最小二乘系数 c，比较相对残差 Σ((t - c·f)/t)²，取最小者
+    best_name = "O(1)"
+    best_error = math.inf
+    for name, func in COMPLEXITY_CLASSES.items():
+        values = [func(n) for n in sizes]
+        denominator = sum(v * v for v in values)
+        if denominator == 0:
+            continue
+        scale = sum(t * v for t, v in zip(times, values)) / denominator
+        error = sum(
+            ((t - scale * v) / t) ** 2 for t, v in zip(times, values) if t > 0
+        )
+        if error < best_error:
+            best_name, best_error = name, error
+    return best_name
+
+
+def _load_method(code: str, method: str) -> Callable[..., Any]:
+    namespace: Dict[str, Any] = {"__name__": "solution"}
+    exec(compile(code, "<solution>", "exec"), namespace)
+    return getattr(namespace["Solution"](), method)
+
+
+def _measure(
+    code: str, method: str, args: List[Any], repeats: int, trace_memory: bool
+) -> Dict[str, float]:
+    # 在评测 worker 里执行：计时取多次中的最快一次，内存单独跑一次 tracemalloc
+    func = _load_method(code, method)
+    best = math.inf
+    for _ in range(repeats):
+        call_args = copy.deepcopy(args)
+        started = time.perf_counter()
+        func(*call_args)
+        best = min(best, time.perf_counter() - started)
+    peak = 0
+    if trace_memory:
+        tracemalloc.start()
+        try:
+            func(*args)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    return {"seconds": best, "peak": peak}
+
+
+def benchmark_code(
+    code: str,
+    question_id: str,
+    sizes: Sequence[int] = DEFAULT_SIZES,
+    repeats: int = DEFAULT_REPEATS,
+) -> Dict[str, Any]:
+    spec = load_testcases().get(str(question_id))
+    if not spec or "bench" not in spec:
+        return {"error": "该题没有基准输入生成规则（testcases.json 的 bench 字段）。"}
+    try:
+        compile(code, "<solution>", "exec")
+    except SyntaxError as exc:
+        return {"error": f"加载失败: {type(exc).__name__}: {exc}"}
+
+    measured_sizes: List[int] = []
+    times: List[float] = []
+    stopped = ""
+    for n in sizes:
+        args = generate_inputs(spec["bench"], n)
+        outcome = run_limited(
+            _measure,
+            (code, spec["method"], args, repeats, False),
+            SIZE_TIME_LIMIT_SECONDS,
+            MEMORY_LIMIT_MB,
+        )
+        error = outcome.get("error")
+        if error and (not error.startswith(LIMIT_ERRORS) or not measured_sizes):
+            return {"error": f"n={n} 运行失败: {error}"}
+        if error:
+            stopped = f"n={n} {error}"
+            break
+        best = outcome["output"]["seconds"]
+        measured_sizes.append(n)
+        times.append(best)
+        # 单次已超出预算就不再放大规模，避免 O(n^2) 解法拖慢整轮对比
+        if best > SIZE_BUDGET_SECONDS:
+            break
+
+    largest_args = generate_inputs(spec["bench"], measured_sizes[-1])
+    outcome = run_limited(
+        _measure,
+        (code, spec["method"], largest_args, 0, True),
+        SIZE_TIME_LIMIT_SECONDS,
+        MEMORY_LIMIT_MB,
+    )
+    peak = outcome["output"]["peak"] if "output" in outcome else 0
+
+    result = {
+        "sizes": measured_sizes,
+        "times": times,
+        "complexity": fit_complexity(measured_sizes, times),
+        "peak_kb": round(peak / 1024, 1),
+    }
+    if stopped:
+        result["stopped"] = stopped
+    return result
+
+
+def find_attempts(question_id: str) -> List[Path]:
+    paths = [attempt["path"] for attempt in list_attempts(question_id)]
+    best = get_best_attempt(question_id)
+    if best is not None:
+        paths.append(best["path"])
+    return [path for path in paths if path.exists()]
+
+
+def compare_attempts(
+    paths: Sequence[Path],
+    sizes: Sequence[int] = DEFAULT_SIZES,
+    repeats: int = DEFAULT_REPEATS,
+) -> List[Dict[str, Any]]:
+    rows = []
+    for path in paths:
+        question_id = question_id_from_path(path)
+        result = benchmark_code(
+            path.read_text(encoding="utf-8"), question_id or "", sizes, repeats
+        )
+        rows.append({"path": path, "question_id": question_id, **result})
+    return rows
+
+
+def pick_fastest(rows: Sequence[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    # 先比复杂度等级，再比各自都测到的最大规模下的耗时
+    valid = [row for row in rows if "error" not in row]
+    if not valid:
+        return None
+    order = list(COMPLEXITY_CLASSES)
+    common = min(len(row["sizes"]) for row in valid)
+    return min(
+        valid,
+        key=lambda row: (order.index(row["complexity"]), row["times"][common - 1]),
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="实测解法耗时增长并估计复杂度")
+    parser.add_argument("targets", nargs="+", help="题号或解法文件路径")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS)
+    parser.add_argument(
+        "--promote", action="store_true", help="把实测最快的解法复制为 best"
+    )
+    args = parser.parse_args(argv)
+
+    paths: List[Path] = []
+    for target in args.targets:
+        path = Path(target)
+        paths.extend([path] if path.suffix == ".py" else find_attempts(target))
+    if not paths:
+        print("没有找到解法文件。")
+        return 1
+
+    rows = compare_attempts(paths, args.sizes, args.repeats)
+    fastest = pick_fastest(rows)
+    for row in rows:
+        marker = "★" if row is fastest else " "
+        if "error" in row:
+            print(f"{marker} {row['path']}\n    {row['error']}")
+            continue
+        print(
+            f"{marker} {row['path']}\n"
+            f"    估计 {row['complexity']:<10} "
+            f"n={row['sizes'][-1]} 用时 {row['times'][-1] * 1000:.3f}ms  "
+            f"峰值内存 {row['peak_kb']}KB"
+        )
+        timeline = "  ".join(
+            f"{n}:{t * 1000:.3f}ms" for n, t in zip(row["sizes"], row["times"])
+        )
+        print(f"    {timeline}")
+        if row.get("stopped"):
+            print(f"    {row['stopped']}，未继续放大规模")
+
+    if args.promote and fastest is not None:
+        question = get_question(fastest["question_id"])
+        if question is None:
+            print(f"题库中没有题目 {fastest['question_id']}，未设置 best。")
+            return 1
+        target = set_best_attempt(
+            question_id=question.get("id"),
+            title=question.get("title", ""),
+            source=fastest["path"],
+        )
+        print(f"已将 {fastest['path'].name} 设为 best：{target}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
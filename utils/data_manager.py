@@ -1,144 +1,1185 @@
+import hashlib
 import json
-import random
+import logging
+import os
 import re
-from datetime import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from collections import deque
+from datetime import date, datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+
+from utils.file_utils import atomic_write_bytes, atomic_write_text, file_lock
+from utils.review import DEFAULT_QUALITY, AliasSampler, ReviewQueue, sm2_update
+
+logger = logging.getLogger(__name__)
 
 DATA_PATH = Path(__file__).resolve().parents[1] / "data" / "problems.json"
+PROGRESS_PATH = DATA_PATH.parent / "progress.jsonl"
 SOLUTIONS_DIR = Path(__file__).resolve().parents[1] / "solutions"
 BEST_DIR = SOLUTIONS_DIR / "best"
 NOTES_DIR = Path(__file__).resolve().parents[1] / "notes"
+MANIFEST_PATH = SOLUTIONS_DIR / "manifest.json"
+LOCK_PATH = DATA_PATH.parent / ".data.lock"
+
+COMPACT_THRESHOLD_BYTES = 256 * 1024
+MANIFEST_VERSION = 1
+NOTE_INDEX_RECORD_SIZE = 26
+NOTE_HEADER_RE = re.compile(r"^\[(\d{8}_\d{6})\]\s*$")
+# review 为 SM-2 复习状态（难度系数、间隔、到期日），没有复习记录时为 None
+PROGRESS_DEFAULTS = {"status": "unsolved", "my_code": "", "notes": "", "review": None}
+PROGRESS_FIELDS = tuple(PROGRESS_DEFAULTS)
+CATALOG_FIELDS = ("id", "title", "difficulty", "url", "tags", "pattern_hint")
+# 缓存最近这么多次版本变化各自改动了哪些题，派生索引据此增量更新
+CHANGE_LOG_SIZE = 64
+
+
+class ChangeLog:
+    # 记录每次版本号 +1 时改动的题号；None 表示整体重载（题库变了、reset_all 等），
+    # 派生结构（分面位图、复习堆）只能重建。本进程与其他进程写入的变化都会记进来
+    def __init__(self) -> None:
+        self._entries: "deque[Tuple[int, Optional[Set[str]]]]" = deque(
+            maxlen=CHANGE_LOG_SIZE
+        )
+
+    def record(self, version: int, changed: Optional[Set[str]]) -> None:
+        self._entries.append((version, changed))
+
+    def since(self, version: Optional[int], current: int) -> Optional[Set[str]]:
+        if version is None or version > current:
+            return None
+        result: Set[str] = set()
+        expected = version + 1
+        for entry_version, changed in self._entries:
+            if entry_version < expected:
+                continue
+            if entry_version != expected or changed is None:
+                return None
+            result |= changed
+            expected += 1
+        return result if expected == current + 1 else None
+
+
+class QuestionStore:
+    # 进程级共享缓存：题库快照 + 进度日志回放，仅在文件 mtime/size 变化时增量刷新
+    def __init__(self, path: Path, journal_path: Path) -> None:
+        self.path = path
+        self.journal_path = journal_path
+        self.version = 0
+        self._changes = ChangeLog()
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._signature: Optional[Tuple[int, int]] = None
+        self._journal_signature: Optional[Tuple[int, int]] = None
+        self._journal_offset = 0
+        self._questions: List[Dict[str, Any]] = []
+        self._index: Dict[str, Dict[str, Any]] = {}
+
+    def questions(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            self._refresh()
+            return self._questions
+
+    def get(self, question_id: str) -> Optional[Dict[str, Any]]:
+        return self.get_many([question_id])[0]
+
+    def get_many(self, question_ids: Iterable[str]) -> List[Optional[Dict[str, Any]]]:
+        with self._lock:
+            self._refresh()
+            return [self._index.get(str(question_id)) for question_id in question_ids]
+
+    def changes_since(self, version: Optional[int]) -> Optional[Set[str]]:
+        # version 之后被改动的题号（含其他进程写入的），无法确定时返回 None
+        with self._lock:
+            self._refresh()
+            return self._changes.since(version, self.version)
+
+    def remember(self, questions: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            # 压缩日志时写回的就是当前视图本身，内容没有变化
+            unchanged = self._loaded and questions is self._questions
+            self._set(questions, _file_signature(self.path))
+            self._journal_signature = _file_signature(self.journal_path)
+            self._journal_offset = (
+                self._journal_signature[1] if self._journal_signature else 0
+            )
+            self._bump(set() if unchanged else None)
+
+    def _bump(self, changed: Optional[Set[str]]) -> None:
+        self.version += 1
+        self._changes.record(self.version, changed)
+
+    def _refresh(self) -> None:
+        signature = _file_signature(self.path)
+        journal_signature = _file_signature(self.journal_path)
+        if (
+            self._loaded
+            and signature == self._signature
+            and journal_signature == self._journal_signature
+        ):
+            return
+        journal_size = journal_signature[1] if journal_signature else 0
+        changed: Optional[Set[str]] = set()
+        if (
+            not self._loaded
+            or signature != self._signature
+            or journal_size < self._journal_offset
+        ):
+            self._set(self._read_catalog(signature), signature)
+            changed = None
+        if signature is not None:
+            replayed = self._replay_journal()
+            if changed is not None:
+                changed = None if replayed is None else changed | replayed
+        self._journal_signature = journal_signature
+        self._bump(changed)
+
+    def _read_catalog(
+        self, signature: Optional[Tuple[int, int]]
+    ) -> List[Dict[str, Any]]:
+        if signature is None:
+            return []
+        content = self.path.read_text(encoding="utf-8").strip()
+        return json.loads(content) if content else []
+
+    def _replay_journal(self) -> Optional[Set[str]]:
+        # 返回被改动的题号；遇到 reset_all 返回 None
+        changed: Optional[Set[str]] = set()
+        if not self.journal_path.exists():
+            return changed
+        with self.journal_path.open("rb") as handle:
+            handle.seek(self._journal_offset)
+            chunk = handle.read()
+        # 只回放完整的行，写到一半的尾行留到下次
+        end = chunk.rfind(b"\n") + 1
+        for record in _journal_records(chunk[:end], self.journal_path):
+            _apply_record(self._questions, self._index, record)
+            if record.get("op") == "reset_all":
+                changed = None
+            elif changed is not None:
+                changed.add(str(record.get("id")))
+        self._journal_offset += end
+        return changed
+
+    def _set(
+        self, questions: List[Dict[str, Any]], signature: Optional[Tuple[int, int]]
+    ) -> None:
+        self._questions = questions
+        self._index = {str(q.get("id")): q for q in questions}
+        self._signature = signature
+        self._journal_offset = 0
+        self._loaded = True
+
+
+def _apply_record(
+    questions: List[Dict[str, Any]],
+    index: Dict[str, Dict[str, Any]],
+    record: Dict[str, Any],
+) -> None:
+    if record.get("op") == "reset_all":
+        for question in questions:
+            question.update(PROGRESS_DEFAULTS)
+        return
+    question = index.get(str(record.get("id")))
+    if question is None:
+        return
+    for field in PROGRESS_FIELDS:
+        if field in record:
+            question[field] = record[field]
+
+
+def _journal_records(chunk: bytes, path: Path) -> Iterator[Dict[str, Any]]:
+    # 解不开的行（崩溃留下的残行被后续追加接上）跳过并记日志，不让整个题库加载失败
+    for line in chunk.splitlines():
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            logger.warning("跳过进度日志 %s 中无法解析的一行：%r", path, line[:200])
+            continue
+        if isinstance(record, dict):
+            yield record
+
+
+def _repair_journal_tail(path: Path) -> None:
+    # 调用方持有数据锁。上次写入被打断时文件不以换行结尾，把残行截掉，
+    # 否则新记录会直接接在残行后面，拼成一行坏 JSON
+    try:
+        size = path.stat().st_size
+    except FileNotFoundError:
+        return
+    if not size:
+        return
+    with path.open("r+b") as handle:
+        handle.seek(size - 1)
+        if handle.read(1) == b"\n":
+            return
+        position = size
+        while position > 0:
+            step = min(4096, position)
+            position -= step
+            handle.seek(position)
+            newline = handle.read(step).rfind(b"\n")
+            if newline >= 0:
+                position += newline + 1
+                break
+        logger.warning("截掉进度日志 %s 末尾不完整的 %d 字节", path, size - position)
+        handle.truncate(position)
+        handle.flush()
+        os.fsync(handle.fileno())
+
+
+def _file_signature(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class ProgressOverlay:
+    # 多用户模式下某个用户的题目视图：共享题库只读，本用户进度是一层覆盖；
+    # 没做过的题直接引用共享 dict，内存只随该用户动过的题增长
+    def __init__(self, path: Path, journal_path: Path) -> None:
+        self.path = path
+        self.journal_path = journal_path
+        self.version = 0
+        self._changes = ChangeLog()
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._catalog_version: Optional[int] = None
+        self._signature: Optional[Tuple[int, int]] = None
+        self._journal_signature: Optional[Tuple[int, int]] = None
+        self._journal_offset = 0
+        self._progress: Dict[str, Dict[str, Any]] = {}
+        self._questions: List[Dict[str, Any]] = []
+        self._merged: Dict[str, Dict[str, Any]] = {}
+
+    def questions(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            self._refresh()
+            return self._questions
+
+    def get(self, question_id: str) -> Optional[Dict[str, Any]]:
+        return self.get_many([question_id])[0]
+
+    def get_many(self, question_ids: Iterable[str]) -> List[Optional[Dict[str, Any]]]:
+        with self._lock:
+            self._refresh()
+            _, questions, positions = _shared_catalog()
+            result = []
+            for question_id in question_ids:
+                merged = self._merged.get(str(question_id))
+                if merged is None:
+                    position = positions.get(str(question_id))
+                    merged = None if position is None else questions[position]
+                result.append(merged)
+            return result
+
+    def changes_since(self, version: Optional[int]) -> Optional[Set[str]]:
+        with self._lock:
+            self._refresh()
+            return self._changes.since(version, self.version)
+
+    def remember(self, questions: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            self._progress = _progress_overlay(questions)
+            self._signature = _file_signature(self.path)
+            self._journal_signature = _file_signature(self.journal_path)
+            self._journal_offset = (
+                self._journal_signature[1] if self._journal_signature else 0
+            )
+            self._rebuild_view()
+
+    def _refresh(self) -> None:
+        catalog_version, _, _ = _shared_catalog()
+        signature = _file_signature(self.path)
+        journal_signature = _file_signature(self.journal_path)
+        if (
+            self._loaded
+            and catalog_version == self._catalog_version
+            and signature == self._signature
+            and journal_signature == self._journal_signature
+        ):
+            return
+        journal_size = journal_signature[1] if journal_signature else 0
+        if (
+            not self._loaded
+            or signature != self._signature
+            or journal_size < self._journal_offset
+        ):
+            self._progress = self._read_snapshot(signature)
+            self._signature = signature
+            self._journal_offset = 0
+            self._catalog_version = None
+        changed = self._replay_journal()
+        self._journal_signature = journal_signature
+        self._loaded = True
+        if catalog_version != self._catalog_version or changed is None:
+            self._rebuild_view()
+        else:
+            self._patch_view(changed)
+
+    def _read_snapshot(
+        self, signature: Optional[Tuple[int, int]]
+    ) -> Dict[str, Dict[str, Any]]:
+        if signature is None:
+            return {}
+        content = self.path.read_text(encoding="utf-8").strip()
+        return json.loads(content) if content else {}
+
+    def _replay_journal(self) -> Optional[Set[str]]:
+        # 返回被改动的题号；遇到 reset_all 返回 None，表示整个视图要重建
+        changed: Optional[Set[str]] = set()
+        if not self.journal_path.exists():
+            return changed
+        with self.journal_path.open("rb") as handle:
+            handle.seek(self._journal_offset)
+            chunk = handle.read()
+        end = chunk.rfind(b"\n") + 1
+        for record in _journal_records(chunk[:end], self.journal_path):
+            if record.get("op") == "reset_all":
+                self._progress.clear()
+                changed = None
+                continue
+            question_id = str(record.get("id"))
+            fields = self._progress.setdefault(question_id, {})
+            fields.update(
+                {field: record[field] for field in PROGRESS_FIELDS if field in record}
+            )
+            if changed is not None:
+                changed.add(question_id)
+        self._journal_offset += end
+        return changed
+
+    def _rebuild_view(self) -> None:
+        catalog_version, questions, positions = _shared_catalog()
+        self._questions = list(questions)
+        self._merged = {}
+        self._catalog_version = catalog_version
+        self._merge(self._progress)
+        self._bump(None)
+
+    def _patch_view(self, question_ids: Set[str]) -> None:
+        self._merge(question_ids)
+        self._bump(set(question_ids))
+
+    def _merge(self, question_ids: Iterable[str]) -> None:
+        _, questions, positions = _shared_catalog()
+        for question_id in question_ids:
+            position = positions.get(question_id)
+            if position is None:
+                continue
+            merged = {**questions[position], **self._progress.get(question_id, {})}
+            self._questions[position] = merged
+            self._merged[question_id] = merged
+
+    def _bump(self, changed: Optional[Set[str]]) -> None:
+        self.version += 1
+        self._changes.record(self.version, changed)
+
+
+def _progress_overlay(questions: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    # 只保留偏离默认值的题目进度，作为用户快照落盘
+    defaults = PROGRESS_DEFAULTS
+    return {
+        str(q.get("id")): {field: q.get(field, defaults[field]) for field in defaults}
+        for q in questions
+        if any(q.get(field, defaults[field]) != defaults[field] for field in defaults)
+    }
+
+
+class Workspace:
+    # 一套数据路径 + 对应的题目缓存。单用户模式只有默认工作区（仓库根目录），
+    # 多用户模式下每个用户一个 users/<user>/ 工作区，各自持有写锁
+    def __init__(self, root: Path, user: Optional[str] = None) -> None:
+        self.root = root
+        self.user = user
+        data_dir = root / "data"
+        snapshot = "problems.json" if user is None else "progress.json"
+        self.data_path = data_dir / snapshot
+        self.progress_path = data_dir / "progress.jsonl"
+        self.solutions_dir = root / "solutions"
+        self.best_dir = self.solutions_dir / "best"
+        self.notes_dir = root / "notes"
+        self.manifest_path = self.solutions_dir / "manifest.json"
+        self.lock_path = data_dir / ".data.lock"
+        self.cache_dir = root / ".cache"
+        self.store: Union[QuestionStore, ProgressOverlay] = (
+            QuestionStore(self.data_path, self.progress_path)
+            if user is None
+            else ProgressOverlay(self.data_path, self.progress_path)
+        )
+        # 随机抽题的别名表与复习到期堆，都按 store.version 判断是否失效
+        self.sampler: Optional[AliasSampler] = None
+        self.sampler_key: Optional[Tuple[int, int]] = None
+        self.review_queue: Optional[ReviewQueue] = None
+        self.review_version: Optional[int] = None
+
+
+USERS_DIR = Path(__file__).resolve().parents[1] / "users"
+USER_ID_RE = re.compile(r"[A-Za-z0-9_-]{1,32}")
+
+_DEFAULT = Workspace(Path(__file__).resolve().parents[1])
+_WORKSPACES: Dict[str, Workspace] = {}
+_WORKSPACES_LOCK = threading.Lock()
+_CURRENT = threading.local()
+_SHARED_LOCK = threading.Lock()
+_SCHEDULE_LOCK = threading.RLock()
+_SHARED: Dict[str, Any] = {"version": None, "questions": [], "positions": {}}
+
+
+def multi_user_enabled() -> bool:
+    flag = os.getenv("LC_HUNTER_MULTI_USER", "").strip().lower()
+    return flag in ("1", "true", "yes")
+
+
+def get_workspace(user: Optional[str] = None) -> Workspace:
+    if user is None:
+        return _DEFAULT
+    # fullmatch 而不是 match + $：$ 会放过末尾的换行，“alice\n”会变成另一个目录
+    if not USER_ID_RE.fullmatch(user):
+        raise ValueError(f"非法用户名: {user!r}（只允许字母、数字、_ 和 -）")
+    with _WORKSPACES_LOCK:
+        workspace = _WORKSPACES.get(user)
+        if workspace is None:
+            workspace = _WORKSPACES[user] = Workspace(USERS_DIR / user, user)
+        return workspace
+
+
+def current_workspace() -> Workspace:
+    return getattr(_CURRENT, "workspace", None) or _DEFAULT
+
+
+def set_current_user(user: Optional[str]) -> Workspace:
+    # 当前线程之后的读写都落到该用户的工作区（Streamlit 每次重跑在脚本线程开头调用）
+    _CURRENT.workspace = get_workspace(user)
+    return _CURRENT.workspace
+
+
+@contextmanager
+def user_workspace(user: Optional[str]) -> Iterator[Workspace]:
+    previous = getattr(_CURRENT, "workspace", None)
+    try:
+        yield set_current_user(user)
+    finally:
+        _CURRENT.workspace = previous
+
+
+def _shared_catalog() -> Tuple[int, List[Dict[str, Any]], Dict[str, int]]:
+    # 多用户共享的静态题库：每个进程每个题库版本只构建一次，进度字段一律取默认值
+    questions = _DEFAULT.store.questions()
+    version = _DEFAULT.store.version
+    with _SHARED_LOCK:
+        if _SHARED["version"] != version:
+            clean = [
+                {**q, **PROGRESS_DEFAULTS}
+                for q in questions
+            ]
+            _SHARED["questions"] = clean
+            _SHARED["positions"] = {
+                str(q.get("id")): position for position, q in enumerate(clean)
+            }
+            _SHARED["version"] = version
+        return version, _SHARED["questions"], _SHARED["positions"]
+
+
+def get_store() -> Union[QuestionStore, ProgressOverlay]:
+    return current_workspace().store
+
+
+def catalog_version() -> int:
+    # 先让 store 比对一次文件签名，外部改写过的题库也能拿到新的版本号
+    store = current_workspace().store
+    store.questions()
+    return store.version
+
+
+_LISTENERS: List[Callable[[str, Optional[str]], None]] = []
+
+
+def subscribe(listener: Callable[[str, Optional[str]], None]) -> None:
+    # 状态变更回调：event 为 solved / reset / reset_all / catalog
+    if listener not in _LISTENERS:
+        _LISTENERS.append(listener)
+
+
+def _notify(event: str, question_id: Optional[str] = None) -> None:
+    for listener in list(_LISTENERS):
+        listener(event, question_id)
+
+
+def configure_root(root: Path) -> None:
+    # 把数据目录整体切到另一个根目录（基准测试、临时沙盒用）
+    global DATA_PATH, PROGRESS_PATH, SOLUTIONS_DIR, BEST_DIR, NOTES_DIR
+    global MANIFEST_PATH, LOCK_PATH, USERS_DIR, _DEFAULT
+    _DEFAULT = Workspace(root)
+    DATA_PATH = _DEFAULT.data_path
+    PROGRESS_PATH = _DEFAULT.progress_path
+    SOLUTIONS_DIR = _DEFAULT.solutions_dir
+    BEST_DIR = _DEFAULT.best_dir
+    NOTES_DIR = _DEFAULT.notes_dir
+    MANIFEST_PATH = _DEFAULT.manifest_path
+    LOCK_PATH = _DEFAULT.lock_path
+    USERS_DIR = root / "users"
+    with _WORKSPACES_LOCK:
+        _WORKSPACES.clear()
+    _CURRENT.workspace = None
 
 
 def load_questions() -> List[Dict[str, Any]]:
-    if not DATA_PATH.exists():
-        return []
-    content = DATA_PATH.read_text(encoding="utf-8").strip()
-    if not content:
-        return []
-    return json.loads(content)
+    return current_workspace().store.questions()
+
+
+def get_question(question_id: str) -> Optional[Dict[str, Any]]:
+    return current_workspace().store.get(question_id)
+
+
+def get_questions(question_ids: Iterable[str]) -> List[Optional[Dict[str, Any]]]:
+    # 批量查找只刷新一次缓存，顺序与传入的 id 一致，不存在的题返回 None
+    return current_workspace().store.get_many(question_ids)
 
 
 def save_questions(questions: List[Dict[str, Any]]) -> None:
-    DATA_PATH.write_text(
-        json.dumps(questions, ensure_ascii=False, indent=2),
-        encoding="utf-8",
+    ws = current_workspace()
+    with file_lock(ws.lock_path):
+        if ws.user is None:
+            payload: Any = questions
+        else:
+            payload = _progress_overlay(questions)
+        atomic_write_text(
+            ws.data_path, json.dumps(payload, ensure_ascii=False, indent=2)
+        )
+        if ws.progress_path.exists():
+            ws.progress_path.write_bytes(b"")
+        ws.store.remember(questions)
+
+
+def compact_progress(force: bool = False) -> bool:
+    ws = current_workspace()
+    with file_lock(ws.lock_path):
+        if not ws.progress_path.exists():
+            return False
+        if not force and ws.progress_path.stat().st_size < COMPACT_THRESHOLD_BYTES:
+            return False
+        save_questions(load_questions())
+        return True
+
+
+def merge_catalog(
+    records: Iterable[Dict[str, Any]], prune: bool = False
+) -> Dict[str, int]:
+    # 按 id 合并外部题库：只覆盖题目元数据，status/my_code/notes 原样保留。
+    # 题库是全体用户共享的，所以总是写默认工作区
+    with user_workspace(None), file_lock(_DEFAULT.lock_path):
+        existing = load_questions()
+        merged = {str(q.get("id")): dict(q) for q in existing}
+        seen = set()
+        counts = {"added": 0, "updated": 0, "unchanged": 0, "removed": 0, "kept": 0}
+        for record in records:
+            question_id = str(record["id"])
+            seen.add(question_id)
+            catalog = {
+                field: record[field] for field in CATALOG_FIELDS if field in record
+            }
+            catalog["id"] = question_id
+            current = merged.get(question_id)
+            if current is None:
+                merged[question_id] = {**catalog, **PROGRESS_DEFAULTS}
+                counts["added"] += 1
+            elif any(current.get(k) != v for k, v in catalog.items()):
+                current.update(catalog)
+                counts["updated"] += 1
+            else:
+                counts["unchanged"] += 1
+        for question_id in list(merged):
+            if question_id in seen:
+                continue
+            if prune:
+                del merged[question_id]
+                counts["removed"] += 1
+            else:
+                counts["kept"] += 1
+        changed = bool(counts["added"] or counts["updated"] or counts["removed"])
+        if changed:
+            save_questions(list(merged.values()))
+    if changed:
+        _notify("catalog")
+    return counts
+
+
+def import_progress(records: List[Dict[str, Any]]) -> int:
+    # 批量写入外部进度（导入备份包等），不计入当天的做题记录
+    entries = [
+        {
+            "id": str(record["id"]),
+            **{field: record[field] for field in PROGRESS_FIELDS if field in record},
+        }
+        for record in records
+        if get_question(record["id"]) is not None
+    ]
+    if entries:
+        _append_progress(entries)
+        _notify("catalog")
+    return len(entries)
+
+
+def progress_paths() -> List[Path]:
+    ws = current_workspace()
+    return [path for path in (ws.data_path, ws.progress_path) if path.exists()]
+
+
+def progress_times() -> Tuple[Dict[str, float], float]:
+    # 每道题本地进度最后一次变化的时间：取日志里该题最后一条记录写入的 ts，不看文件
+    # mtime（复制目录、合并题库都会改 mtime）。日志里没有的题已被压缩进快照，
+    # 统一用第二个返回值（快照的 mtime）
+    ws = current_workspace()
+    try:
+        default = ws.data_path.stat().st_mtime
+    except FileNotFoundError:
+        default = 0.0
+    try:
+        raw = ws.progress_path.read_bytes()
+    except FileNotFoundError:
+        raw = b""
+    times: Dict[str, float] = {}
+    for record in _journal_records(raw[: raw.rfind(b"\n") + 1], ws.progress_path):
+        try:
+            stamp = datetime.fromisoformat(record["ts"]).timestamp()
+        except (KeyError, TypeError, ValueError):
+            continue
+        if record.get("op") == "reset_all":
+            times.clear()
+            default = max(default, stamp)
+        else:
+            times[str(record.get("id"))] = stamp
+    return times, default
+
+
+def _append_progress(records: List[Dict[str, Any]]) -> None:
+    ws = current_workspace()
+    ws.progress_path.parent.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.now().isoformat(timespec="seconds")
+    lines = "".join(
+        json.dumps({**record, "ts": stamp}, ensure_ascii=False) + "\n"
+        for record in records
     )
+    with file_lock(ws.lock_path):
+        _repair_journal_tail(ws.progress_path)
+        with ws.progress_path.open("a", encoding="utf-8") as handle:
+            handle.write(lines)
+            handle.flush()
+            os.fsync(handle.fileno())
+        compact_progress()
 
 
 def get_random_question() -> Optional[Dict[str, Any]]:
-    questions = load_questions()
+    # 未完成 : 已完成 = 3 : 1 加权；别名表只在题目状态变化（缓存版本变化）时重建
+    ws = current_workspace()
+    questions = ws.store.questions()
     if not questions:
         return None
-    weights = [3 if q.get("status") == "unsolved" else 1 for q in questions]
-    return random.choices(questions, weights=weights, k=1)[0]
-
-
-def update_status(question_id: str, code: str, notes: str) -> Optional[Dict[str, Any]]:
-    questions = load_questions()
-    updated_question = None
-    for question in questions:
-        if str(question.get("id")) == str(question_id):
-            question["status"] = "solved"
-            question["my_code"] = code
-            question["notes"] = notes
-            updated_question = question
-            break
-    if updated_question is None:
-        return None
-    save_questions(questions)
-    return updated_question
+    with _SCHEDULE_LOCK:
+        key = (ws.store.version, len(questions))
+        if ws.sampler is None or ws.sampler_key != key:
+            ws.sampler = AliasSampler(
+                [3 if q.get("status") == "unsolved" else 1 for q in questions]
+            )
+            ws.sampler_key = key
+        return questions[ws.sampler.sample()]
+
+
+def _review_queue(ws: "Workspace") -> ReviewQueue:
+    # 调用方持有 _SCHEDULE_LOCK。版本变化时按存储记录的改动题号（含其他进程写入的）
+    # 就地重新排期；题库被整体重载或改动记录已过期时才重建
+    questions = ws.store.questions()
+    version = ws.store.version
+    if ws.review_queue is not None and ws.review_version != version:
+        changed = ws.store.changes_since(ws.review_version)
+        if changed is None:
+            ws.review_queue = None
+        else:
+            for question in ws.store.get_many(sorted(changed)):
+                if question is not None:
+                    ws.review_queue.update(question)
+    if ws.review_queue is None:
+        ws.review_queue = ReviewQueue(questions)
+    ws.review_version = version
+    return ws.review_queue
+
+
+def next_review_question(today: Optional[date] = None) -> Optional[Dict[str, Any]]:
+    # 从到期堆中弹出最早到期的已完成题，每次 O(log n)；没有到期的题返回 None
+    ws = current_workspace()
+    with _SCHEDULE_LOCK:
+        queue = _review_queue(ws)
+        while True:
+            question_id = queue.pop_due(today)
+            if question_id is None:
+                return None
+            question = ws.store.get(question_id)
+            if question is not None:
+                return question
+
+
+def next_review_due() -> Optional[str]:
+    ws = current_workspace()
+    with _SCHEDULE_LOCK:
+        head = _review_queue(ws).peek()
+        return head[0] if head else None
+
+
+def _reschedule() -> None:
+    # 本进程刚写入状态变更：趁改动记录还在，把复习堆增量同步到最新
+    ws = current_workspace()
+    with _SCHEDULE_LOCK:
+        if ws.review_queue is not None:
+            _review_queue(ws)
+
+
+def update_status(
+    question_id: str, code: str, notes: str, quality: int = DEFAULT_QUALITY
+) -> Optional[Dict[str, Any]]:
+    # quality 为 0-5 的自评掌握程度，按 SM-2 更新该题的难度系数与下次复习日期。
+    # 上一次的复习状态在数据锁内读取，并发提交各自基于对方写入后的间隔与难度系数
+    with file_lock(current_workspace().lock_path):
+        question = get_question(question_id)
+        if question is None:
+            return None
+        review = sm2_update(question.get("review"), quality)
+        _append_progress(
+            [
+                {
+                    "id": str(question_id),
+                    # 标记这是一次页面提交（而非导入），统计据此记每日打卡
+                    "op": "submit",
+                    "status": "solved",
+                    "my_code": code,
+                    "notes": notes,
+                    "review": review,
+                }
+            ]
+        )
+    _reschedule()
+    _notify("solved", str(question_id))
+    return get_question(question_id)
 
 
 def save_solution(question_id: str, title: str, code: str, is_best: bool) -> Path:
-    SOLUTIONS_DIR.mkdir(parents=True, exist_ok=True)
-    if is_best:
-        BEST_DIR.mkdir(parents=True, exist_ok=True)
-        filename = f"{_format_id(question_id)}_{_slugify_title(title)}.py"
-        target_dir = BEST_DIR
-    else:
-        filename = (
-            f"{_format_id(question_id)}_{_slugify_title(title)}_{_timestamp()}.py"
+    ws = current_workspace()
+    ws.solutions_dir.mkdir(parents=True, exist_ok=True)
+    prefix = solution_prefix(question_id, title)
+    digest = _sha256(code)
+    with file_lock(ws.lock_path):
+        manifest = _load_manifest()
+        entry = manifest["questions"].setdefault(
+            str(question_id), {"prefix": prefix, "attempts": [], "best": None}
         )
-        target_dir = SOLUTIONS_DIR
-    path = target_dir / filename
-    path.write_text(code, encoding="utf-8")
+        if is_best:
+            ws.best_dir.mkdir(parents=True, exist_ok=True)
+            path = ws.best_dir / f"{prefix}.py"
+            best = entry.get("best")
+            if best is None or best["sha256"] != digest or not path.exists():
+                atomic_write_text(path, code)
+                entry["best"] = _attempt_record(path, digest, code)
+            _mark_best(entry)
+        else:
+            # 与已有某次提交字节相同则直接复用，不再生成新的时间戳文件
+            existing = next(
+                (a for a in entry["attempts"] if a["sha256"] == digest), None
+            )
+            if existing is not None and (ws.solutions_dir / existing["file"]).exists():
+                _save_manifest(manifest)
+                return ws.solutions_dir / existing["file"]
+            path = _unique_path(ws.solutions_dir / f"{prefix}_{_timestamp()}.py")
+            atomic_write_text(path, code)
+            entry["attempts"].append(_attempt_record(path, digest, code))
+            _mark_best(entry)
+        _save_manifest(manifest)
     return path
 
 
+def save_solutions(
+    items: Iterable[Tuple[str, str, str, Optional[str]]],
+    is_best: bool = False,
+    workers: int = 8,
+) -> List[Path]:
+    # 批量版 save_solution：items 为 (题号, 标题, 代码, 时间戳)，时间戳为空时取当前时间。
+    # 整批只加一次锁、读写一次清单；新文件的落盘交给线程池并行。返回实际写入的文件
+    ws = current_workspace()
+    ws.solutions_dir.mkdir(parents=True, exist_ok=True)
+    if is_best:
+        ws.best_dir.mkdir(parents=True, exist_ok=True)
+    writes: List[Tuple[Path, str]] = []
+    reserved: set = set()
+    with file_lock(ws.lock_path):
+        manifest = _load_manifest()
+        for question_id, title, code, stamp in items:
+            prefix = solution_prefix(question_id, title)
+            digest = _sha256(code)
+            entry = manifest["questions"].setdefault(
+                str(question_id), {"prefix": prefix, "attempts": [], "best": None}
+            )
+            if is_best:
+                path = ws.best_dir / f"{prefix}.py"
+                best = entry.get("best")
+                if best is None or best["sha256"] != digest or not path.exists():
+                    writes.append((path, code))
+                    entry["best"] = _attempt_record(path, digest, code)
+            else:
+                existing = next(
+                    (a for a in entry["attempts"] if a["sha256"] == digest), None
+                )
+                if existing is not None:
+                    existing_path = ws.solutions_dir / existing["file"]
+                    # 同一批次里刚排队写入的文件此时还不在磁盘上
+                    if existing_path in reserved or existing_path.exists():
+                        continue
+                path = _unique_path(
+                    ws.solutions_dir / f"{prefix}_{stamp or _timestamp()}.py", reserved
+                )
+                reserved.add(path)
+                writes.append((path, code))
+                entry["attempts"].append(_attempt_record(path, digest, code))
+            _mark_best(entry)
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            list(pool.map(lambda job: atomic_write_text(*job), writes))
+        _save_manifest(manifest)
+    return list(dict.fromkeys(path for path, _ in writes))
+
+
+def solution_matcher() -> Callable[[Path], Optional[str]]:
+    # 导入外部解法时按文件名认题：先看开头的题号（按 _format_id 补零后比较），
+    # 再看 slug（题目标题或 LeetCode 链接，按 _slugify_title 归一化）；
+    # 文件名认不出来时再用所在目录名试一次
+    by_id: Dict[str, str] = {}
+    by_slug: Dict[str, str] = {}
+    for question in load_questions():
+        question_id = str(question.get("id"))
+        by_id[_format_id(question_id)] = question_id
+        url_slug = str(question.get("url") or "").rstrip("/").rsplit("/", 1)[-1]
+        for text in (str(question.get("title") or ""), url_slug):
+            slug = _slugify_title(text)
+            if slug != "solution":
+                by_slug.setdefault(slug, question_id)
+
+    def match(path: Path) -> Optional[str]:
+        for name in (path.stem, path.parent.name):
+            digits = re.match(r"^\s*(\d+)", name)
+            if digits is not None:
+                question_id = by_id.get(_format_id(str(int(digits.group(1)))))
+                if question_id is not None:
+                    return question_id
+            slug = _slugify_title(re.sub(r"^\s*\d+[\W_]*", "", name))
+            if slug in by_slug:
+                return by_slug[slug]
+        return None
+
+    return match
+
+
+def list_attempts(question_id: str) -> List[Dict[str, Any]]:
+    ws = current_workspace()
+    with file_lock(ws.lock_path):
+        entry = _load_manifest()["questions"].get(str(question_id))
+    if entry is None:
+        return []
+    return [
+        {**attempt, "path": ws.solutions_dir / attempt["file"]}
+        for attempt in entry["attempts"]
+    ]
+
+
+def get_best_attempt(question_id: str) -> Optional[Dict[str, Any]]:
+    ws = current_workspace()
+    with file_lock(ws.lock_path):
+        entry = _load_manifest()["questions"].get(str(question_id))
+    if entry is None or entry.get("best") is None:
+        return None
+    return {**entry["best"], "path": ws.solutions_dir / entry["best"]["file"]}
+
+
+def set_best_attempt(question_id: str, title: str, source: Path) -> Path:
+    code = source.read_text(encoding="utf-8")
+    return save_solution(question_id, title, code, is_best=True)
+
+
+def rebuild_solution_manifest(save: bool = False) -> Dict[str, Any]:
+    # 从目录重建清单：仅用于首次迁移、导入或手动修复，日常读写都走清单
+    ws = current_workspace()
+    prefixes = {
+        solution_prefix(q.get("id"), q.get("title", "")): str(q.get("id"))
+        for q in load_questions()
+    }
+    manifest: Dict[str, Any] = {"version": MANIFEST_VERSION, "questions": {}}
+    if not ws.solutions_dir.exists():
+        return manifest
+    for path in sorted(ws.solutions_dir.rglob("*.py")):
+        is_best = path.parent == ws.best_dir
+        prefix = path.stem if is_best else path.stem.rsplit("_", 2)[0]
+        question_id = prefixes.get(prefix)
+        if question_id is None:
+            digits = re.match(r"^(\d+)_", path.name)
+            if digits is None:
+                continue
+            question_id = str(int(digits.group(1)))
+        entry = manifest["questions"].setdefault(
+            question_id, {"prefix": prefix, "attempts": [], "best": None}
+        )
+        code = path.read_text(encoding="utf-8")
+        record = _attempt_record(path, _sha256(code), code)
+        if is_best:
+            entry["best"] = record
+        elif all(a["sha256"] != record["sha256"] for a in entry["attempts"]):
+            entry["attempts"].append(record)
+    for entry in manifest["questions"].values():
+        _mark_best(entry)
+    if save:
+        with file_lock(ws.lock_path):
+            _save_manifest(manifest)
+    return manifest
+
+
+def _load_manifest() -> Dict[str, Any]:
+    ws = current_workspace()
+    if not ws.manifest_path.exists():
+        manifest = rebuild_solution_manifest()
+        if manifest["questions"]:
+            _save_manifest(manifest)
+        return manifest
+    return json.loads(ws.manifest_path.read_text(encoding="utf-8"))
+
+
+def _save_manifest(manifest: Dict[str, Any]) -> None:
+    ws = current_workspace()
+    atomic_write_text(
+        ws.manifest_path, json.dumps(manifest, ensure_ascii=False, indent=2)
+    )
+
+
+def _attempt_record(path: Path, digest: str, code: str) -> Dict[str, Any]:
+    ws = current_workspace()
+    stamp = re.search(r"(\d{8}_\d{6})(?:_\d+)?$", path.stem)
+    return {
+        "file": path.relative_to(ws.solutions_dir).as_posix(),
+        "sha256": digest,
+        "timestamp": stamp.group(1) if stamp else _timestamp(),
+        "size": len(code.encode("utf-8")),
+        "best": False,
+    }
+
+
+def _mark_best(entry: Dict[str, Any]) -> None:
+    best = entry.get("best")
+    best_hash = best["sha256"] if best else None
+    if best is not None:
+        best["best"] = True
+    for attempt in entry["attempts"]:
+        attempt["best"] = attempt["sha256"] == best_hash
+
+
+def _unique_path(path: Path, reserved: Iterable[Path] = ()) -> Path:
+    candidate = path
+    counter = 1
+    while candidate.exists() or candidate in reserved:
+        candidate = path.with_name(f"{path.stem}_{counter}{path.suffix}")
+        counter += 1
+    return candidate
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
 def save_notes(question_id: str, title: str, notes: str) -> Optional[Path]:
+    ws = current_workspace()
     if not notes.strip():
         return None
-    NOTES_DIR.mkdir(parents=True, exist_ok=True)
-    filename = f"{_format_id(question_id)}_{_slugify_title(title)}.md"
-    path = NOTES_DIR / filename
+    ws.notes_dir.mkdir(parents=True, exist_ok=True)
+    path = _notes_path(question_id, title)
     header = f"[{_timestamp()}]\n"
-    content = header + notes.rstrip() + "\n\n"
-    path.write_text(
-        (path.read_text(encoding="utf-8") if path.exists() else "") + content,
-        encoding="utf-8",
-    )
+    content = (header + notes.rstrip() + "\n\n").encode("utf-8")
+    with file_lock(ws.lock_path):
+        entries = _note_entries(path)
+        with path.open("ab") as handle:
+            handle.seek(0, os.SEEK_END)
+            offset = handle.tell()
+            handle.write(content)
+            end = handle.tell()
+        # 旧文件没有索引（或索引过期）时 _note_entries 已重建，这里只追加一条
+        if entries is not None:
+            with _notes_index_path(path).open("ab") as handle:
+                handle.write(_format_note_entry(offset, end))
     return path
 
 
 def read_notes(question_id: str, title: str) -> str:
-    filename = f"{_format_id(question_id)}_{_slugify_title(title)}.md"
-    path = NOTES_DIR / filename
+    path = _notes_path(question_id, title)
     if not path.exists():
         return ""
     return path.read_text(encoding="utf-8")
 
 
+def read_notes_page(
+    question_id: str, title: str, page: int = 0, page_size: int = 5
+) -> Tuple[List[Tuple[str, str]], int]:
+    # 按时间倒序分页：通过 .idx 定长记录直接 seek，不读取整份笔记历史
+    ws = current_workspace()
+    path = _notes_path(question_id, title)
+    if not path.exists():
+        return [], 0
+    with file_lock(ws.lock_path):
+        total = _note_entries(path)
+    if not total:
+        return [], 0
+    newest = total - 1 - page * page_size
+    oldest = max(newest - page_size + 1, 0)
+    if newest < 0:
+        return [], total
+    entries: List[Tuple[str, str]] = []
+    with _notes_index_path(path).open("rb") as index, path.open("rb") as handle:
+        index.seek(oldest * NOTE_INDEX_RECORD_SIZE)
+        raw = index.read((newest - oldest + 1) * NOTE_INDEX_RECORD_SIZE)
+        for position in range(len(raw) // NOTE_INDEX_RECORD_SIZE - 1, -1, -1):
+            record = raw[
+                position * NOTE_INDEX_RECORD_SIZE : (position + 1)
+                * NOTE_INDEX_RECORD_SIZE
+            ]
+            offset, end = (int(part) for part in record.split())
+            handle.seek(offset)
+            text = handle.read(end - offset).decode("utf-8", errors="replace")
+            entries.append(_split_note_entry(text))
+    return entries, total
+
+
+def notes_version(question_id: str, title: str) -> Optional[Tuple[int, int]]:
+    # 笔记只追加写入，文件的 (mtime, size) 足以作为分页结果的缓存键
+    return _file_signature(_notes_path(question_id, title))
+
+
+def _notes_path(question_id: str, title: str) -> Path:
+    ws = current_workspace()
+    return ws.notes_dir / f"{solution_prefix(question_id, title)}.md"
+
+
+def _notes_index_path(path: Path) -> Path:
+    return path.with_name(path.name + ".idx")
+
+
+def _format_note_entry(offset: int, end: int) -> bytes:
+    return f"{offset:012d} {end:012d}\n".encode("ascii")
+
+
+def _note_entries(path: Path) -> Optional[int]:
+    # 返回索引中的条目数；若索引缺失或与笔记文件大小对不上则整体重建一次
+    if not path.exists():
+        return None
+    index_path = _notes_index_path(path)
+    size = path.stat().st_size
+    if index_path.exists():
+        index_size = index_path.stat().st_size
+        if index_size % NOTE_INDEX_RECORD_SIZE == 0:
+            if index_size == 0:
+                if size == 0:
+                    return 0
+            else:
+                with index_path.open("rb") as index:
+                    index.seek(index_size - NOTE_INDEX_RECORD_SIZE)
+                    last_end = int(index.read().split()[1])
+                if last_end == size:
+                    return index_size // NOTE_INDEX_RECORD_SIZE
+    return _rebuild_notes_index(path)
+
+
+def _rebuild_notes_index(path: Path) -> int:
+    offsets: List[int] = []
+    position = 0
+    with path.open("rb") as handle:
+        for line in handle:
+            if NOTE_HEADER_RE.match(line.decode("utf-8", errors="replace")):
+                offsets.append(position)
+            position += len(line)
+    if position and (not offsets or offsets[0] != 0):
+        offsets.insert(0, 0)
+    ends = offsets[1:] + [position]
+    atomic_write_bytes(
+        _notes_index_path(path),
+        b"".join(_format_note_entry(o, e) for o, e in zip(offsets, ends)),
+    )
+    return len(offsets)
+
+
+def _split_note_entry(text: str) -> Tuple[str, str]:
+    first, _, rest = text.partition("\n")
+    match = NOTE_HEADER_RE.match(first)
+    if match is None:
+        return "", text.strip()
+    return match.group(1), rest.strip()
+
+
 def reset_question_data(question_id: str) -> Optional[Dict[str, Any]]:
-    questions = load_questions()
-    updated_question = None
-    for question in questions:
-        if str(question.get("id")) == str(question_id):
-            question["status"] = "unsolved"
-            question["my_code"] = ""
-            question["notes"] = ""
-            updated_question = question
-            break
-    if updated_question is None:
+    if get_question(question_id) is None:
         return None
-    save_questions(questions)
-    return updated_question
+    _append_progress(
+        [{"id": str(question_id), **PROGRESS_DEFAULTS}]
+    )
+    _reschedule()
+    _notify("reset", str(question_id))
+    return get_question(question_id)
 
 
 def reset_all_questions() -> int:
-    questions = load_questions()
-    for question in questions:
-        question["status"] = "unsolved"
-        question["my_code"] = ""
-        question["notes"] = ""
-    save_questions(questions)
-    return len(questions)
+    _append_progress([{"op": "reset_all"}])
+    with _SCHEDULE_LOCK:
+        current_workspace().review_queue = None
+    _notify("reset_all")
+    return len(load_questions())
 
 
 def clear_question_files(question_id: str, title: str) -> None:
-    prefix = f"{_format_id(question_id)}_{_slugify_title(title)}"
-    if SOLUTIONS_DIR.exists():
-        for path in SOLUTIONS_DIR.glob(f"{prefix}_*.py"):
-            if path.is_file():
+    ws = current_workspace()
+    prefix = solution_prefix(question_id, title)
+    with file_lock(ws.lock_path):
+        manifest = _load_manifest()
+        entry = manifest["questions"].pop(str(question_id), None)
+        if entry is not None:
+            records = entry["attempts"] + ([entry["best"]] if entry["best"] else [])
+            for record in records:
+                path = ws.solutions_dir / record["file"]
+                if path.exists():
+                    path.unlink()
+            _save_manifest(manifest)
+        notes_path = ws.notes_dir / f"{prefix}.md"
+        for path in (notes_path, _notes_index_path(notes_path)):
+            if path.exists():
                 path.unlink()
-    best_path = BEST_DIR / f"{prefix}.py"
-    if best_path.exists():
-        best_path.unlink()
-    notes_path = NOTES_DIR / f"{prefix}.md"
-    if notes_path.exists():
-        notes_path.unlink()
 
 
 def clear_all_files() -> None:
-    if SOLUTIONS_DIR.exists():
-        for path in SOLUTIONS_DIR.rglob("*"):
-            if path.is_file():
-                path.unlink()
-    if NOTES_DIR.exists():
-        for path in NOTES_DIR.rglob("*"):
-            if path.is_file():
-                path.unlink()
+    ws = current_workspace()
+    with file_lock(ws.lock_path):
+        if ws.solutions_dir.exists():
+            for path in ws.solutions_dir.rglob("*"):
+                if path.is_file():
+                    path.unlink()
+        if ws.notes_dir.exists():
+            for path in ws.notes_dir.rglob("*"):
+                if path.is_file():
+                    path.unlink()
 
 
 def _format_id(question_id: str) -> str:
@@ -153,6 +1194,11 @@ def _slugify_title(title: str) -> str:
     return slug or "solution"
 
 
+def solution_prefix(question_id: str, title: str) -> str:
+    # 解法与笔记文件名的公共前缀：{补零题号}_{英文 slug}
+    return f"{_format_id(question_id)}_{_slugify_title(title)}"
+
+
 def format_commit_message(question_id: str, title: str) -> str:
     return f"Solve {_format_id(question_id)} {_slugify_title(title)}"
 
@@ -0,0 +1,176 @@
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from utils.data_manager import current_workspace, get_store, subscribe
+
+FACETS = ("tags", "difficulty", "status")
+
+
+def _popcount(bits: int) -> int:
+    return bin(bits).count("1")
+
+
+def _facet_values(question: Dict[str, Any], facet: str) -> List[str]:
+    if facet == "tags":
+        return list(question.get("tags", []))
+    if facet == "difficulty":
+        return [question.get("difficulty") or "Unknown"]
+    return [question.get("status") or "unsolved"]
+
+
+class FacetIndex:
+    # 每个分面取值一个位图（Python int，第 i 位对应题库第 i 题），查询即位运算求交；
+    # 状态变更只翻转被改动题目的位，不重扫题库
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._version: Optional[int] = None
+        self._ids: List[str] = []
+        self._positions: Dict[str, int] = {}
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._all = 0
+
+    def query(
+        self,
+        tags: Iterable[str] = (),
+        difficulty: Iterable[str] = (),
+        status: Iterable[str] = (),
+    ) -> int:
+        # 标签之间取交集（同时带有这些标签）；难度、状态内部取并集
+        with self._lock:
+            self._ensure()
+            return self._query(list(tags), list(difficulty), list(status))
+
+    def counts(
+        self,
+        tags: Iterable[str] = (),
+        difficulty: Iterable[str] = (),
+        status: Iterable[str] = (),
+    ) -> Dict[str, Dict[str, int]]:
+        # 每个分面的计数都基于“其余分面的当前选择”，选中一个值不会把同分面的其他值清零；
+        # 标签是交集语义，计数即“再加上这个标签后还剩几题”
+        tags, difficulty, status = list(tags), list(difficulty), list(status)
+        with self._lock:
+            self._ensure()
+            bases = {
+                "tags": self._query(tags, difficulty, status),
+                "difficulty": self._query(tags, [], status),
+                "status": self._query(tags, difficulty, []),
+            }
+            return {
+                facet: {
+                    value: _popcount(bases[facet] & bits)
+                    for value, bits in self._postings[facet].items()
+                }
+                for facet in FACETS
+            }
+
+    def count(self, bits: int) -> int:
+        return _popcount(bits)
+
+    def ids(self, bits: int, offset: int = 0, limit: Optional[int] = None) -> List[str]:
+        # 逐个取最低位，只解出当前页需要的题号
+        with self._lock:
+            ids = self._ids
+        result: List[str] = []
+        skipped = 0
+        while bits and (limit is None or len(result) < limit):
+            lowest = bits & -bits
+            bits ^= lowest
+            if skipped < offset:
+                skipped += 1
+                continue
+            result.append(ids[lowest.bit_length() - 1])
+        return result
+
+    def handle(self, event: str, question_id: Optional[str] = None) -> None:
+        # 不只翻转这一个事件的位：同一次刷新里可能还带着其他进程写入的变化，
+        # 统一按存储记录的改动题号同步
+        with self._lock:
+            if self._version is not None:
+                self._ensure()
+
+    def _query(self, tags: List[str], difficulty: List[str], status: List[str]) -> int:
+        bits = self._all
+        for tag in tags:
+            bits &= self._postings["tags"].get(tag, 0)
+        for facet, values in (("difficulty", difficulty), ("status", status)):
+            if values:
+                union = 0
+                for value in values:
+                    union |= self._postings[facet].get(value, 0)
+                bits &= union
+        return bits
+
+    def _patch(self, questions: List[Dict[str, Any]], changed: Iterable[str]) -> bool:
+        if len(questions) != len(self._ids):
+            return False
+        status = self._postings["status"]
+        for question_id in changed:
+            position = self._positions.get(question_id)
+            if position is None:
+                return False
+            bit = 1 << position
+            for value in list(status):
+                status[value] &= ~bit
+            value = _facet_values(questions[position], "status")[0]
+            status[value] = status.get(value, 0) | bit
+        return True
+
+    def _ensure(self) -> None:
+        # 只有进度变化时按改动的题号翻转状态位；题库本身变了或改动记录已过期才整体重建
+        store = get_store()
+        questions = store.questions()
+        if self._version == store.version:
+            return
+        changed = store.changes_since(self._version)
+        if changed is not None and self._patch(questions, changed):
+            self._version = store.version
+            return
+        # 先按取值收集位置，再一次性写成 bytearray 转 int；逐位 | 会反复复制大整数
+        size = (len(questions) + 7) // 8
+        buffers: Dict[str, Dict[str, bytearray]] = {facet: {} for facet in FACETS}
+        for position, question in enumerate(questions):
+            byte, mask = position >> 3, 1 << (position & 7)
+            for facet in FACETS:
+                bucket = buffers[facet]
+                for value in _facet_values(question, facet):
+                    buffer = bucket.get(value)
+                    if buffer is None:
+                        buffer = bucket[value] = bytearray(size)
+                    buffer[byte] |= mask
+        postings = {
+            facet: {
+                value: int.from_bytes(buffer, "little")
+                for value, buffer in bucket.items()
+            }
+            for facet, bucket in buffers.items()
+        }
+        self._ids = [str(q.get("id")) for q in questions]
+        self._positions = {question_id: i for i, question_id in enumerate(self._ids)}
+        self._postings = postings
+        self._all = (1 << len(questions)) - 1
+        self._version = store.version
+
+
+_INDEXES: Dict[Path, FacetIndex] = {}
+_INDEXES_LOCK = threading.Lock()
+
+
+def get_facet_index() -> FacetIndex:
+    # 状态属于各自的工作区，所以每个工作区一份位图
+    workspace = current_workspace()
+    with _INDEXES_LOCK:
+        if not _INDEXES:
+            subscribe(_dispatch)
+        index = _INDEXES.get(workspace.root)
+        if index is None:
+            index = _INDEXES[workspace.root] = FacetIndex()
+        return index
+
+
+def _dispatch(event: str, question_id: Optional[str]) -> None:
+    with _INDEXES_LOCK:
+        index = _INDEXES.get(current_workspace().root)
+    if index is not None:
+        index.handle(event, question_id)
@@ -0,0 +1,96 @@
+import argparse
+import itertools
+import json
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List
+
+
+def _reply_for(messages: List[Dict[str, str]]) -> str:
+    question = messages[-1].get("content", "") if messages else ""
+    return f"（本地桩服务）收到问题：{question}。先想清楚子问题，再写状态转移。"
+
+
+class FakeAIHandler(BaseHTTPRequestHandler):
+    # 本地 OpenAI 兼容桩服务，用于手动验证流式/非流式调用，不依赖真实密钥
+    protocol_version = "HTTP/1.1"
+    token_delay = 0.05
+    reply_delay = 0.0
+    # 每 N 个请求返回一次 fail_status（默认 429），用于验证客户端重试；0 表示不注入
+    fail_every = 0
+    fail_status = 429
+    retry_after = "0"
+    _counter = itertools.count(1)
+
+    def do_POST(self) -> None:
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self.send_error(404)
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        payload: Dict[str, Any] = json.loads(self.rfile.read(length) or b"{}")
+        if self.fail_every and next(self._counter) % self.fail_every == 0:
+            self._send_json({"error": "injected failure"}, status=self.fail_status)
+            return
+        time.sleep(self.reply_delay)
+        reply = _reply_for(payload.get("messages", []))
+        if payload.get("stream"):
+            self._send_stream(reply, payload.get("model", "fake"))
+        else:
+            self._send_json(
+                {
+                    "model": payload.get("model", "fake"),
+                    "choices": [{"message": {"role": "assistant", "content": reply}}],
+                }
+            )
+
+    def _send_json(self, body: Dict[str, Any], status: int = 200) -> None:
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        if status >= 400 and self.retry_after is not None:
+            self.send_header("Retry-After", self.retry_after)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_stream(self, reply: str, model: str) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        for index in range(0, len(reply), 4):
+            chunk = {
+                "model": model,
+                "choices": [{"delta": {"content": reply[index : index + 4]}}],
+            }
+            line = "data: " + json.dumps(chunk, ensure_ascii=False) + "\n\n"
+            self.wfile.write(line.encode("utf-8"))
+            self.wfile.flush()
+            time.sleep(self.token_delay)
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+        self.close_connection = True
+
+    def log_message(self, format: str, *args: Any) -> None:
+        return
+
+
+def serve(host: str = "127.0.0.1", port: int = 8765) -> ThreadingHTTPServer:
+    return ThreadingHTTPServer((host, port), FakeAIHandler)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="本地 OpenAI 兼容桩服务")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--reply-delay", type=float, default=0.0)
+    parser.add_argument("--fail-every", type=int, default=0)
+    parser.add_argument("--fail-status", type=int, default=429)
+    args = parser.parse_args()
+    FakeAIHandler.reply_delay = args.reply_delay
+    FakeAIHandler.fail_every = args.fail_every
+    FakeAIHandler.fail_status = args.fail_status
+    server = serve(args.host, args.port)
+    print(f"Fake AI server on http://{args.host}:{args.port}/v1")
+    server.serve_forever()
@@ -1,5 +1,10 @@
+import os
+import queue
 import subprocess
-from typing import Iterable, List
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
 
 
 def _run_git(args: List[str]) -> subprocess.CompletedProcess:
@@ -28,5 +33,140 @@ def git_add_commit(paths: Iterable[str], message: str) -> subprocess.CompletedPr
     return git_commit(message)
 
 
+def git_is_tracked(path: str) -> bool:
+    result = _run_git(["ls-files", "--", path])
+    return result.returncode == 0 and bool(result.stdout.strip())
+
+
 def git_push() -> subprocess.CompletedProcess:
     return _run_git(["push"])
+
+
+def git_log(args: Iterable[str]) -> subprocess.CompletedProcess:
+    return _run_git(["log", *args])
+
+
+class GitWorker:
+    # 后台线程独占 git：提交入队后立即返回，窗口期内的多次提交合并为一次 add+commit
+    def __init__(self, coalesce_window: float = 2.0) -> None:
+        self.coalesce_window = coalesce_window
+        self._queue: "queue.Queue[Tuple[str, List[str], str]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._status: Dict[str, Dict[str, str]] = {
+            "commit": {"state": "idle", "message": "", "time": ""},
+            "push": {"state": "idle", "message": "", "time": ""},
+        }
+        self._thread = threading.Thread(
+            target=self._run, name="git-worker", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, paths: Iterable[str], message: str) -> None:
+        self._set_status("commit", "pending", message)
+        self._queue.put(("commit", list(paths), message))
+
+    def request_push(self) -> None:
+        self._set_status("push", "pending", "")
+        self._queue.put(("push", [], ""))
+
+    def status(self) -> Dict[str, Dict[str, str]]:
+        with self._lock:
+            return {key: dict(value) for key, value in self._status.items()}
+
+    def _run(self) -> None:
+        while True:
+            kind, paths, message = self._queue.get()
+            if kind == "push":
+                self._push()
+                continue
+            jobs = [(paths, message)]
+            pending_push = False
+            deadline = time.monotonic() + self.coalesce_window
+            while True:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    kind, paths, message = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if kind == "push":
+                    pending_push = True
+                    break
+                jobs.append((paths, message))
+            self._commit(jobs)
+            if pending_push:
+                self._push()
+
+    def _commit(self, jobs: List[Tuple[List[str], str]]) -> None:
+        paths = list(dict.fromkeys(path for job_paths, _ in jobs for path in job_paths))
+        messages = [message for _, message in jobs]
+        if len(messages) == 1:
+            message = messages[0]
+        else:
+            message = f"{messages[0]} (+{len(messages) - 1} more)\n\n" + "\n".join(
+                messages
+            )
+        self._set_status("commit", "running", messages[0])
+        try:
+            result = git_add_commit(paths=_addable(paths), message=message)
+            if result.returncode != 0 and len(jobs) > 1:
+                # 合并提交失败时逐个重试，一条坏记录不连累同批的其他提交
+                result = self._commit_each(jobs)
+        except Exception as exc:
+            self._set_status("commit", "failed", str(exc))
+            return
+        if result.returncode != 0:
+            output = (result.stderr or result.stdout).strip()
+            self._set_status("commit", "failed", output or "Git commit 失败。")
+        else:
+            self._set_status("commit", "ok", f"{len(jobs)} 次提交：{messages[0]}")
+
+    def _commit_each(
+        self, jobs: List[Tuple[List[str], str]]
+    ) -> subprocess.CompletedProcess:
+        failed = None
+        for job_paths, message in jobs:
+            result = git_add_commit(paths=_addable(job_paths), message=message)
+            if result.returncode != 0 and failed is None:
+                failed = result
+        return failed or result
+
+    def _push(self) -> None:
+        self._set_status("push", "running", "")
+        try:
+            result = git_push()
+        except Exception as exc:
+            self._set_status("push", "failed", str(exc))
+            return
+        if result.returncode != 0:
+            self._set_status(
+                "push", "failed", result.stderr.strip() or "Git push 失败。"
+            )
+        else:
+            self._set_status("push", "ok", "已推送到远端。")
+
+    def _set_status(self, key: str, state: str, message: str) -> None:
+        with self._lock:
+            self._status[key] = {
+                "state": state,
+                "message": message,
+                "time": datetime.now().strftime("%H:%M:%S"),
+            }
+
+
+def _addable(paths: List[str]) -> List[str]:
+    # 已被删除的文件：仍受 git 跟踪的交给 add 记录删除，从未跟踪过的直接跳过
+    return [path for path in paths if os.path.exists(path) or git_is_tracked(path)]
+
+
+_WORKER: Optional[GitWorker] = None
+_WORKER_LOCK = threading.Lock()
+
+
+def get_git_worker() -> GitWorker:
+    global _WORKER
+    with _WORKER_LOCK:
+        if _WORKER is None:
+            _WORKER = GitWorker()
+        return _WORKER
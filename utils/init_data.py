@@ -1,5 +1,9 @@
-import json
-import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from utils.data_manager import merge_catalog  # noqa: E402
 
 def create_hot100_json():
     # 完整的 LeetCode Hot 100 题目数据
@@ -107,21 +111,12 @@ def create_hot100_json():
         {"id": "739", "title": "739. 每日温度", "difficulty": "Medium", "url": "https://leetcode.cn/problems/daily-temperatures/", "tags": ["栈", "数组"], "pattern_hint": "【单调栈】栈存下标，保持栈内元素对应温度递减。若当前温度 > 栈顶，说明找到了更高温度，弹出栈顶并计算距离。"}
     ]
 
-    # 初始化状态字段
-    for p in problems:
-        p["status"] = "unsolved"
-        p["my_code"] = ""
-        p["notes"] = ""
-
-    # 确保目录存在
-    os.makedirs('data', exist_ok=True)
-    
-    # 写入文件
-    file_path = 'data/problems.json'
-    with open(file_path, 'w', encoding='utf-8') as f:
-        json.dump(problems, f, ensure_ascii=False, indent=2)
-        
-    print(f"🎉 成功！已生成 {len(problems)} 道 Hot 100 题目到 {file_path}")
+    # 按 id 合并进现有题库，已有题目的 status/my_code/notes 不受影响
+    counts = merge_catalog(problems)
+    print(
+        f"🎉 成功！Hot 100 题库已合并：新增 {counts['added']} 道，"
+        f"更新 {counts['updated']} 道"
+    )
 
 if __name__ == "__main__":
     create_hot100_json()
\ No newline at end of file
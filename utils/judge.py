@@ -0,0 +1,380 @@
+import argparse
+import json
+import math
+import os
+import re
+import threading
+import time
+import traceback
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    import resource
+    import signal
+except ImportError:  # Windows：没有 rlimit/SIGALRM，只能靠父进程超时兜底
+    resource = None
+    signal = None
+
+TESTCASES_PATH = Path(__file__).resolve().parents[1] / "data" / "testcases.json"
+SOLUTIONS_DIR = Path(__file__).resolve().parents[1] / "solutions"
+
+TIME_LIMIT_SECONDS = 2.0
+MEMORY_LIMIT_MB = 256
+
+_POOL: Optional[ProcessPoolExecutor] = None
+_POOL_LOCK = threading.Lock()
+_TESTCASES: Dict[str, Any] = {}
+_TESTCASES_MTIME: Optional[int] = None
+
+
+def load_testcases() -> Dict[str, Any]:
+    global _TESTCASES, _TESTCASES_MTIME
+    try:
+        mtime = TESTCASES_PATH.stat().st_mtime_ns
+    except FileNotFoundError:
+        return {}
+    if mtime != _TESTCASES_MTIME:
+        _TESTCASES = json.loads(TESTCASES_PATH.read_text(encoding="utf-8"))
+        _TESTCASES_MTIME = mtime
+    return _TESTCASES
+
+
+def has_testcases(question_id: str) -> bool:
+    return str(question_id) in load_testcases()
+
+
+def get_judge_pool() -> ProcessPoolExecutor:
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is not None and getattr(_POOL, "_broken", False):
+            # 别的会话遇到 worker 被杀还没来得及重建，这里直接换新池
+            _shutdown(_POOL)
+            _POOL = None
+        if _POOL is None:
+            _POOL = ProcessPoolExecutor(max_workers=os.cpu_count() or 1)
+        return _POOL
+
+
+def _reset_pool() -> None:
+    # 超时或 worker 被 rlimit 杀掉后整池重建，避免卡死的进程继续占用核心
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is not None:
+            _shutdown(_POOL)
+        _POOL = None
+
+
+def _shutdown(pool: ProcessPoolExecutor) -> None:
+    for process in list((getattr(pool, "_processes", None) or {}).values()):
+        process.terminate()
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _submit(pool: ProcessPoolExecutor, job: Tuple[Any, ...]) -> Future:
+    # 别的会话刚把共享池拖垮时 submit 会直接抛错，当作这个用例受了牵连处理
+    try:
+        return pool.submit(_run_case, *job)
+    except BrokenProcessPool as exc:
+        future: Future = Future()
+        future.set_exception(exc)
+        return future
+
+
+def _timeout_outcome(time_limit: float) -> Dict[str, Any]:
+    return {"error": "Time Limit Exceeded", "wall_ms": time_limit * 1000}
+
+
+def _run_isolated(
+    jobs: List[Tuple[Any, ...]], time_limit: float
+) -> List[Dict[str, Any]]:
+    # 一个 worker 被杀会让共享池里所有未完成的用例一起失败，分不清是谁超限；
+    # 受牵连的用例各自放进单独的进程重跑，只有真正超限的那个会再次被杀
+    outcomes: List[Dict[str, Any]] = []
+    workers = os.cpu_count() or 1
+    for start in range(0, len(jobs), workers):
+        batch = []
+        for job in jobs[start : start + workers]:
+            pool = ProcessPoolExecutor(max_workers=1)
+            batch.append((pool, _submit(pool, job)))
+        for pool, future in batch:
+            try:
+                outcomes.append(future.result(timeout=time_limit * 2 + 5))
+            except TimeoutError:
+                outcomes.append(_timeout_outcome(time_limit))
+            except BrokenProcessPool:
+                outcomes.append({"error": "Killed (CPU/内存超限)", "wall_ms": None})
+            except Exception as exc:
+                outcomes.append(
+                    {"error": f"{type(exc).__name__}: {exc}", "wall_ms": None}
+                )
+            _shutdown(pool)
+    return outcomes
+
+
+def judge_code(
+    question_id: str,
+    code: str,
+    time_limit: float = TIME_LIMIT_SECONDS,
+    memory_limit_mb: int = MEMORY_LIMIT_MB,
+) -> Dict[str, Any]:
+    return judge_many([(str(question_id), code)], time_limit, memory_limit_mb)[0]
+
+
+def judge_many(
+    submissions: List[Tuple[str, str]],
+    time_limit: float = TIME_LIMIT_SECONDS,
+    memory_limit_mb: int = MEMORY_LIMIT_MB,
+) -> List[Dict[str, Any]]:
+    # 所有提交的所有用例一次性铺进进程池，整库重测时能吃满全部核心
+    testcases = load_testcases()
+    pool = get_judge_pool()
+    jobs: Dict[Tuple[int, int], Tuple[Any, ...]] = {}
+    futures: Dict[Tuple[int, int], Future] = {}
+    for position, (question_id, code) in enumerate(submissions):
+        spec = testcases.get(str(question_id))
+        for index, case in enumerate(spec["cases"] if spec else []):
+            key = (position, index)
+            jobs[key] = (
+                code, spec["method"], case["args"], time_limit, memory_limit_mb
+            )
+            futures[key] = _submit(pool, jobs[key])
+
+    outcomes: Dict[Tuple[int, int], Dict[str, Any]] = {}
+    retry: List[Tuple[int, int]] = []
+    broken = False
+    for key, future in futures.items():
+        try:
+            outcomes[key] = future.result(timeout=time_limit * 2 + 5)
+        except TimeoutError:
+            broken = True
+            outcomes[key] = _timeout_outcome(time_limit)
+        except BrokenProcessPool:
+            broken = True
+            retry.append(key)
+        except Exception as exc:
+            outcomes[key] = {"error": f"{type(exc).__name__}: {exc}", "wall_ms": None}
+    if broken:
+        _reset_pool()
+    if retry:
+        isolated = _run_isolated([jobs[key] for key in retry], time_limit)
+        outcomes.update(zip(retry, isolated))
+
+    reports = []
+    for position, (question_id, _) in enumerate(submissions):
+        spec = testcases.get(str(question_id))
+        if not spec:
+            reports.append({"status": "no_tests", "results": []})
+            continue
+        results = []
+        for index, case in enumerate(spec["cases"]):
+            outcome = outcomes[(position, index)]
+            if "error" not in outcome:
+                passed = _matches(outcome["output"], case["expected"], spec)
+            else:
+                passed = False
+            results.append(
+                {
+                    "case": index + 1,
+                    "passed": passed,
+                    "wall_ms": outcome.get("wall_ms"),
+                    "output": outcome.get("output"),
+                    "expected": case["expected"],
+                    "error": outcome.get("error", ""),
+                }
+            )
+        reports.append({"status": _overall_status(results), "results": results})
+    return reports
+
+
+def run_limited(
+    func: Callable[..., Any],
+    args: Tuple[Any, ...],
+    time_limit: float = TIME_LIMIT_SECONDS,
+    memory_limit_mb: int = MEMORY_LIMIT_MB,
+) -> Dict[str, Any]:
+    # 评测以外的场景（复杂度实测等）跑不可信代码也走同一个进程池和资源限制；
+    # func 必须是模块级函数，才能被序列化送进 worker
+    try:
+        future = get_judge_pool().submit(
+            _call_limited, func, args, time_limit, memory_limit_mb
+        )
+        return future.result(timeout=time_limit * 2 + 5)
+    except TimeoutError:
+        _reset_pool()
+        return _timeout_outcome(time_limit)
+    except BrokenProcessPool:
+        _reset_pool()
+        return {"error": "Killed (CPU/内存超限)", "wall_ms": None}
+
+
+def _call_limited(
+    func: Callable[..., Any],
+    args: Tuple[Any, ...],
+    time_limit: float,
+    memory_limit_mb: int,
+) -> Dict[str, Any]:
+    restore = _apply_limits(time_limit, memory_limit_mb)
+    try:
+        return {"output": func(*args)}
+    except _Timeout:
+        return _timeout_outcome(time_limit)
+    except MemoryError:
+        return {"error": "Memory Limit Exceeded", "wall_ms": None}
+    except Exception as exc:
+        detail = traceback.format_exception_only(type(exc), exc)[-1].strip()
+        return {"error": detail, "wall_ms": None}
+    finally:
+        restore()
+
+
+def _overall_status(results: List[Dict[str, Any]]) -> str:
+    if all(result["passed"] for result in results):
+        return "accepted"
+    errors = [result["error"] for result in results if result["error"]]
+    if any("Time Limit" in error for error in errors):
+        return "time_limit_exceeded"
+    if errors:
+        return "runtime_error"
+    return "wrong_answer"
+
+
+def _matches(output: Any, expected: Any, spec: Dict[str, Any]) -> bool:
+    compare = spec.get("compare", "exact")
+    if compare == "float":
+        try:
+            return math.isclose(float(output), float(expected), abs_tol=1e-5)
+        except (TypeError, ValueError):
+            return False
+    if compare == "unordered" and isinstance(output, list):
+        return sorted(map(_sort_key, output)) == sorted(map(_sort_key, expected))
+    return output == expected
+
+
+def _sort_key(value: Any) -> str:
+    return json.dumps(value, sort_keys=True)
+
+
+def _run_case(
+    code: str,
+    method: str,
+    args: List[Any],
+    time_limit: float,
+    memory_limit_mb: int,
+) -> Dict[str, Any]:
+    restore = _apply_limits(time_limit, memory_limit_mb)
+    started = time.perf_counter()
+    try:
+        namespace: Dict[str, Any] = {"__name__": "solution"}
+        exec(compile(code, "<solution>", "exec"), namespace)
+        solution_cls = namespace.get("Solution")
+        if solution_cls is None:
+            return {"error": "未找到 class Solution", "wall_ms": 0.0}
+        started = time.perf_counter()
+        output = getattr(solution_cls(), method)(*args)
+        wall_ms = (time.perf_counter() - started) * 1000
+        json.dumps(output)
+        return {"output": output, "wall_ms": round(wall_ms, 3)}
+    except _Timeout:
+        return {"error": "Time Limit Exceeded", "wall_ms": time_limit * 1000}
+    except MemoryError:
+        return {"error": "Memory Limit Exceeded", "wall_ms": None}
+    except Exception as exc:
+        wall_ms = (time.perf_counter() - started) * 1000
+        detail = traceback.format_exception_only(type(exc), exc)[-1].strip()
+        return {"error": detail, "wall_ms": round(wall_ms, 3)}
+    finally:
+        restore()
+
+
+class _Timeout(Exception):
+    pass
+
+
+def _raise_timeout(signum: int, frame: Any) -> None:
+    raise _Timeout()
+
+
+def _apply_limits(time_limit: float, memory_limit_mb: int):
+    if resource is None:
+        return lambda: None
+    # worker 会被复用：只调 soft limit（可再调回去），CPU 限额按当前累计用量叠加
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    used = usage.ru_utime + usage.ru_stime
+    cpu_soft, cpu_hard = resource.getrlimit(resource.RLIMIT_CPU)
+    as_soft, as_hard = resource.getrlimit(resource.RLIMIT_AS)
+    cpu_limit = int(used + time_limit) + 2
+    if cpu_hard == resource.RLIM_INFINITY or cpu_limit <= cpu_hard:
+        resource.setrlimit(resource.RLIMIT_CPU, (cpu_limit, cpu_hard))
+    memory_bytes = memory_limit_mb * 1024 * 1024 + _current_vm_bytes()
+    if as_hard == resource.RLIM_INFINITY or memory_bytes <= as_hard:
+        resource.setrlimit(resource.RLIMIT_AS, (memory_bytes, as_hard))
+    previous_handler = signal.signal(signal.SIGALRM, _raise_timeout)
+    signal.setitimer(signal.ITIMER_REAL, time_limit)
+
+    def restore() -> None:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous_handler)
+        resource.setrlimit(resource.RLIMIT_CPU, (cpu_soft, cpu_hard))
+        resource.setrlimit(resource.RLIMIT_AS, (as_soft, as_hard))
+
+    return restore
+
+
+def _current_vm_bytes() -> int:
+    try:
+        with open("/proc/self/statm", "r", encoding="ascii") as handle:
+            pages = int(handle.read().split()[0])
+        return pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return 0
+
+
+def question_id_from_path(path: Path) -> Optional[str]:
+    match = re.match(r"^(\d+)_", path.name)
+    if not match:
+        return None
+    return str(int(match.group(1)))
+
+
+def judge_archive(
+    paths: Optional[List[Path]] = None,
+) -> List[Tuple[Path, Dict[str, Any]]]:
+    if paths is None:
+        paths = sorted(SOLUTIONS_DIR.rglob("*.py")) if SOLUTIONS_DIR.exists() else []
+    submissions = []
+    judged_paths = []
+    for path in paths:
+        question_id = question_id_from_path(path)
+        if question_id is None:
+            continue
+        submissions.append((question_id, path.read_text(encoding="utf-8")))
+        judged_paths.append(path)
+    return list(zip(judged_paths, judge_many(submissions)))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="用本地用例重测 solutions/ 下的解法")
+    parser.add_argument("paths", nargs="*", type=Path, help="默认重测全部解法")
+    args = parser.parse_args(argv)
+    started = time.perf_counter()
+    reports = judge_archive(args.paths or None)
+    failed = 0
+    for path, report in reports:
+        passed = sum(1 for result in report["results"] if result["passed"])
+        total = len(report["results"])
+        print(f"{report['status']:<22} {passed}/{total}  {path}")
+        for result in report["results"]:
+            if result["error"]:
+                print(f"    #{result['case']}: {result['error']}")
+        if report["status"] not in ("accepted", "no_tests"):
+            failed += 1
+    elapsed = time.perf_counter() - started
+    print(f"共 {len(reports)} 个文件，{failed} 个未通过，耗时 {elapsed:.2f}s")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
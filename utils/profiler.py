@@ -0,0 +1,90 @@
+import json
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+TIMINGS_PATH = Path(__file__).resolve().parents[1] / ".cache" / "rerun_timings.jsonl"
+
+
+def profiling_enabled_by_env() -> bool:
+    return os.getenv("LC_HUNTER_PROFILE", "").strip().lower() in ("1", "true", "yes")
+
+
+class RerunProfiler:
+    # 记录一次 Streamlit 重跑中各命名阶段的耗时；未开启时 phase() 几乎零开销
+    def __init__(
+        self,
+        enabled: bool,
+        path: Path = TIMINGS_PATH,
+        labels: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        self.enabled = enabled
+        self.path = path
+        self.labels = labels or {}
+        self.flushed = False
+        self.phases: List[Tuple[str, float]] = []
+        self._started = time.perf_counter()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        if not self.enabled:
+            yield
+            return
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, (time.perf_counter() - started) * 1000))
+
+    def total_ms(self) -> float:
+        return (time.perf_counter() - self._started) * 1000
+
+    def summary(self) -> List[Dict[str, Any]]:
+        totals: Dict[str, Dict[str, float]] = {}
+        for name, elapsed in self.phases:
+            item = totals.setdefault(name, {"ms": 0.0, "calls": 0})
+            item["ms"] += elapsed
+            item["calls"] += 1
+        return [
+            {"phase": name, "ms": round(item["ms"], 3), "calls": int(item["calls"])}
+            for name, item in totals.items()
+        ]
+
+    def flush(self, extra: Optional[Dict[str, Any]] = None) -> None:
+        # 每次重跑只落盘一条：st.rerun() 前已经 flush 过的，收尾时不再重复写
+        if not self.enabled or self.flushed:
+            return
+        self.flushed = True
+        record = {
+            "ts": datetime.now().isoformat(timespec="seconds"),
+            "total_ms": round(self.total_ms(), 3),
+            "phases": {row["phase"]: row["ms"] for row in self.summary()},
+            **self.labels,
+            **(extra or {}),
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a", encoding="utf-8") as handle:
+            handle.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def load_recent_timings(
+    limit: int = 200, path: Path = TIMINGS_PATH
+) -> List[Dict[str, Any]]:
+    if not path.exists():
+        return []
+    # 只读文件尾部，日志再长也不会拖慢面板
+    with path.open("rb") as handle:
+        handle.seek(0, os.SEEK_END)
+        size = handle.tell()
+        handle.seek(max(size - limit * 512, 0))
+        lines = handle.read().splitlines()
+    records = []
+    for line in lines[-limit:]:
+        try:
+            records.append(json.loads(line))
+        except ValueError:
+            continue
+    return records
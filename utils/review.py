@@ -0,0 +1,140 @@
+import heapq
+import random
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_EASE = 2.5
+MIN_EASE = 1.3
+# 间隔按难度系数指数增长，连续高分几十次就会超出 date 的范围，封顶十年
+MAX_INTERVAL = 3650
+DEFAULT_QUALITY = 4
+QUALITY_LABELS = {
+    5: "5 · 轻松写出",
+    4: "4 · 想了一会儿",
+    3: "3 · 磕磕绊绊",
+    2: "2 · 看了提示",
+    1: "1 · 看了题解",
+    0: "0 · 完全不会",
+}
+
+
+def sm2_update(
+    review: Optional[Dict[str, Any]], quality: int, today: Optional[date] = None
+) -> Dict[str, Any]:
+    # SM-2：评分 < 3 重新从 1 天开始、难度系数不变；否则间隔按 1 天、6 天、
+    # 上次间隔 × 难度系数增长，并按评分调整难度系数
+    today = today or date.today()
+    review = review or {}
+    ease = review.get("ease", DEFAULT_EASE)
+    repetitions = review.get("repetitions", 0)
+    interval = review.get("interval", 0)
+    quality = min(max(int(quality), 0), 5)
+    if quality < 3:
+        repetitions = 0
+        interval = 1
+    else:
+        repetitions += 1
+        if repetitions == 1:
+            interval = 1
+        elif repetitions == 2:
+            interval = 6
+        else:
+            interval = min(max(round(interval * ease), interval + 1), MAX_INTERVAL)
+        miss = 5 - quality
+        ease = max(MIN_EASE, ease + 0.1 - miss * (0.08 + miss * 0.02))
+    return {
+        "ease": round(ease, 2),
+        "interval": interval,
+        "repetitions": repetitions,
+        "due": (today + timedelta(days=interval)).isoformat(),
+        "last": today.isoformat(),
+    }
+
+
+class AliasSampler:
+    # Vose 别名法：O(n) 建表，之后每次按权重抽样 O(1)
+    def __init__(self, weights: List[float]) -> None:
+        count = len(weights)
+        total = float(sum(weights))
+        self._prob = [0.0] * count
+        self._alias = list(range(count))
+        if not count or total <= 0:
+            return
+        scaled = [weight * count / total for weight in weights]
+        small = [i for i, value in enumerate(scaled) if value < 1]
+        large = [i for i, value in enumerate(scaled) if value >= 1]
+        while small and large:
+            low, high = small.pop(), large.pop()
+            self._prob[low] = scaled[low]
+            self._alias[low] = high
+            scaled[high] -= 1 - scaled[low]
+            (small if scaled[high] < 1 else large).append(high)
+        for index in small + large:
+            self._prob[index] = 1.0
+
+    def __len__(self) -> int:
+        return len(self._prob)
+
+    def sample(self, rng: Any = random) -> int:
+        column = rng.randrange(len(self._prob))
+        return column if rng.random() < self._prob[column] else self._alias[column]
+
+
+def _due_date(question: Dict[str, Any]) -> Optional[str]:
+    if question.get("status") != "solved":
+        return None
+    # 引入复习计划之前完成的题没有记录，视为今天到期
+    review = question.get("review") or {}
+    return review.get("due") or date.today().isoformat()
+
+
+class ReviewQueue:
+    # 已完成题目按到期日排成小顶堆；更新/删除采用惰性失效，过期的堆项在弹出时跳过
+    def __init__(self, questions: Iterable[Dict[str, Any]]) -> None:
+        self._due: Dict[str, str] = {}
+        for question in questions:
+            due = _due_date(question)
+            if due is not None:
+                self._due[str(question.get("id"))] = due
+        self._heap: List[Tuple[str, str]] = [
+            (due, question_id) for question_id, due in self._due.items()
+        ]
+        heapq.heapify(self._heap)
+
+    def __len__(self) -> int:
+        return len(self._due)
+
+    def push(self, question_id: str, due: str) -> None:
+        self._due[question_id] = due
+        heapq.heappush(self._heap, (due, question_id))
+        if len(self._heap) > 2 * len(self._due) + 64:
+            # 失效项堆积过多时整体重建一次，均摊后仍是 O(log n)
+            self._heap = [(day, key) for key, day in self._due.items()]
+            heapq.heapify(self._heap)
+
+    def discard(self, question_id: str) -> None:
+        self._due.pop(question_id, None)
+
+    def update(self, question: Dict[str, Any]) -> None:
+        # 按题目当前状态重新排期：已完成的按到期日入堆，其余移出
+        question_id = str(question.get("id"))
+        due = _due_date(question)
+        if due is None:
+            self.discard(question_id)
+        elif self._due.get(question_id) != due:
+            self.push(question_id, due)
+
+    def peek(self) -> Optional[Tuple[str, str]]:
+        heap = self._heap
+        while heap and self._due.get(heap[0][1]) != heap[0][0]:
+            heapq.heappop(heap)
+        return heap[0] if heap else None
+
+    def pop_due(self, today: Optional[date] = None) -> Optional[str]:
+        # 取出最早到期且已到期的题；弹出后直到下次提交（重新排期）前不会再出现
+        head = self.peek()
+        if head is None or head[0] > (today or date.today()).isoformat():
+            return None
+        heapq.heappop(self._heap)
+        del self._due[head[1]]
+        return head[1]
@@ -0,0 +1,200 @@
+import json
+import math
+import os
+import re
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from utils.data_manager import current_workspace
+from utils.file_utils import atomic_write_text
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+INDEX_PATH = ROOT_DIR / ".cache" / "search_index.json"
+INDEXED_DIRS = ("notes", "solutions")
+INDEXED_SUFFIXES = (".md", ".py")
+INDEX_VERSION = 2
+
+_CJK = "㐀-䶿一-鿿豈-﫿"
+_TOKEN_RE = re.compile(rf"[{_CJK}]+|[A-Za-z0-9_]+")
+_CJK_RE = re.compile(rf"^[{_CJK}]+$")
+
+
+def tokenize(text: str, query: bool = False) -> List[str]:
+    # 英文/数字按词切分（snake_case 额外拆出子词），中文连续片段切成字符二元组；
+    # 建索引时中文再多收单字，单字查询（“树”“栈”）才查得到。查询里的多字片段只用二元组
+    tokens: List[str] = []
+    for match in _TOKEN_RE.finditer(text):
+        run = match.group(0)
+        if _CJK_RE.match(run):
+            if len(run) == 1:
+                tokens.append(run)
+                continue
+            tokens.extend(run[i : i + 2] for i in range(len(run) - 1))
+            if not query:
+                tokens.extend(run)
+            continue
+        word = run.lower()
+        tokens.append(word)
+        if "_" in word:
+            tokens.extend(part for part in word.split("_") if part)
+    return tokens
+
+
+class SearchIndex:
+    # 笔记与解法的倒排索引：按文件 mtime/size 增量更新，只重读变化过的文件
+    def __init__(
+        self, root: Path = ROOT_DIR, path: Path = INDEX_PATH, min_interval: float = 1.0
+    ) -> None:
+        self.root = root
+        self.path = path
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._files: Dict[str, Dict[str, Any]] = {}
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._loaded = False
+        self._last_refresh = 0.0
+
+    def refresh(self, force: bool = False) -> int:
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            now = time.monotonic()
+            if not force and now - self._last_refresh < self.min_interval:
+                return 0
+            self._last_refresh = now
+            changed = 0
+            seen = set()
+            for rel_path, stat in self._walk():
+                seen.add(rel_path)
+                entry = self._files.get(rel_path)
+                signature = [stat.st_mtime_ns, stat.st_size]
+                if entry is not None and entry["signature"] == signature:
+                    continue
+                self._index_file(rel_path, signature)
+                changed += 1
+            for rel_path in list(self._files):
+                if rel_path not in seen:
+                    self._drop(rel_path)
+                    changed += 1
+            if changed:
+                self._save()
+            return changed
+
+    def search(self, query: str, limit: int = 20) -> List[Tuple[str, float]]:
+        self.refresh()
+        terms = list(dict.fromkeys(tokenize(query, query=True)))
+        if not terms:
+            return []
+        with self._lock:
+            postings = [self._postings.get(term, {}) for term in terms]
+            if not all(postings):
+                return []
+            postings.sort(key=len)
+            candidates = set(postings[0])
+            for posting in postings[1:]:
+                candidates &= posting.keys()
+            total = max(len(self._files), 1)
+            scores = []
+            for rel_path in candidates:
+                score = 0.0
+                for posting in postings:
+                    idf = math.log(1 + total / len(posting))
+                    score += (1 + math.log(posting[rel_path])) * idf
+                scores.append((rel_path, score))
+        scores.sort(key=lambda item: (-item[1], item[0]))
+        return scores[:limit]
+
+    def snippet(self, rel_path: str, query: str, width: int = 60) -> str:
+        try:
+            text = (self.root / rel_path).read_text(encoding="utf-8", errors="replace")
+        except OSError:
+            return ""
+        terms = [t for t in tokenize(query, query=True) if t]
+        lowered = text.lower()
+        position = min(
+            (lowered.find(term) for term in terms if lowered.find(term) >= 0),
+            default=0,
+        )
+        start = max(position - width // 3, 0)
+        fragment = text[start : start + width].replace("\n", " ")
+        return ("…" if start else "") + fragment + "…"
+
+    def _walk(self) -> Iterator[Tuple[str, os.stat_result]]:
+        stack = [self.root / name for name in INDEXED_DIRS]
+        while stack:
+            directory = stack.pop()
+            try:
+                entries = list(os.scandir(directory))
+            except FileNotFoundError:
+                continue
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(Path(entry.path))
+                elif entry.name.endswith(INDEXED_SUFFIXES):
+                    rel_path = Path(entry.path).relative_to(self.root).as_posix()
+                    yield rel_path, entry.stat()
+
+    def _index_file(self, rel_path: str, signature: List[int]) -> None:
+        self._drop(rel_path)
+        try:
+            text = (self.root / rel_path).read_text(encoding="utf-8", errors="replace")
+        except OSError:
+            return
+        terms = Counter(tokenize(text))
+        self._files[rel_path] = {"signature": signature, "terms": dict(terms)}
+        for term, count in terms.items():
+            self._postings.setdefault(term, {})[rel_path] = count
+
+    def _drop(self, rel_path: str) -> None:
+        entry = self._files.pop(rel_path, None)
+        if entry is None:
+            return
+        for term in entry["terms"]:
+            posting = self._postings.get(term)
+            if posting is None:
+                continue
+            posting.pop(rel_path, None)
+            if not posting:
+                del self._postings[term]
+
+    def _load(self) -> None:
+        self._loaded = True
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            return
+        if data.get("version") != INDEX_VERSION:
+            return
+        self._files = data.get("files", {})
+        for rel_path, entry in self._files.items():
+            for term, count in entry["terms"].items():
+                self._postings.setdefault(term, {})[rel_path] = count
+
+    def _save(self) -> None:
+        atomic_write_text(
+            self.path,
+            json.dumps(
+                {"version": INDEX_VERSION, "files": self._files},
+                ensure_ascii=False,
+                separators=(",", ":"),
+            ),
+        )
+
+
+_INDEXES: Dict[Path, SearchIndex] = {}
+_INDEX_LOCK = threading.Lock()
+
+
+def get_search_index() -> SearchIndex:
+    # 每个工作区（多用户模式下即每个用户）各自一份索引
+    workspace = current_workspace()
+    with _INDEX_LOCK:
+        index = _INDEXES.get(workspace.root)
+        if index is None:
+            index = _INDEXES[workspace.root] = SearchIndex(
+                workspace.root, workspace.cache_dir / "search_index.json"
+            )
+        return index
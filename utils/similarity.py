@@ -0,0 +1,257 @@
+import hashlib
+import heapq
+import json
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+from operator import itemgetter
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from utils import data_manager
+from utils.file_utils import atomic_write_text
+
+try:
+    import numpy as np
+except ImportError:  # 没装 NumPy 时走纯 Python 的稀疏向量实现，结果一致，只是构建慢一些
+    np = None
+
+SIMILARITY_VERSION = 1
+NGRAM_SIZES = (2, 3)
+TAG_WEIGHT = 3.0
+# 出现在超过这一比例题目里的 n-gram（“复杂度”“提示”之类）区分度太低，直接丢弃
+MAX_DF_RATIO = 0.2
+MAX_FEATURES = 8192
+# 稠密矩阵是 行数 × MAX_FEATURES 的 float32，2048 行约 64MB；再大的题库改走倒排表，
+# 否则 10k 题就要 650MB 左右
+NUMPY_MAX_ROWS = 2048
+NEIGHBORS_KEPT = 30
+UNSOLVED_BOOST = 1.5
+BLOCK_ROWS = 512
+
+_TITLE_ID_RE = re.compile(r"^\s*\d+\.\s*")
+_NON_WORD_RE = re.compile(r"[\W\d_]+")
+
+Neighbors = Dict[str, List[Tuple[str, float]]]
+
+
+def _features(question: Dict[str, Any]) -> Counter:
+    # 标签整体作为一个特征；标题与 pattern_hint 切成字符 n-gram，中英文同样适用
+    counts: Counter = Counter(f"#{tag}" for tag in question.get("tags", []))
+    title = _TITLE_ID_RE.sub("", str(question.get("title") or ""))
+    text = _NON_WORD_RE.sub(" ", f"{title} {question.get('pattern_hint') or ''}")
+    text = " ".join(text.lower().split())
+    for size in NGRAM_SIZES:
+        for start in range(len(text) - size + 1):
+            gram = text[start : start + size]
+            if gram.strip() == gram:
+                counts[gram] += 1
+    return counts
+
+
+def _catalog_digest(questions: List[Dict[str, Any]]) -> str:
+    raw = json.dumps(
+        [
+            [q.get("id"), q.get("title"), q.get("tags"), q.get("pattern_hint")]
+            for q in questions
+        ],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def tfidf_vectors(questions: List[Dict[str, Any]]) -> List[Dict[str, float]]:
+    # 次线性 tf × 平滑 idf，按 L2 归一化；只出现在一道题里的特征对相似度没有贡献，不保留
+    counts = [_features(q) for q in questions]
+    df: Counter = Counter()
+    for item in counts:
+        df.update(item.keys())
+    total = len(questions)
+    max_df = max(MAX_DF_RATIO * total, 2)
+    vectors = []
+    for item in counts:
+        vector = {}
+        for term, tf in item.items():
+            freq = df[term]
+            is_tag = term.startswith("#")
+            if freq < 2 or (not is_tag and freq > max_df):
+                continue
+            weight = (1 + math.log(tf)) * (math.log((1 + total) / (1 + freq)) + 1)
+            vector[term] = weight * TAG_WEIGHT if is_tag else weight
+        norm = math.sqrt(sum(w * w for w in vector.values()))
+        vectors.append({t: w / norm for t, w in vector.items()} if norm else {})
+    return vectors
+
+
+def _top_k(
+    scores: List[Tuple[int, float]], ids: List[str], k: int
+) -> List[Tuple[str, float]]:
+    best = heapq.nlargest(k, (item for item in scores if item[1] > 0), itemgetter(1))
+    return [(ids[other], round(float(score), 4)) for other, score in best]
+
+
+def _neighbors_python(
+    ids: List[str], vectors: List[Dict[str, float]], k: int
+) -> Neighbors:
+    # 倒排表累加点积：只和至少共享一个特征的题目相乘，不做 N×N 全量比较
+    postings: Dict[str, List[Tuple[int, float]]] = defaultdict(list)
+    for doc, vector in enumerate(vectors):
+        for term, weight in vector.items():
+            postings[term].append((doc, weight))
+    neighbors: Neighbors = {}
+    for doc, vector in enumerate(vectors):
+        scores: Dict[int, float] = defaultdict(float)
+        for term, weight in vector.items():
+            for other, other_weight in postings[term]:
+                scores[other] += weight * other_weight
+        scores.pop(doc, None)
+        neighbors[ids[doc]] = _top_k(list(scores.items()), ids, k)
+    return neighbors
+
+
+def _neighbors_numpy(
+    ids: List[str], vectors: List[Dict[str, float]], k: int
+) -> Neighbors:
+    # 稠密矩阵按块做余弦相似度（向量已归一化，即矩阵乘法），每块只保留 top-k
+    df: Counter = Counter()
+    for vector in vectors:
+        df.update(vector.keys())
+    vocab = {term: i for i, (term, _) in enumerate(df.most_common(MAX_FEATURES))}
+    matrix = np.zeros((len(vectors), len(vocab)), dtype=np.float32)
+    for row, vector in enumerate(vectors):
+        for term, weight in vector.items():
+            column = vocab.get(term)
+            if column is not None:
+                matrix[row, column] = weight
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    matrix /= np.where(norms == 0, 1, norms)
+    neighbors: Neighbors = {}
+    k = min(k, len(vectors) - 1)
+    for start in range(0, len(vectors), BLOCK_ROWS):
+        block = matrix[start : start + BLOCK_ROWS] @ matrix.T
+        rows = np.arange(block.shape[0])
+        block[rows, rows + start] = -1
+        top = np.argpartition(-block, k - 1, axis=1)[:, :k]
+        for row in rows:
+            neighbors[ids[start + row]] = _top_k(
+                [(int(col), float(block[row, col])) for col in top[row]], ids, k
+            )
+    return neighbors
+
+
+def build_neighbors(
+    questions: List[Dict[str, Any]], k: int = NEIGHBORS_KEPT
+) -> Neighbors:
+    ids = [str(q.get("id")) for q in questions]
+    vectors = tfidf_vectors(questions)
+    if np is not None and 1 < len(questions) <= NUMPY_MAX_ROWS:
+        return _neighbors_numpy(ids, vectors, k)
+    return _neighbors_python(ids, vectors, k)
+
+
+class SimilarityIndex:
+    # 每个题库版本只算一次相似度并落盘；查询只是一次字典查找加少量重排
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._signature: Optional[Tuple[int, int]] = None
+        self._digest: Optional[str] = None
+        self._neighbors: Optional[Neighbors] = None
+
+    def related(
+        self,
+        question: Dict[str, Any],
+        limit: Optional[int] = None,
+        prefer_unsolved: bool = False,
+    ) -> List[Dict[str, Any]]:
+        with self._lock:
+            self._ensure()
+            neighbors = self._neighbors.get(str(question.get("id")), [])
+        if not prefer_unsolved and limit is not None:
+            # 不需要按状态重排时，只取前 limit 个邻居
+            neighbors = neighbors[:limit]
+        ranked = []
+        others = data_manager.get_questions(other_id for other_id, _ in neighbors)
+        for (_, score), other in zip(neighbors, others):
+            if other is None:
+                continue
+            if prefer_unsolved and other.get("status") != "solved":
+                score *= UNSOLVED_BOOST
+            ranked.append((score, other))
+        if prefer_unsolved:
+            ranked.sort(key=itemgetter(0), reverse=True)
+        return [other for _, other in ranked[:limit]]
+
+    def rebuild(self) -> int:
+        with self._lock:
+            self._digest = None
+            self._neighbors = None
+            self._signature = None
+            self._ensure(use_disk=False)
+            return len(self._neighbors)
+
+    def _ensure(self, use_disk: bool = True) -> None:
+        # 题库文件没变就直接用内存结果；变了（也可能只是进度压缩回快照）再比对元数据摘要
+        signature = _catalog_signature()
+        if self._neighbors is not None and signature == self._signature:
+            return
+        questions = data_manager.load_questions()
+        digest = _catalog_digest(questions)
+        if digest != self._digest:
+            cached = self._load() if use_disk else None
+            if cached is not None and cached.get("digest") == digest:
+                self._neighbors = {
+                    key: [tuple(item) for item in value]
+                    for key, value in cached["neighbors"].items()
+                }
+            else:
+                self._neighbors = build_neighbors(questions)
+                self._save(digest)
+            self._digest = digest
+        self._signature = signature
+
+    def _load(self) -> Optional[Dict[str, Any]]:
+        try:
+            cached = json.loads(self.path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            return None
+        if cached.get("version") != SIMILARITY_VERSION:
+            return None
+        return cached
+
+    def _save(self, digest: str) -> None:
+        atomic_write_text(
+            self.path,
+            json.dumps(
+                {
+                    "version": SIMILARITY_VERSION,
+                    "digest": digest,
+                    "neighbors": self._neighbors,
+                },
+                ensure_ascii=False,
+                separators=(",", ":"),
+            ),
+        )
+
+
+def _catalog_signature() -> Optional[Tuple[int, int]]:
+    # 题库元数据只存在共享的 problems.json 里，用户工作区的进度变化不影响相似度
+    try:
+        stat = data_manager.DATA_PATH.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+_INDEXES: Dict[Path, SimilarityIndex] = {}
+_INDEXES_LOCK = threading.Lock()
+
+
+def get_similarity_index() -> SimilarityIndex:
+    path = data_manager.get_workspace(None).cache_dir / "similarity.json"
+    with _INDEXES_LOCK:
+        index = _INDEXES.get(path)
+        if index is None:
+            index = _INDEXES[path] = SimilarityIndex(path)
+        return index
@@ -0,0 +1,140 @@
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from utils import data_manager
+from utils.git_helper import git_add_commit
+
+DEFAULT_WORKERS = 8
+DEFAULT_SUFFIXES = (".py",)
+
+
+def _read(path: Path) -> Tuple[Path, str, str]:
+    # 代码与文件修改时间（作为归档文件名里的时间戳，保留原提交的先后顺序）
+    code = path.read_text(encoding="utf-8", errors="replace")
+    stamp = datetime.fromtimestamp(path.stat().st_mtime).strftime("%Y%m%d_%H%M%S")
+    return path, code, stamp
+
+
+def collect(
+    source: Path, suffixes: Tuple[str, ...] = DEFAULT_SUFFIXES
+) -> Tuple[Dict[str, List[Path]], List[Path]]:
+    match = data_manager.solution_matcher()
+    matched: Dict[str, List[Path]] = {}
+    unmatched: List[Path] = []
+    paths = [source] if source.is_file() else sorted(source.rglob("*"))
+    for path in paths:
+        if not path.is_file() or path.suffix.lower() not in suffixes:
+            continue
+        question_id = match(path)
+        if question_id is None:
+            unmatched.append(path)
+        else:
+            matched.setdefault(question_id, []).append(path)
+    return matched, unmatched
+
+
+def import_solutions(
+    source: Path,
+    is_best: bool = False,
+    workers: int = DEFAULT_WORKERS,
+    commit: bool = True,
+    dry_run: bool = False,
+) -> Dict[str, Any]:
+    # 一次导入整批：并行读文件 → 一次写清单（文件并行落盘）→ 一次追加进度日志 → 一次 git 提交
+    matched, unmatched = collect(source)
+    counts = {
+        "questions": len(matched),
+        "files": sum(len(paths) for paths in matched.values()),
+        "unmatched": len(unmatched),
+        "written": 0,
+        "duplicates": 0,
+        "unmatched_paths": unmatched,
+        "git_error": "",
+    }
+    if dry_run or not matched:
+        return counts
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        contents = {
+            path: (code, stamp)
+            for path, code, stamp in pool.map(
+                _read, [path for paths in matched.values() for path in paths]
+            )
+        }
+    items = []
+    latest: Dict[str, str] = {}
+    for question_id, paths in matched.items():
+        title = data_manager.get_question(question_id).get("title", "")
+        # 同一题多份文件按修改时间先后导入；标记 best 时只保留最新的一份
+        entries = sorted((contents[path] for path in paths), key=lambda item: item[1])
+        for code, stamp in entries[-1:] if is_best else entries:
+            items.append((question_id, title, code, stamp))
+        latest[question_id] = entries[-1][0]
+
+    written = data_manager.save_solutions(items, is_best=is_best, workers=workers)
+    counts["written"] = len(written)
+    counts["duplicates"] = len(items) - len(written)
+    records = []
+    for question_id, code in latest.items():
+        question = data_manager.get_question(question_id)
+        if question.get("status") != "solved" or question.get("my_code") != code:
+            records.append({"id": question_id, "status": "solved", "my_code": code})
+    data_manager.import_progress(records)
+
+    # 全是重复文件时进度仍可能被更新（例如此前只归档了代码），同样需要提交
+    if commit and (written or records):
+        paths = [str(path) for path in data_manager.progress_paths()]
+        if written:
+            workspace = data_manager.current_workspace()
+            paths += [str(path) for path in written] + [str(workspace.manifest_path)]
+        result = git_add_commit(
+            paths=paths,
+            message=f"Import {len(written)} solutions for {len(latest)} problems",
+        )
+        if result.returncode != 0:
+            output = (result.stderr or result.stdout).strip()
+            counts["git_error"] = output or "git 提交失败"
+    return counts
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="批量导入本地解法归档：按题号或 slug 匹配题目，一次提交"
+    )
+    parser.add_argument("source", type=Path, help="解法目录（递归查找 .py 文件）")
+    parser.add_argument("--best", action="store_true", help="把每题最新的一份设为 best")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--user", help="多用户模式下导入到该用户的工作区（不提交 git）")
+    parser.add_argument("--no-commit", action="store_true", help="只写文件，不做 git 提交")
+    parser.add_argument("--dry-run", action="store_true", help="只报告匹配结果")
+    args = parser.parse_args(argv)
+
+    data_manager.set_current_user(args.user)
+    started = time.perf_counter()
+    counts = import_solutions(
+        args.source,
+        is_best=args.best,
+        workers=args.workers,
+        commit=not args.no_commit and args.user is None,
+        dry_run=args.dry_run,
+    )
+    for path in counts["unmatched_paths"]:
+        print(f"? 无法匹配题目：{path}")
+    print(
+        f"匹配 {counts['questions']} 题 {counts['files']} 个文件，"
+        f"未匹配 {counts['unmatched']}；新写入 {counts['written']}，"
+        f"与已有解法重复 {counts['duplicates']}"
+        f"（{time.perf_counter() - started:.1f}s）"
+    )
+    if counts["git_error"]:
+        print(f"git 提交失败：{counts['git_error']}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,470 @@
+import argparse
+import ast
+import builtins
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from utils import data_manager
+from utils.file_utils import atomic_write_text
+from utils.judge import question_id_from_path
+
+ANALYSIS_VERSION = 2
+MAX_CACHE_ENTRIES = 5000
+# 待分析的文件少于这个数时直接在本进程里做，进程池的启动开销不划算
+POOL_THRESHOLD = 32
+
+# 复杂度用 (多项式次数, log 次数) 表示，元组比较即可排序；指数级记为次数 99
+Cost = Tuple[int, int]
+EXPONENTIAL: Cost = (99, 0)
+KNOWN_NAMES = set(dir(builtins)) | {"__file__", "__class__", "__builtins__"}
+# LeetCode 模板里由判题环境预先定义的节点类，从网页粘过来的代码不会 import
+LEETCODE_NAMES = {
+    "TreeNode", "ListNode", "Node", "NestedInteger", "Employee", "Interval"
+}
+
+_BIG_O_RE = re.compile(r"O\s*\(((?:[^()]|\([^()]*\))*)\)", re.IGNORECASE)
+_LOG_RE = re.compile(r"log\s*(?:\([^()]*\)|[a-z])?")
+
+
+def content_hash(code: str) -> str:
+    return hashlib.sha256(code.encode("utf-8")).hexdigest()
+
+
+def format_cost(cost: Cost) -> str:
+    degree, logs = cost
+    if cost >= EXPONENTIAL:
+        return "O(2^n)"
+    if degree == 0:
+        return "O(log n)" if logs else "O(1)"
+    base = "n" if degree == 1 else f"n^{degree}"
+    return f"O({base} log n)" if logs else f"O({base})"
+
+
+def parse_complexity(expression: str) -> Cost:
+    # “m+n”“n·m”“log(m+n)”这类写法统一折算成单变量：和取最大项，积次数相加
+    text = expression.lower().replace("²", "^2").replace("³", "^3")
+    text = re.sub(r"\s+", "", text)
+    if re.search(r"\d\^[a-z]|!|\^n", text):
+        return EXPONENTIAL
+    text = _LOG_RE.sub("L", text)
+    best: Cost = (0, 0)
+    for term in text.split("+"):
+        degree = 0
+        for variable, power in re.findall(r"([a-km-z])(?:\^(\d+))?", term):
+            degree += int(power or 1)
+        best = max(best, (degree, term.count("L")))
+    return best
+
+
+def expected_complexity(hint: str) -> Optional[Cost]:
+    # 取提示里第一个时间复杂度；紧跟在“空间”后面的 O(...) 跳过
+    for match in _BIG_O_RE.finditer(hint or ""):
+        if "空间" in hint[max(0, match.start() - 6) : match.start()]:
+            continue
+        return parse_complexity(match.group(1))
+    return None
+
+
+def _add(left: Cost, right: Cost) -> Cost:
+    return left[0] + right[0], left[1] + right[1]
+
+
+def _is_constant(node: ast.AST) -> bool:
+    return isinstance(node, ast.Constant) and isinstance(node.value, (int, float))
+
+
+def _halves(loop: ast.While) -> bool:
+    # 循环体里有 //2、>>1 之类的折半操作，或 i *= 2、i <<= 1、i = i * 2 这类按常数倍
+    # 增长的操作，按二分/逐位/倍增处理记作 log n
+    for node in ast.walk(loop):
+        op = getattr(node, "op", None)
+        if isinstance(node, (ast.BinOp, ast.AugAssign)) and isinstance(
+            op, (ast.FloorDiv, ast.RShift)
+        ):
+            return True
+        if (
+            isinstance(node, ast.AugAssign)
+            and isinstance(op, (ast.Mult, ast.LShift))
+            and _is_constant(node.value)
+        ):
+            return True
+        if (
+            isinstance(node, ast.Assign)
+            and isinstance(node.value, ast.BinOp)
+            and isinstance(node.value.op, (ast.Mult, ast.LShift))
+            and (_is_constant(node.value.left) or _is_constant(node.value.right))
+            and any(
+                isinstance(target, ast.Name)
+                and any(
+                    isinstance(side, ast.Name) and side.id == target.id
+                    for side in (node.value.left, node.value.right)
+                )
+                for target in node.targets
+            )
+        ):
+            return True
+    return False
+
+
+def _called_name(call: ast.Call) -> Optional[str]:
+    func = call.func
+    if isinstance(func, ast.Name):
+        return func.id
+    if isinstance(func, ast.Attribute) and isinstance(func.value, ast.Name):
+        return func.attr if func.value.id in ("self", "cls") else None
+    return None
+
+
+class _ComplexityVisitor(ast.NodeVisitor):
+    # 沿语法树累加循环开销：for/推导式记 n，折半 while 记 log n，排序记 n log n；
+    # 函数体各自从 0 开始算，递归单独标出（分支数、记忆化无法只靠静态结构判断）
+    def __init__(self) -> None:
+        self.cost: Cost = (0, 0)
+        self.worst: Cost = (0, 0)
+        self.depth = 0
+        self.max_depth = 0
+        self.functions: List[str] = []
+        self.recursive: Set[str] = set()
+        self.memoized: Set[str] = set()
+
+    def _loop(self, node: ast.AST, factor: Cost) -> None:
+        saved = self.cost
+        self.cost = _add(self.cost, factor)
+        self.depth += 1
+        self.worst = max(self.worst, self.cost)
+        self.max_depth = max(self.max_depth, self.depth)
+        self.generic_visit(node)
+        self.depth -= 1
+        self.cost = saved
+
+    def visit_For(self, node: ast.For) -> None:
+        self._loop(node, (1, 0))
+
+    visit_AsyncFor = visit_For
+
+    def visit_While(self, node: ast.While) -> None:
+        self._loop(node, (0, 1) if _halves(node) else (1, 0))
+
+    def visit_comprehension(self, node: ast.comprehension) -> None:
+        # 推导式的每个 for 子句都是一层循环
+        self.cost = _add(self.cost, (1, 0))
+        self.depth += 1
+        self.worst = max(self.worst, self.cost)
+        self.max_depth = max(self.max_depth, self.depth)
+        self.generic_visit(node)
+
+    def _visit_comprehension(self, node: ast.AST) -> None:
+        # 先进入各层 for 子句，元素表达式处在最内层
+        saved = self.cost, self.depth
+        for generator in node.generators:
+            self.visit(generator)
+        for field in ("elt", "key", "value"):
+            if hasattr(node, field):
+                self.visit(getattr(node, field))
+        self.cost, self.depth = saved
+
+    visit_ListComp = _visit_comprehension
+    visit_SetComp = _visit_comprehension
+    visit_DictComp = _visit_comprehension
+    visit_GeneratorExp = _visit_comprehension
+
+    def visit_FunctionDef(self, node: ast.FunctionDef) -> None:
+        for decorator in node.decorator_list:
+            if "cache" in ast.dump(decorator):
+                self.memoized.add(node.name)
+        saved = self.cost, self.depth
+        self.cost, self.depth = (0, 0), 0
+        self.functions.append(node.name)
+        self.generic_visit(node)
+        self.functions.pop()
+        self.cost, self.depth = saved
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def visit_Call(self, node: ast.Call) -> None:
+        name = _called_name(node)
+        if name is not None and self.functions and name == self.functions[-1]:
+            self.recursive.add(name)
+        # sorted(...) 与任意 <expr>.sort() 都按一次排序计 n log n
+        is_method_sort = (
+            isinstance(node.func, ast.Attribute) and node.func.attr == "sort"
+        )
+        if name in ("sorted", "sort") or is_method_sort:
+            self.worst = max(self.worst, _add(self.cost, (1, 1)))
+        self.generic_visit(node)
+
+
+def _has_future_annotations(tree: ast.Module) -> bool:
+    return any(
+        isinstance(node, ast.ImportFrom)
+        and node.module == "__future__"
+        and any(alias.name == "annotations" for alias in node.names)
+        for node in tree.body
+    )
+
+
+def _bound_names(tree: ast.AST) -> Optional[Set[str]]:
+    # 整个文件里任何位置绑定过的名字都算已定义：宁可漏报，不误报；
+    # 出现 import * 时无法判断，返回 None
+    names: Set[str] = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name) and not isinstance(node.ctx, ast.Load):
+            names.add(node.id)
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            names.add(node.name)
+        elif isinstance(node, ast.arg):
+            names.add(node.arg)
+        elif isinstance(node, (ast.Import, ast.ImportFrom)):
+            for alias in node.names:
+                if alias.name == "*":
+                    return None
+                names.add(alias.asname or alias.name.split(".")[0])
+        elif isinstance(node, (ast.Global, ast.Nonlocal)):
+            names.update(node.names)
+        elif isinstance(node, ast.ExceptHandler) and node.name:
+            names.add(node.name)
+        elif isinstance(getattr(node, "name", None), str):
+            names.add(node.name)  # match 语句里的 case x / case [*rest]
+        elif isinstance(getattr(node, "rest", None), str):
+            names.add(node.rest)
+    return names
+
+
+def _loaded_names(
+    node: ast.AST, skip_annotations: bool, in_function: bool = False
+) -> Iterator[ast.Name]:
+    # 按运行时实际求值的位置找读取的名字：函数内的变量注解不会求值，跳过
+    if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Load):
+        yield node
+        return
+    skipped: Set[int] = set()
+    if isinstance(node, ast.AnnAssign) and (skip_annotations or in_function):
+        skipped.add(id(node.annotation))
+    if skip_annotations and isinstance(node, ast.arg) and node.annotation:
+        skipped.add(id(node.annotation))
+    if (
+        skip_annotations
+        and isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))
+        and node.returns
+    ):
+        skipped.add(id(node.returns))
+    inner = in_function or isinstance(
+        node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda)
+    )
+    for child in ast.iter_child_nodes(node):
+        if id(child) in skipped:
+            continue
+        # 参数注解和默认值在 def 执行时求值，属于外层作用域
+        child_scope = in_function if isinstance(child, ast.arguments) else inner
+        yield from _loaded_names(child, skip_annotations, child_scope)
+
+
+def analyze_code(code: str) -> Dict[str, Any]:
+    # 纯函数、结果可 JSON 序列化：既能按内容哈希缓存，也能直接丢进进程池
+    try:
+        tree = ast.parse(code)
+    except SyntaxError as exc:
+        return {"syntax_error": f"第 {exc.lineno} 行：{exc.msg}", "undefined": []}
+
+    undefined: List[Dict[str, Any]] = []
+    bound = _bound_names(tree)
+    if bound is not None:
+        known = bound | KNOWN_NAMES
+        seen: Set[str] = set()
+        for name in _loaded_names(tree, _has_future_annotations(tree)):
+            if name.id not in known and name.id not in seen:
+                seen.add(name.id)
+                undefined.append({"name": name.id, "line": name.lineno})
+
+    visitor = _ComplexityVisitor()
+    visitor.visit(tree)
+    return {
+        "syntax_error": None,
+        "undefined": undefined,
+        "loop_depth": visitor.max_depth,
+        "recursive": sorted(visitor.recursive),
+        "memoized": sorted(visitor.memoized & visitor.recursive),
+        "cost": list(visitor.worst),
+    }
+
+
+class AnalysisCache:
+    # 按代码内容哈希缓存分析结果并落盘；同一份代码（归档里的副本、重复提交）只解析一次
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries: Optional[Dict[str, Dict[str, Any]]] = None
+
+    def get_many(self, keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            entries = self._load()
+            return {key: entries[key] for key in keys if key in entries}
+
+    def put_many(self, results: Dict[str, Dict[str, Any]]) -> None:
+        if not results:
+            return
+        with self._lock:
+            entries = self._load()
+            entries.update(results)
+            # 字典保持插入顺序，超出上限时丢掉最早写入的
+            for key in list(entries)[: max(0, len(entries) - MAX_CACHE_ENTRIES)]:
+                del entries[key]
+            atomic_write_text(
+                self.path,
+                json.dumps(
+                    {"version": ANALYSIS_VERSION, "entries": entries},
+                    ensure_ascii=False,
+                    separators=(",", ":"),
+                ),
+            )
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if self._entries is None:
+            try:
+                cached = json.loads(self.path.read_text(encoding="utf-8"))
+            except (FileNotFoundError, ValueError):
+                cached = {}
+            if cached.get("version") == ANALYSIS_VERSION:
+                self._entries = cached.get("entries", {})
+            else:
+                self._entries = {}
+        return self._entries
+
+
+_CACHES: Dict[Path, AnalysisCache] = {}
+_CACHES_LOCK = threading.Lock()
+
+
+def get_analysis_cache() -> AnalysisCache:
+    # 结果只取决于代码内容，所有用户共用默认工作区下的一份
+    path = data_manager.get_workspace(None).cache_dir / "static_analysis.json"
+    with _CACHES_LOCK:
+        cache = _CACHES.get(path)
+        if cache is None:
+            cache = _CACHES[path] = AnalysisCache(path)
+        return cache
+
+
+def analyze_many(
+    codes: List[str], workers: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    cache = get_analysis_cache()
+    keys = [content_hash(code) for code in codes]
+    results = cache.get_many(keys)
+    missing = {key: code for key, code in zip(keys, codes) if key not in results}
+    if missing:
+        sources = list(missing.values())
+        if len(sources) < POOL_THRESHOLD:
+            computed = [analyze_code(code) for code in sources]
+        else:
+            workers = workers or os.cpu_count() or 1
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                chunksize = max(1, len(sources) // (workers * 4))
+                computed = list(pool.map(analyze_code, sources, chunksize=chunksize))
+        fresh = dict(zip(missing, computed))
+        cache.put_many(fresh)
+        results.update(fresh)
+    return [results[key] for key in keys]
+
+
+def review_analysis(
+    analysis: Dict[str, Any], question: Optional[Dict[str, Any]]
+) -> Dict[str, Any]:
+    # errors 会阻止提交；warnings 只是提示（估计的复杂度高于锦囊里给出的期望）
+    errors: List[str] = []
+    warnings: List[str] = []
+    if analysis["syntax_error"]:
+        errors.append(f"语法错误，{analysis['syntax_error']}")
+    for item in analysis["undefined"]:
+        if item["name"] in LEETCODE_NAMES:
+            warnings.append(
+                f"第 {item['line']} 行：{item['name']} 由 LeetCode 环境提供，"
+                "本地运行需要自行定义"
+            )
+            continue
+        errors.append(
+            f"第 {item['line']} 行：未定义的名字 {item['name']}（漏了 import？）"
+        )
+    estimate = None
+    expected = expected_complexity((question or {}).get("pattern_hint", ""))
+    if not analysis["syntax_error"]:
+        estimate = format_cost(tuple(analysis["cost"]))
+        unmemoized = sorted(set(analysis["recursive"]) - set(analysis["memoized"]))
+        if unmemoized:
+            # 没有记忆化的递归可能是分治也可能是指数级，只提示，不参与比较
+            warnings.append(
+                f"{'、'.join(unmemoized)} 是没有记忆化的递归，"
+                "复杂度无法只靠循环结构估计"
+            )
+        elif expected is not None and tuple(analysis["cost"]) > expected:
+            warnings.append(
+                f"循环嵌套 {analysis['loop_depth']} 层，估计 {estimate}，"
+                f"高于锦囊里的 {format_cost(expected)}"
+            )
+    return {
+        "errors": errors,
+        "warnings": warnings,
+        "estimate": estimate,
+        "expected": format_cost(expected) if expected is not None else None,
+    }
+
+
+def check_code(
+    code: str, question: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    return review_analysis(analyze_many([code])[0], question)
+
+
+def check_archive(
+    paths: Optional[List[Path]] = None, workers: Optional[int] = None
+) -> List[Tuple[Path, Dict[str, Any]]]:
+    if paths is None:
+        solutions_dir = data_manager.current_workspace().solutions_dir
+        paths = sorted(solutions_dir.rglob("*.py")) if solutions_dir.exists() else []
+    codes = [path.read_text(encoding="utf-8", errors="replace") for path in paths]
+    question_ids = [question_id_from_path(path) or "" for path in paths]
+    questions = data_manager.get_questions(question_ids)
+    analyses = analyze_many(codes, workers)
+    return [
+        (path, review_analysis(analysis, question))
+        for path, question, analysis in zip(paths, questions, analyses)
+    ]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="静态检查解法：语法错误、未定义名字、循环嵌套估计的复杂度"
+    )
+    parser.add_argument("paths", nargs="*", type=Path, help="默认检查全部解法")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--user", help="多用户模式下检查该用户工作区的解法")
+    args = parser.parse_args(argv)
+
+    data_manager.set_current_user(args.user)
+    started = time.perf_counter()
+    reports = check_archive(args.paths or None, args.workers)
+    failed = 0
+    for path, report in reports:
+        if not report["errors"] and not report["warnings"]:
+            continue
+        failed += bool(report["errors"])
+        expected = f"，锦囊 {report['expected']}" if report["expected"] else ""
+        print(f"{path}  估计 {report['estimate']}{expected}")
+        for message in report["errors"]:
+            print(f"    ✗ {message}")
+        for message in report["warnings"]:
+            print(f"    ! {message}")
+    elapsed = time.perf_counter() - started
+    print(f"共 {len(reports)} 个文件，{failed} 个有错误，耗时 {elapsed:.2f}s")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())